@@ -13,6 +13,8 @@ from django.core.exceptions import ValidationError
 
 from sorl.thumbnail import ImageField
 
+from douglasdaly.singletons import load_singleton
+
 
 #
 #   Models
@@ -114,8 +116,4 @@ class AssetSettings(models.Model):
     @classmethod
     def load(cls):
         """Loads the Singleton Instance or returns None"""
-        try:
-            obj = cls.objects.get(pk=1)
-        except cls.DoesNotExist:
-            obj = None
-        return obj
+        return load_singleton(cls)
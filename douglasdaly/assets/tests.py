@@ -1,3 +1,68 @@
-from django.test import TestCase
+from douglasdaly.testing import CacheTestCase
 
-# Create your tests here.
+from .models import ImageAsset, FileAsset, VideoAsset
+from .utils import AssetRenderer
+
+
+class AssetLoadingTests(CacheTestCase):
+    """
+    Checks the assets a document references are loaded with a fixed number
+    of queries, however many it references
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(50):
+            ImageAsset.objects.create(title='Image %d' % i,
+                                      slug='image-%d' % i,
+                                      description='Picture %d' % i,
+                                      asset='assets/image/image-%d.png' % i)
+        FileAsset.objects.create(title='Paper', slug='paper',
+                                 description='A paper',
+                                 asset='assets/file/paper.pdf')
+        VideoAsset.objects.create(title='Clip', slug='clip',
+                                  description='A clip',
+                                  asset='assets/video/clip.mp4')
+
+    def setUp(self):
+        super().setUp()
+        self.renderer = AssetRenderer()
+
+    def render(self, text):
+        """Loads the assets for text and renders its asset references"""
+        self.renderer.load_assets(text)
+        ret = list()
+        for slug in text.split():
+            if slug.startswith('![]('):
+                ret.append(self.renderer.image(slug[4:-1], None, ''))
+            elif slug.startswith('[]('):
+                ret.append(self.renderer.link(slug[3:-1], None, ''))
+        return ret
+
+    def test_many_images(self):
+        text = ' '.join('![](asset:image-%d)' % i for i in range(50))
+        with self.assertNumQueries(3):
+            html = self.render(text)
+        self.assertEqual(len(html), 50)
+        for i, x in enumerate(html):
+            self.assertIn('assets/image/image-%d.png' % i, x)
+            self.assertIn('title="Image %d"' % i, x)
+
+    def test_mixed_types(self):
+        text = '![](asset:image-0) [](asset:paper) ![](asset:Clip) ' \
+               '![](asset:missing)'
+        with self.assertNumQueries(3):
+            html = self.render(text)
+        self.assertIn('assets/image/image-0.png', html[0])
+        self.assertIn('assets/file/paper.pdf', html[1])
+        self.assertIn('<video', html[2])
+        self.assertIn('assets/video/clip.mp4', html[2])
+        self.assertIn('src="asset:missing"', html[3])
+
+    def test_external_links(self):
+        text = '![](https://example.com/image.png) [](https://example.com) ' \
+               '![](/static/image.png)'
+        with self.assertNumQueries(0):
+            html = self.render(text)
+        self.assertIn('src="https://example.com/image.png"', html[0])
+        self.assertIn('href="https://example.com"', html[1])
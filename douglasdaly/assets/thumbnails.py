@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Background thumbnail pre-generation for assets and images.
+
+:author: Douglas Daly
+:date: 10/18/2026
+
+    Note that this module is imported by freshly spawned worker processes
+    before Django is set up, so models are imported where they are used.
+
+"""
+#
+#   Imports
+#
+import re
+import logging
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import django
+from django.apps import apps
+from django.conf import settings
+
+
+#
+#   Variables
+#
+
+logger = logging.getLogger(__name__)
+
+_ASSET_URL_RE = re.compile(r'asset:[^\s()\[\]<>"\']+')
+
+_executor = None
+
+
+#
+#   Classes
+#
+
+class ThumbnailRequest(namedtuple('ThumbnailRequest',
+                                  ('model', 'pk', 'field', 'geometry',
+                                   'options'))):
+    """
+    A thumbnail to generate for an image field of a model instance
+    """
+
+    @classmethod
+    def create(cls, obj, field, geometry, **options):
+        """Creates a new request for the given object's image field"""
+        return cls(obj._meta.label, obj.pk, field, geometry,
+                   tuple(sorted(options.items())))
+
+
+#
+#   Functions
+#
+
+def get_markdown_thumbnail_requests(text):
+    """Gets the thumbnails needed to render the given markdown text"""
+    from .models import ImageAsset
+    from .utils import AssetRenderer
+
+    if not text:
+        return list()
+
+    sizes = dict()
+    for url in _ASSET_URL_RE.findall(text):
+        slug, args = AssetRenderer._asset_url_helper(url)
+        size = args.get('size', None)
+        if size is None:
+            continue
+        options = {
+            'crop': args.get('crop', None),
+            'quality': args.get('quality', 99),
+        }
+        sizes.setdefault(slug, set()).add((size, tuple(options.items())))
+
+    if not sizes:
+        return list()
+
+    ret = list()
+    for asset in ImageAsset.objects.filter(slug__in=sizes.keys()).order_by():
+        for size, options in sorted(sizes[asset.slug], key=str):
+            ret.append(ThumbnailRequest.create(asset, 'asset', size,
+                                               **dict(options)))
+    return ret
+
+
+def pregenerate_thumbnails(requests, block=False):
+    """Generates the requested thumbnails in the background worker pool
+
+    Returns the number of thumbnails generated when blocking, otherwise
+    returns None immediately.
+    """
+    requests = list(set(requests))
+    if not requests:
+        return 0 if block else None
+
+    n_workers = getattr(settings, 'THUMBNAIL_PREGENERATE_WORKERS', 0)
+    if n_workers <= 0:
+        n_done = sum(generate_thumbnail(x) for x in requests)
+        return n_done if block else None
+
+    executor = _get_executor(n_workers)
+    futures = [executor.submit(generate_thumbnail, x) for x in requests]
+    if block:
+        wait(futures)
+        return sum(x.result() for x in futures)
+
+
+def generate_thumbnail(request):
+    """Generates a single requested thumbnail (in the current process)"""
+    if not apps.ready:
+        django.setup()
+    from sorl.thumbnail import get_thumbnail
+
+    try:
+        model = apps.get_model(request.model)
+        obj = model.objects.filter(pk=request.pk).first()
+        image = getattr(obj, request.field, None)
+        if not image:
+            return False
+        get_thumbnail(image, request.geometry, **dict(request.options))
+    except Exception:
+        logger.exception("Unable to generate thumbnail: %s", request)
+        return False
+    return True
+
+
+#
+#   Helper functions
+#
+
+def _get_executor(n_workers):
+    """Helper function to get the (lazily created) worker process pool"""
+    global _executor
+    if _executor is None:
+        # - Spawned (not forked) so workers never share our DB connections
+        _executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _executor
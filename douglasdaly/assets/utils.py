@@ -10,10 +10,12 @@ assets/templatetags/utils.py
 #
 #   Imports
 #
+import re
+
 import mistune
 from sorl.thumbnail import get_thumbnail
 
-from .models import Asset, ImageAsset, FileAsset, VideoAsset, AssetSettings
+from .models import ImageAsset, FileAsset, VideoAsset, AssetSettings
 
 
 #
@@ -22,6 +24,8 @@ from .models import Asset, ImageAsset, FileAsset, VideoAsset, AssetSettings
 
 _VIDEO_EXTENSIONS = ('.mp4', '.ogg')
 
+_ASSET_SLUG_RE = re.compile(r'asset:([^\s:()\[\]<>"\']+)', re.IGNORECASE)
+
 
 #
 #   Classes
@@ -37,29 +41,68 @@ class AssetRenderer(mistune.Renderer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        asset_settings = AssetSettings.load()
+        self._assets = None
+        self.load_settings()
+
+    # - Settings and asset loading
+
+    def load_settings(self):
+        """Loads the current asset settings (or their defaults)"""
+        asset_settings = AssetSettings.load() or AssetSettings()
         self.DEFAULT_VIDEO_WIDTH = asset_settings.default_video_width
         self.DEFAULT_VIDEO_HEIGHT = asset_settings.default_video_height
         self.DEFAULT_VIDEO_AUTOPLAY = asset_settings.default_video_autoplay
         self.DEFAULT_VIDEO_CONTROLS = asset_settings.default_video_controls
 
+    def load_assets(self, text):
+        """Loads settings and all assets referenced in the markdown text"""
+        self.load_settings()
+        slugs = set(x.lower() for x in _ASSET_SLUG_RE.findall(text))
+        self._assets = self._query_assets(slugs) if slugs else dict()
+
+    def clear_assets(self):
+        """Clears any assets loaded for the last document"""
+        self._assets = None
+
+    def _get_asset(self, slug, asset_type=None):
+        """Gets the (loaded) asset for the given slug, if it exists"""
+        if self._assets is None:
+            assets = self._query_assets([slug])
+        else:
+            assets = self._assets
+
+        asset = assets.get(slug, None)
+        if asset is not None and asset_type is not None and \
+                asset.type != asset_type:
+            return None
+        return asset
+
+    @staticmethod
+    def _query_assets(slugs):
+        """Queries all assets with the given slugs, one query per type"""
+        ret = dict()
+        for asset_cls in (ImageAsset, VideoAsset, FileAsset):
+            for asset in asset_cls.objects.filter(slug__in=slugs).order_by():
+                ret[asset.slug] = asset
+        return ret
+
+    # - Rendering
+
     def image(self, src, title, text, attribute=None):
         """Image rendering for assets"""
         asset_slug, args = self._asset_url_helper(src)
         if asset_slug is not None:
-            asset = Asset.objects.filter(slug=asset_slug).first()
+            asset = self._get_asset(asset_slug)
             if asset is not None:
                 if asset.type == "video":
                     return self.video(src, title, text)
+                elif asset.type != "image":
+                    return super().image(src, title, text)
 
                 size = args.get('size', None)
                 crop = args.get('crop', None)
                 quality = args.get('quality', 99)
 
-                asset = ImageAsset.objects.filter(slug=asset.slug).first()
-                if asset is None:
-                    return super().image(src, title, text)
-
                 if size is not None:
                     image_asset = get_thumbnail(asset.asset, size,
                                                 crop=crop, quality=quality)
@@ -99,9 +142,9 @@ class AssetRenderer(mistune.Renderer):
 
     def link(self, link, title, text):
         """Link render function to also handle assets"""
-        args = AssetRenderer._asset_url_helper(link)
-        if args is not None:
-            asset = FileAsset.objects.filter(slug=args[0]).first()
+        asset_slug, _ = self._asset_url_helper(link)
+        if asset_slug is not None:
+            asset = self._get_asset(asset_slug, "file")
 
             if asset is not None:
                 link = asset.asset.url
@@ -115,9 +158,9 @@ class AssetRenderer(mistune.Renderer):
     def video(self, src, title, text, video_width=None, video_height=None,
               autoplay=None, controls=None, loop=None, attribute=None):
         """Video html render function"""
-        asset_slug, args = AssetRenderer._asset_url_helper(src)
+        asset_slug, args = self._asset_url_helper(src)
         if asset_slug is not None:
-            asset = VideoAsset.objects.filter(slug=asset_slug).first()
+            asset = self._get_asset(asset_slug, "video")
 
             size = args.get('size', None)
             if autoplay is None:
@@ -14,6 +14,12 @@ from django.utils.translation import gettext_lazy as _
 
 from colorful.widgets import ColorFieldWidget
 
+from douglasdaly.page_cache import purge_cache_tags
+
+from .autocomplete import invalidate_autocomplete_index
+from .counts import clear_listing_counts, recount_post_counts
+from .search import clear_search_results
+from .sidebar import invalidate_sidebar_index
 from .widgets import ColorListFieldWidget, TextListFieldWidget
 from .models import (
     Post, Category, Tag, BlogSettings, CustomJS, CustomCSS, ColorTheme,
@@ -27,8 +33,20 @@ from .utils import font_color_helper
 #
 
 def _action_property_helper(queryset, **kwargs):
-    """Helper function for updating properties on given items"""
-    return queryset.update(**kwargs)
+    """Helper function for updating properties on given items
+
+    Updates skip the signal handlers, so the post counts, sidebar, search
+    results, autocomplete index and cached blog pages they'd maintain are
+    refreshed here instead.
+    """
+    ret = queryset.update(**kwargs)
+    recount_post_counts()
+    clear_listing_counts()
+    clear_search_results()
+    invalidate_autocomplete_index()
+    invalidate_sidebar_index()
+    purge_cache_tags('blog')
+    return ret
 
 
 def _action_message_helper(obj_cls, n_updated, message=None,
@@ -156,7 +174,8 @@ class BlogSettingsAdmin(admin.ModelAdmin):
             'fields': ('title', 'site_link'),
         }),
         (_('General'), {
-            'fields': ('show_authors', 'posts_per_page'),
+            'fields': ('show_authors', 'posts_per_page',
+                       'cursor_pagination'),
         }),
         (_('Display'), {
             'fields': (
@@ -203,7 +222,7 @@ class AuthorAdmin(admin.ModelAdmin):
     search_fields = ('last_name', 'first_name', 'display_name')
 
     list_display = ('display_display_name', 'first_name', 'last_name',
-                    'contact_email', 'is_active', 'show_posts')
+                    'contact_email', 'is_active', 'show_posts', 'post_count')
     list_filter = ('is_active', 'show_posts')
 
     actions = ['make_active', 'make_inactive', 'make_show_posts',
@@ -390,7 +409,7 @@ class CategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
 
     ordering = ('name',)
-    list_display = ('name', 'description')
+    list_display = ('name', 'description', 'post_count')
     search_fields = ('name', 'description', 'search_terms')
 
     # - Override to set font color
@@ -424,7 +443,7 @@ class TagAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
 
     ordering = ('name',)
-    list_display = ('name', 'description')
+    list_display = ('name', 'description', 'post_count')
     list_filter = (TagCategoryFilter,)
     search_fields = ('name', 'description', 'search_terms')
 
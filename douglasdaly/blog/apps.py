@@ -17,3 +17,6 @@ class BlogAppConfig(AppConfig):
     Configuration for blog application
     """
     name = 'blog'
+
+    def ready(self):
+        from . import signals  # noqa: F401
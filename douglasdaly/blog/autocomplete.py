@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Prefix index of post titles, tags, categories and search terms for
+autocompleting searches.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import re
+import uuid
+import threading
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from django.urls import reverse
+
+from .models import Post, Category, Tag
+from .utils import get_slug_url_builder
+
+
+#
+#   Variables
+#
+
+# - Kinds of suggestion, in the order they're listed for the same prefix
+SUGGESTION_KINDS = ('post', 'category', 'tag', 'term')
+
+Suggestion = namedtuple('Suggestion', ('label', 'kind', 'url'))
+
+_CACHE_NAME = 'blog'
+_VERSION_KEY = 'autocomplete:version'
+
+# - Most index entries looked at for a prefix, so short prefixes (which
+#   match a large part of the index) are as quick as long ones
+_MAX_SCAN = 200
+
+_WORD_RE = re.compile(r'\w+')
+
+_indexes = dict()
+_indexes_lock = threading.Lock()
+
+
+#
+#   Classes
+#
+
+class PrefixIndex(object):
+    """
+    Suggestions found by prefix from sorted arrays of keys, one key for
+    each word a suggestion's label (lowercased) could be typed from
+    """
+
+    def __init__(self, suggestions):
+        self.suggestions = list(suggestions)
+        entries = sorted(set(
+            (key, i) for i, x in enumerate(self.suggestions)
+            for key in get_prefix_keys(x.label)
+        ))
+        self._keys = [x[0] for x in entries]
+        self._numbers = array('I', (x[1] for x in entries))
+        self._labels = [normalize_prefix(x.label) for x in self.suggestions]
+
+    def __len__(self):
+        return len(self.suggestions)
+
+    def find(self, prefix, limit=10):
+        """Gets the suggestions for a prefix, best first
+
+        Suggestions whose label starts with the prefix come before those
+        with a later word starting with it, then they're in kind order.
+        """
+        prefix = normalize_prefix(prefix)
+        if not prefix or limit < 1:
+            return list()
+
+        found = dict()
+        i = bisect_left(self._keys, prefix)
+        end = min(i + _MAX_SCAN, len(self._keys))
+        while i < end and self._keys[i].startswith(prefix):
+            number = self._numbers[i]
+            is_start = self._keys[i] == self._labels[number]
+            found[number] = found.get(number, False) or is_start
+            i += 1
+
+        ranked = sorted(found, key=lambda x: (not found[x], x))
+        return [self.suggestions[x] for x in ranked[:limit]]
+
+
+#
+#   Functions
+#
+
+def normalize_prefix(text):
+    """Gets the lowercase, single-spaced form of text to match on"""
+    return ' '.join(text.lower().split())
+
+
+def get_prefix_keys(label):
+    """Gets the keys for a label: the rest of it from each word on"""
+    label = normalize_prefix(label)
+    return set(label[x.start():] for x in _WORD_RE.finditer(label))
+
+
+def get_autocomplete_index():
+    """Gets this worker's autocomplete index, rebuilding it if outdated"""
+    version = __get_version()
+    with _indexes_lock:
+        found = _indexes.get(_VERSION_KEY)
+        if found is not None and found[0] == version:
+            return found[1]
+
+    ret = build_autocomplete_index()
+    with _indexes_lock:
+        _indexes[_VERSION_KEY] = (version, ret)
+    return ret
+
+
+def build_autocomplete_index():
+    """Builds the autocomplete index from the database
+
+    Takes one query each for displayable posts and the categories and tags
+    with any, with the search terms of all three as suggested searches.
+    """
+    post_url = get_slug_url_builder('view_blog_post')
+    category_url = get_slug_url_builder('view_blog_category')
+    tag_url = get_slug_url_builder('view_blog_tag')
+    search_url = reverse('search')
+
+    suggestions = list()
+    terms = set()
+    for model, get_url in ((Post, post_url), (Category, category_url),
+                           (Tag, tag_url)):
+        if model is Post:
+            rows = Post.get_displayable().values_list('title', 'slug',
+                                                      'search_terms')
+        else:
+            rows = model.objects.filter(post_count__gt=0)\
+                .values_list('name', 'slug', 'search_terms')
+        kind = model._meta.model_name
+        for label, slug, search_terms in rows:
+            if label:
+                suggestions.append(Suggestion(label, kind, get_url(slug)))
+            terms.update(x.strip() for x in search_terms or () if x.strip())
+
+    suggestions.extend(
+        Suggestion(x, 'term', '%s?%s' % (search_url, urlencode({'q': x})))
+        for x in terms
+    )
+    suggestions.sort(key=lambda x: (SUGGESTION_KINDS.index(x.kind),
+                                    normalize_prefix(x.label), x.url))
+    return PrefixIndex(suggestions)
+
+
+def invalidate_autocomplete_index():
+    """Outdates every worker's autocomplete index, so it's rebuilt"""
+    caches[_CACHE_NAME].set(_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+#
+#   Helper Functions
+#
+
+def __get_version():
+    """Helper function to get the current version of the index"""
+    cache = caches[_CACHE_NAME]
+    ret = cache.get(_VERSION_KEY)
+    if ret is None:
+        cache.add(_VERSION_KEY, uuid.uuid4().hex, None)
+        ret = cache.get(_VERSION_KEY)
+    return ret
@@ -0,0 +1,456 @@
+# -*- coding: utf-8 -*-
+"""
+In-process BM25 search index, stored in a file which each worker memory
+maps, plus a log of the documents changed since it was written.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import os
+import re
+import math
+import mmap
+import fcntl
+import pickle
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+#
+#   Variables
+#
+
+# - Weight of each document field (e.g. title, keywords, description and
+#   body) when counting term frequencies and document lengths
+FIELD_WEIGHTS = (3.0, 2.0, 1.5, 1.0)
+
+K1 = 1.2
+B = 0.75
+
+_TOKEN_RE = re.compile(r'\w+')
+
+_MAGIC = b'BM25IDX1'
+_LOG_MAGIC = b'BM25LOG1'
+_HEADER = struct.Struct('<8sQIIII')
+_LOG_HEADER = struct.Struct('<8sQ')
+_RECORD = struct.Struct('<I')
+
+# - The log is merged into the index once it's this large (in bytes)
+_MAX_LOG_SIZE = 1024 * 1024
+
+
+#
+#   Classes
+#
+
+class BM25Index(object):
+    """
+    BM25 index of documents, each an id and the text of its fields
+
+    The index file holds sorted terms, each with a postings list of
+    (document number, term frequency) pairs in flat arrays, read straight
+    from the memory map.  Updates are appended to the log, which every
+    worker replays on top of the index, and merged into a new index file
+    once the log grows large.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._index_path = '%s.idx' % path
+        self._log_path = '%s.log' % path
+        self._lock_path = '%s.lock' % path
+
+        self._base = None
+        self._base_key = None
+        self._log_key = None
+        self._log_pos = 0
+        self._overlay = dict()
+        self._overlay_terms = defaultdict(dict)
+
+        # - Guards the loaded index and log overlay, which searches refresh
+        #   and read, between threads
+        self._state_lock = threading.Lock()
+
+    def exists(self):
+        """Whether or not the index has been built"""
+        return os.path.exists(self._index_path)
+
+    def search(self, tokens):
+        """Gets the ids of documents with all the tokens, best first"""
+        tokens = list(dict.fromkeys(tokens))
+        with self._state_lock:
+            self._refresh()
+            if not tokens or self._base is None:
+                return list()
+            scores = self._score(tokens)
+        return sorted(scores, key=lambda x: (-scores[x], -x))
+
+    def update(self, documents):
+        """Adds (or replaces) documents in the index"""
+        self._append([(x[0],) + get_term_frequencies(x[1:])
+                      for x in documents])
+
+    def remove(self, doc_ids):
+        """Removes documents from the index"""
+        self._append([(x, None, None) for x in doc_ids])
+
+    def build(self, documents):
+        """Builds the index from scratch with the given documents"""
+        docs = dict((x[0], get_term_frequencies(x[1:])) for x in documents)
+        with self._lock():
+            generation = self._read_generation() + 1
+            self._write(docs, generation)
+
+    # - Helper methods
+
+    def _score(self, tokens):
+        """Gets {doc_id: score} for the documents with all the tokens
+
+        Called with the state lock held.
+        """
+        n_docs, avg_len = self._get_stats()
+        scores = None
+        for token in tokens:
+            found = self._get_postings(token)
+            idf = math.log(1. + (n_docs - len(found) + .5) /
+                           (len(found) + .5))
+            if scores is not None:
+                found = dict((k, v) for k, v in found.items() if k in scores)
+            if not found:
+                return dict()
+
+            new_scores = dict()
+            for doc_id, (tf, length) in found.items():
+                norm = K1 * (1. - B + B * length / avg_len)
+                new_scores[doc_id] = (scores or {}).get(doc_id, 0.) + \
+                    idf * tf * (K1 + 1.) / (tf + norm)
+            scores = new_scores
+
+        return scores
+
+    @contextmanager
+    def _lock(self):
+        """Holds the (inter-process) lock for writing the index"""
+        os.makedirs(os.path.dirname(self._lock_path) or '.', exist_ok=True)
+        with open(self._lock_path, 'w') as fout:
+            fcntl.flock(fout, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fout, fcntl.LOCK_UN)
+
+    def _append(self, records):
+        """Appends records to the log, merging it into the index if large
+
+        Nothing is logged until the index has been built.
+        """
+        if not records:
+            return
+        with self._lock():
+            if not self.exists():
+                return
+            generation = self._read_generation()
+
+            with open(self._log_path, 'ab') as fout:
+                if fout.tell() == 0:
+                    fout.write(_LOG_HEADER.pack(_LOG_MAGIC, generation))
+                for record in records:
+                    data = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+                    fout.write(_RECORD.pack(len(data)) + data)
+                size = fout.tell()
+
+            if size > _MAX_LOG_SIZE:
+                self._merge(generation)
+
+    def _merge(self, generation):
+        """Merges the log into a new index file (with the lock held)"""
+        base = _load(self._index_path)[0]
+        docs = dict()
+        if base is not None:
+            for i in range(base.n_terms):
+                term = base.get_term(i)
+                for j in range(base.starts[i], base.starts[i + 1]):
+                    docno = base.docs[j]
+                    doc_id = base.doc_ids[docno]
+                    if doc_id not in docs:
+                        docs[doc_id] = (base.lengths[docno], dict())
+                    docs[doc_id][1][term] = base.tfs[j]
+            del base
+
+        for doc_id, length, tfs in _read_log(self._log_path, generation)[1]:
+            if length is None:
+                docs.pop(doc_id, None)
+            else:
+                docs[doc_id] = (length, tfs)
+
+        self._write(docs, generation + 1)
+
+    def _write(self, docs, generation):
+        """Writes a new index file and an empty log (with the lock held)"""
+        doc_ids = sorted(docs)
+        postings = defaultdict(list)
+        for docno, doc_id in enumerate(doc_ids):
+            for term, tf in docs[doc_id][1].items():
+                postings[term].append((docno, tf))
+
+        terms = sorted(x.encode('utf-8') for x in postings)
+        offsets = array('I', [0])
+        starts = array('I', [0])
+        posting_docs = array('i')
+        posting_tfs = array('f')
+        for term in terms:
+            for docno, tf in postings[term.decode('utf-8')]:
+                posting_docs.append(docno)
+                posting_tfs.append(tf)
+            offsets.append(offsets[-1] + len(term))
+            starts.append(len(posting_docs))
+
+        data = [
+            _HEADER.pack(_MAGIC, generation, len(doc_ids), len(terms),
+                         len(posting_docs), offsets[-1]),
+            array('i', doc_ids).tobytes(),
+            array('f', [docs[x][0] for x in doc_ids]).tobytes(),
+            offsets.tobytes(), starts.tobytes(), posting_docs.tobytes(),
+            posting_tfs.tobytes(), b''.join(terms),
+        ]
+        _replace_file(self._index_path, b''.join(data))
+        _replace_file(self._log_path,
+                      _LOG_HEADER.pack(_LOG_MAGIC, generation))
+
+    def _read_generation(self):
+        """Gets the generation of the current index file (0 if none)"""
+        try:
+            with open(self._index_path, 'rb') as fin:
+                return _HEADER.unpack(fin.read(_HEADER.size))[1]
+        except (OSError, struct.error):
+            return 0
+
+    def _refresh(self):
+        """Reloads the index file and replays the log if they've changed
+
+        Called with the state lock held.
+        """
+        base_key = _get_file_key(self._index_path)
+        if base_key != self._base_key:
+            self._base, self._base_key = _load(self._index_path)
+            self._log_key = None
+
+        if self._base is None:
+            return
+
+        log_key, records, self._log_pos = _read_log(
+            self._log_path, self._base.generation, self._log_key,
+            self._log_pos
+        )
+        if log_key != self._log_key:
+            self._log_key = log_key
+            self._overlay = dict()
+            self._overlay_terms = defaultdict(dict)
+
+        for doc_id, length, tfs in records:
+            old = self._overlay.get(doc_id)
+            if old is not None:
+                for term in old[1]:
+                    self._overlay_terms[term].pop(doc_id, None)
+            self._overlay[doc_id] = None if length is None else \
+                (length, tfs)
+            for term, tf in (tfs or {}).items():
+                self._overlay_terms[term][doc_id] = tf
+
+    def _get_stats(self):
+        """Gets the number of documents and their average length"""
+        base = self._base
+        n_docs, total = base.n_docs, base.total_length
+        for doc_id, entry in self._overlay.items():
+            docno = base.get_docno(doc_id)
+            if docno is not None:
+                n_docs -= 1
+                total -= base.lengths[docno]
+            if entry is not None:
+                n_docs += 1
+                total += entry[0]
+        return max(n_docs, 1), max(total / max(n_docs, 1), 1.)
+
+    def _get_postings(self, token):
+        """Gets {doc_id: (tf, length)} for the documents with a token"""
+        base = self._base
+        ret = dict()
+        i = base.find_term(token)
+        if i is not None:
+            for j in range(base.starts[i], base.starts[i + 1]):
+                docno = base.docs[j]
+                doc_id = base.doc_ids[docno]
+                if doc_id not in self._overlay:
+                    ret[doc_id] = (base.tfs[j], base.lengths[docno])
+        for doc_id, tf in self._overlay_terms.get(token, {}).items():
+            ret[doc_id] = (tf, self._overlay[doc_id][0])
+        return ret
+
+
+class _MappedIndex(object):
+    """
+    Read-only view of a memory mapped index file
+    """
+
+    def __init__(self, mapped):
+        self._mapped = mapped
+        _, self.generation, self.n_docs, self.n_terms, n_postings, \
+            n_bytes = _HEADER.unpack_from(mapped)
+
+        view = memoryview(mapped)
+        pos = _HEADER.size
+        arrays = list()
+        for code, length in (('i', self.n_docs), ('f', self.n_docs),
+                             ('I', self.n_terms + 1), ('I', self.n_terms + 1),
+                             ('i', n_postings), ('f', n_postings)):
+            arrays.append(view[pos:pos + 4 * length].cast(code))
+            pos += 4 * length
+        self.doc_ids, self.lengths, self.offsets, self.starts, self.docs, \
+            self.tfs = arrays
+        self.terms = view[pos:pos + n_bytes]
+
+        self.total_length = sum(self.lengths)
+        self._docnos = None
+
+    def get_term(self, i):
+        """Gets the i-th (sorted) term"""
+        return bytes(self.terms[self.offsets[i]:self.offsets[i + 1]])\
+            .decode('utf-8')
+
+    def find_term(self, term):
+        """Gets the number of a term, or None if it's not in the index"""
+        term = term.encode('utf-8')
+        i = bisect_left(_TermList(self), term)
+        if i < self.n_terms and self.terms[
+                self.offsets[i]:self.offsets[i + 1]] == term:
+            return i
+        return None
+
+    def get_docno(self, doc_id):
+        """Gets the number of a document, or None if it's not indexed"""
+        if self._docnos is None:
+            self._docnos = dict((x, i) for i, x in enumerate(self.doc_ids))
+        return self._docnos.get(doc_id)
+
+
+class _TermList(object):
+    """
+    Sequence of the (encoded) terms in a mapped index, for bisecting
+    """
+
+    def __init__(self, index):
+        self._index = index
+
+    def __len__(self):
+        return self._index.n_terms
+
+    def __getitem__(self, i):
+        index = self._index
+        return bytes(index.terms[index.offsets[i]:index.offsets[i + 1]])
+
+
+#
+#   Functions
+#
+
+def tokenize(text):
+    """Splits text into lowercase tokens, with plurals made singular"""
+    return [__stem(x) for x in _TOKEN_RE.findall(text.lower()) if len(x) > 1]
+
+
+def get_term_frequencies(fields):
+    """Gets the (weighted) length and term frequencies for a document"""
+    length = 0.
+    tfs = defaultdict(float)
+    for text, weight in zip(fields, FIELD_WEIGHTS):
+        tokens = tokenize(text or '')
+        length += weight * len(tokens)
+        for token in tokens:
+            tfs[token] += weight
+    return length, dict(tfs)
+
+
+#
+#   Helper Functions
+#
+
+def __stem(token):
+    """Helper function to (crudely) strip a plural 's' from a token"""
+    if len(token) > 3 and token.endswith('s') and \
+            not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+def _load(path):
+    """Helper function to memory map an index file"""
+    try:
+        with open(path, 'rb') as fin:
+            key = _get_file_key(fin.fileno())
+            mapped = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None, None
+
+    if mapped[:len(_MAGIC)] != _MAGIC:
+        return None, key
+    return _MappedIndex(mapped), key
+
+
+def _read_log(path, generation, key=None, pos=0):
+    """Helper function to read new (complete) records from a log
+
+    Returns the log's key, the records and the position to read any later
+    ones from.  Records are read from the start if the log isn't the one
+    with the given key (e.g. it's been replaced).
+    """
+    ret = list()
+    try:
+        with open(path, 'rb') as fin:
+            log_key = os.fstat(fin.fileno()).st_ino
+            if log_key != key:
+                pos = 0
+            if pos == 0:
+                header = fin.read(_LOG_HEADER.size)
+                if len(header) < _LOG_HEADER.size or \
+                        _LOG_HEADER.unpack(header) != (_LOG_MAGIC,
+                                                       generation):
+                    return None, ret, 0
+                pos = fin.tell()
+            fin.seek(pos)
+            data = fin.read()
+    except OSError:
+        return None, ret, 0
+
+    i = 0
+    while i + _RECORD.size <= len(data):
+        size = _RECORD.unpack_from(data, i)[0]
+        if i + _RECORD.size + size > len(data):
+            break
+        ret.append(pickle.loads(data[i + _RECORD.size:
+                                     i + _RECORD.size + size]))
+        i += _RECORD.size + size
+    return log_key, ret, pos + i
+
+
+def _get_file_key(path):
+    """Helper function to identify a version of an (unchanging) file"""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return info.st_ino, info.st_mtime_ns, info.st_size
+
+
+def _replace_file(path, data):
+    """Helper function to atomically replace a file's contents"""
+    tmp_path = '%s.tmp' % path
+    with open(tmp_path, 'wb') as fout:
+        fout.write(data)
+    os.replace(tmp_path, path)
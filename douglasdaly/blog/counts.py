@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Post counts for listings (all posts, per category, per tag and per
+author), maintained as posts change so paginators needn't count them.
+
+The counts per category, tag and author are also kept in their post_count
+columns, for showing (or hiding empty) entries without querying posts.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import uuid
+import hashlib
+
+from django.core.cache import caches
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Post, Category, Tag, Author
+
+
+#
+#   Variables
+#
+
+_CACHE_NAME = 'blog'
+_VERSION_KEY = 'counts:version'
+
+# - Counts are recounted this long after they last changed, in case they
+#   drifted (e.g. from a rolled back transaction or racing updates)
+_COUNT_TIMEOUT = 60 * 60
+_QUERY_COUNT_TIMEOUT = 60 * 5
+
+# - Models with post_count columns, by listing, and their Post lookups
+_COUNTED_MODELS = {
+    'category': (Category, 'category'),
+    'tag': (Tag, 'tags'),
+    'author': (Author, 'author'),
+}
+
+
+#
+#   Functions
+#
+
+def get_counts_cache():
+    """Gets the cache used for storing listing counts"""
+    return caches[_CACHE_NAME]
+
+
+def get_listing_count(listing, queryset):
+    """Gets the number of posts in a listing
+
+    The listing is the name of a maintained count (e.g. 'all' or
+    'tag:<id>') for the given queryset of its displayable posts.  Without
+    one, the queryset's count is briefly cached instead.
+    """
+    cache = get_counts_cache()
+    if listing is None:
+        key = 'count:query:%s' % hashlib.sha256(
+            str(queryset.query).encode('utf-8')
+        ).hexdigest()
+        timeout = _QUERY_COUNT_TIMEOUT
+    else:
+        key = __get_key(listing)
+        timeout = _COUNT_TIMEOUT
+
+    ret = cache.get(key)
+    if ret is None:
+        ret = queryset.count()
+        cache.add(key, ret, timeout)
+    return ret
+
+
+def get_post_listings(post_id):
+    """Gets the listings a post is currently counted in"""
+    found = Post.get_displayable().filter(pk=post_id)\
+        .values_list('category_id', 'author_id').first()
+    if found is None:
+        return set()
+
+    category_id, author_id = found
+    ret = {'all', 'category:%d' % category_id}
+    if author_id is not None:
+        ret.add('author:%d' % author_id)
+    ret.update('tag:%d' % x for x in Post.tags.through.objects
+               .filter(post_id=post_id).values_list('tag_id', flat=True))
+    return ret
+
+
+def update_listing_counts(before, after):
+    """Updates the counts for a post moving between sets of listings"""
+    cache = get_counts_cache()
+    for listing, delta in [(x, -1) for x in before - after] + \
+            [(x, 1) for x in after - before]:
+        key = __get_key(listing)
+        count = cache.get(key)
+        if count is not None:
+            cache.set(key, max(count + delta, 0), _COUNT_TIMEOUT)
+
+        kind, _, pk = listing.partition(':')
+        if kind in _COUNTED_MODELS:
+            model = _COUNTED_MODELS[kind][0]
+            model.objects.filter(pk=int(pk))\
+                .update(post_count=F('post_count') + delta)
+
+
+def recount_post_counts(model=None, pk=None):
+    """Recounts the post_count columns, with one query per model
+
+    Optionally just for the given model (Category, Tag or Author) and
+    instance of it.
+    """
+    for counted, lookup in _COUNTED_MODELS.values():
+        if model is not None and model is not counted:
+            continue
+
+        counts = Post.get_displayable()\
+            .filter(**{lookup: OuterRef('pk')}).order_by()\
+            .values(lookup).annotate(n=Count('pk')).values('n')
+        instances = counted.objects.all()
+        if pk is not None:
+            instances = instances.filter(pk=pk)
+        instances.update(post_count=Coalesce(
+            Subquery(counts, output_field=IntegerField()), 0
+        ))
+
+
+def clear_listing_counts():
+    """Removes every maintained count, so they're recounted on next use"""
+    get_counts_cache().set(_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+#
+#   Helper Functions
+#
+
+def __get_key(listing):
+    """Helper function to get the cache key for a listing's count"""
+    cache = get_counts_cache()
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        cache.add(_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(_VERSION_KEY)
+    return 'count:%s:%s' % (version, listing)
@@ -54,7 +54,7 @@ class LatestFeed(Feed):
         return "https://www.douglasdaly.com/"
 
     def items(self, obj):
-        return Post.get_displayable()
+        return Post.get_displayable(listing=True)
 
     def item_title(self, item):
         return item.title
@@ -116,7 +116,7 @@ class ListingFeed(Feed):
         pass
 
     def items(self):
-        return self._model.objects.all()
+        return self._model.objects.filter(post_count__gt=0)
 
     def item_title(self, item):
         return item.name
@@ -172,7 +172,7 @@ class AuthorListingFeed(ListingFeed):
 
     def items(self):
         if self._show_authors:
-            return self._model.get_displayable()
+            return self._model.get_displayable().filter(post_count__gt=0)
         return None
 
     def link(self):
@@ -215,6 +215,8 @@ class CategoryLatestFeed(LatestFeed):
         return "Latest posts in the {} category.".format(obj.name)
 
     def items(self, obj):
+        if not obj.post_count:
+            return []
         return super().items(obj).filter(category=obj)[:self._max_posts]
 
 
@@ -236,6 +238,8 @@ class TagLatestFeed(LatestFeed):
         return "Latest posts with the {} tag.".format(obj.name)
 
     def items(self, obj):
+        if not obj.post_count:
+            return []
         return super().items(obj).filter(tags=obj)[:self._max_posts]
 
 
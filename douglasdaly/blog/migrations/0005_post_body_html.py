@@ -0,0 +1,23 @@
+# Generated by Django 2.1.7 on 2026-10-18 05:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_auto_20190218_2137'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='body_html',
+            field=models.TextField(blank=True, default=None, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='body_html_version',
+            field=models.PositiveSmallIntegerField(blank=True, default=None, editable=False, null=True),
+        ),
+    ]
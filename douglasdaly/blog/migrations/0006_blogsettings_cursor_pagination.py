@@ -0,0 +1,18 @@
+# Generated by Django 2.1.7 on 2026-10-18 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_body_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogsettings',
+            name='cursor_pagination',
+            field=models.BooleanField(default=False, help_text='Page through listings by date rather than offset, which keeps later pages fast for large numbers of posts.', verbose_name='Cursor Pagination'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 2.1.7 on 2026-10-18 10:31
+
+from django.db import migrations, models
+
+
+def count_posts(apps, schema_editor):
+    """Counts the displayable posts of each category, tag and author"""
+    Post = apps.get_model('blog', 'Post')
+    displayable = Post.objects.filter(published=True)\
+        .exclude(author__is_active=False)
+
+    for model_name, lookup in (('Category', 'category'), ('Tag', 'tags'),
+                               ('Author', 'author')):
+        model = apps.get_model('blog', model_name)
+        counts = dict(displayable.order_by().values_list(lookup)
+                      .annotate(n=models.Count('pk')))
+        for pk, count in counts.items():
+            if pk is not None:
+                model.objects.filter(pk=pk).update(post_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_blogsettings_cursor_pagination'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Posts'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Posts'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Posts'),
+        ),
+        migrations.RunPython(count_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 2.1.7 on 2026-10-18 11:02
+
+from django.db import migrations
+
+
+# - Copied from blog.search as it was when this migration was written
+TABLE = 'blog_post_search'
+SEARCH_FIELDS = ('title', 'keywords', 'description', 'body')
+PG_CONFIG = 'english'
+PG_WEIGHTS = ('A', 'B', 'C', 'D')
+
+
+def has_fts5(connection):
+    """Whether or not SQLite was built with FTS5"""
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(x[0] == 'ENABLE_FTS5' for x in cursor.fetchall())
+
+
+def create_index(apps, schema_editor):
+    """Creates the full-text search index and indexes existing posts"""
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE TABLE %s (post_id integer PRIMARY KEY REFERENCES '
+            'blog_post (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+            'document tsvector NOT NULL)' % TABLE
+        )
+        schema_editor.execute('CREATE INDEX %s_document ON %s USING gin '
+                              '(document)' % (TABLE, TABLE))
+        vector = ' || '.join(
+            "setweight(to_tsvector('%s', %%s), '%s')" % (PG_CONFIG, x)
+            for x in PG_WEIGHTS
+        )
+        sql = 'INSERT INTO %s (post_id, document) VALUES (%%s, %s)' % (
+            TABLE, vector
+        )
+    elif connection.vendor == 'sqlite' and has_fts5(connection):
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE %s USING fts5(%s, tokenize = 'porter "
+            "unicode61')" % (TABLE, ', '.join(SEARCH_FIELDS))
+        )
+        sql = 'INSERT INTO %s (rowid, %s) VALUES (%s)' % (
+            TABLE, ', '.join(SEARCH_FIELDS),
+            ', '.join(['%s'] * (len(SEARCH_FIELDS) + 1))
+        )
+    else:
+        return
+
+    Post = apps.get_model('blog', 'Post')
+    documents = list()
+    for post in Post.objects.select_related('category')\
+            .prefetch_related('tags'):
+        keywords = list(post.search_terms or ())
+        keywords.extend(x.name for x in post.tags.all())
+        keywords.append(post.category.name)
+        documents.append((post.pk, post.title or '', ' '.join(keywords),
+                          post.description or '', post.body or ''))
+
+    if documents:
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, documents)
+
+
+def drop_index(apps, schema_editor):
+    """Drops the full-text search index"""
+    if TABLE in schema_editor.connection.introspection.table_names():
+        schema_editor.execute('DROP TABLE %s' % TABLE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
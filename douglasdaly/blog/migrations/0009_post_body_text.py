@@ -0,0 +1,153 @@
+# Generated by Django 2.1.7 on 2026-10-18 11:40
+
+import re
+import json
+from html.parser import HTMLParser
+
+from django.db import migrations, models
+
+
+# - Copied from douglasdaly.markdown, blog.snippets and blog.search as they
+#   were when this migration was written
+MATH_RE = re.compile(r'\$\$.+?\$\$|\\\(.+?\\\)|\\\[.+?\\\]|'
+                     r'\\begin\{([^}]+)\}.+?\\end\{\1\}', re.S)
+WORD_RE = re.compile(r'\w+')
+MAX_OFFSETS = 5
+
+TABLE = 'blog_post_search'
+SEARCH_FIELDS = ('title', 'keywords', 'description', 'body')
+PG_CONFIG = 'english'
+PG_WEIGHTS = ('A', 'B', 'C', 'D')
+
+
+class PlainTextParser(HTMLParser):
+    """
+    Collects the text of rendered markdown, without code, scripts or
+    styles
+    """
+    SKIPPED_TAGS = ('pre', 'code', 'script', 'style')
+    BLOCK_TAGS = ('p', 'div', 'br', 'li', 'tr', 'td', 'th', 'blockquote',
+                  'h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+    def __init__(self):
+        super().__init__()
+        self.parts = list()
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self._skipping = max(self._skipping - 1, 0)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def html_to_plain_text(value):
+    """Gets the plain text of rendered markdown, on a single line"""
+    parser = PlainTextParser()
+    parser.feed(value or '')
+    parser.close()
+    text = MATH_RE.sub(' ', ''.join(parser.parts))
+    return ' '.join(text.split())
+
+
+def tokenize(text):
+    """Splits text into lowercase tokens, with plurals made singular"""
+    ret = list()
+    for token in WORD_RE.findall(text.lower()):
+        if len(token) < 2:
+            continue
+        if len(token) > 3 and token.endswith('s') and \
+                not token.endswith(('ss', 'us', 'is')):
+            token = token[:-1]
+        ret.append(token)
+    return ret
+
+
+def get_term_offsets(text):
+    """Gets the offsets of the first few occurrences of each term in text"""
+    ret = dict()
+    for match in WORD_RE.finditer(text or ''):
+        for token in tokenize(match.group()):
+            offsets = ret.setdefault(token, list())
+            if len(offsets) < MAX_OFFSETS:
+                offsets.append(match.start())
+    return json.dumps(ret, separators=(',', ':'))
+
+
+def store_body_text(apps, schema_editor):
+    """Stores the plain text of rendered posts and re-indexes them
+
+    Posts which haven't been rendered yet get theirs when they are.
+    """
+    Post = apps.get_model('blog', 'Post')
+    for post in Post.objects.exclude(body_html=None).only('body_html'):
+        body_text = html_to_plain_text(post.body_html)
+        Post.objects.filter(pk=post.pk).update(
+            body_text=body_text, body_text_offsets=get_term_offsets(body_text)
+        )
+
+    connection = schema_editor.connection
+    if connection.vendor not in ('postgresql', 'sqlite') or \
+            TABLE not in connection.introspection.table_names():
+        return
+
+    documents = list()
+    for post in Post.objects.select_related('category')\
+            .prefetch_related('tags'):
+        keywords = list(post.search_terms or ())
+        keywords.extend(x.name for x in post.tags.all())
+        keywords.append(post.category.name)
+        body = post.body if post.body_text is None else post.body_text
+        documents.append((post.pk, post.title or '', ' '.join(keywords),
+                          post.description or '', body or ''))
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            vector = ' || '.join(
+                "setweight(to_tsvector('%s', %%s), '%s')" % (PG_CONFIG, x)
+                for x in PG_WEIGHTS
+            )
+            cursor.executemany(
+                'INSERT INTO %s (post_id, document) VALUES (%%s, %s) '
+                'ON CONFLICT (post_id) DO UPDATE SET document = '
+                'EXCLUDED.document' % (TABLE, vector), documents
+            )
+        else:
+            cursor.execute('DELETE FROM %s' % TABLE)
+            cursor.executemany(
+                'INSERT INTO %s (rowid, %s) VALUES (%s)' % (
+                    TABLE, ', '.join(SEARCH_FIELDS),
+                    ', '.join(['%s'] * (len(SEARCH_FIELDS) + 1))
+                ), documents
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='body_text',
+            field=models.TextField(blank=True, default=None, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='body_text_offsets',
+            field=models.TextField(blank=True, default=None, editable=False, null=True),
+        ),
+        migrations.RunPython(store_body_text, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.1.7 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_body_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='body_is_fallback',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -20,7 +20,16 @@ from django.contrib.auth.models import User
 from sorl.thumbnail import ImageField
 from colorful.fields import RGBColorField
 
+from assets.thumbnails import (ThumbnailRequest,
+                               get_markdown_thumbnail_requests)
+from douglasdaly.markdown import (
+    RENDERER_VERSION, RenderLimitExceeded, render_markdown,
+    render_plain_text, html_to_plain_text
+)
+from douglasdaly.singletons import load_singleton
+
 from .fields import ListField
+from .snippets import get_term_offsets, get_snippet
 
 
 #
@@ -58,6 +67,11 @@ class BlogSettings(models.Model):
                                        verbose_name='Show Authors')
 
     posts_per_page = models.PositiveIntegerField(blank=False, default=10)
+    cursor_pagination = models.BooleanField(
+        default=False, verbose_name='Cursor Pagination',
+        help_text='Page through listings by date rather than offset, which '
+                  'keeps later pages fast for large numbers of posts.'
+    )
     latest_feed_most_recent = models.PositiveSmallIntegerField(
         null=False, default=5, verbose_name="Posts in Most Recent"
     )
@@ -96,9 +110,7 @@ class BlogSettings(models.Model):
         """ Loads the Singleton Instance or returns None
         """
         try:
-            obj = cls.objects.get(pk=1)
-        except cls.DoesNotExist:
-            obj = None
+            obj = load_singleton(cls)
         except OperationalError:
             obj = None
         except ProgrammingError:
@@ -122,6 +134,9 @@ class Category(models.Model):
 
     search_terms = ListField(null=True, blank=True, default=None)
 
+    post_count = models.PositiveIntegerField(default=0, editable=False,
+                                             verbose_name='Posts')
+
     # - Meta class and dunder methods
 
     class Meta:
@@ -159,6 +174,9 @@ class Tag(models.Model):
 
     _category = models.CharField(max_length=1, null=False)
 
+    post_count = models.PositiveIntegerField(default=0, editable=False,
+                                             verbose_name='Posts')
+
     # - Meta classes and dunder methods
 
     class Meta:
@@ -274,6 +292,9 @@ class Author(models.Model):
     is_active = models.BooleanField(default=True, verbose_name="Active")
     show_posts = models.BooleanField(default=True, verbose_name="Show Posts")
 
+    post_count = models.PositiveIntegerField(default=0, editable=False,
+                                             verbose_name='Posts')
+
     # - Meta class and dunder methods
 
     class Meta:
@@ -324,7 +345,7 @@ class Author(models.Model):
     def save(self, *args, **kwargs):
         """Override save to change author's posts on certain events"""
         if self.pk is not None:
-            curr = Author.get(pk=self.pk)
+            curr = Author.objects.get(pk=self.pk)
             if not self.is_active or (not self.show_posts and
                                       curr.show_posts != self.show_posts):
                 auth_posts = self.get_all_posts(displayed=False)
@@ -352,6 +373,16 @@ class Post(models.Model):
 
     description = models.TextField(default="", null=True)
     body = models.TextField()
+    body_html = models.TextField(null=True, blank=True, default=None,
+                                 editable=False)
+    body_html_version = models.PositiveSmallIntegerField(
+        null=True, blank=True, default=None, editable=False
+    )
+    body_is_fallback = models.BooleanField(default=False, editable=False)
+    body_text = models.TextField(null=True, blank=True, default=None,
+                                 editable=False)
+    body_text_offsets = models.TextField(null=True, blank=True, default=None,
+                                         editable=False)
 
     search_terms = ListField(null=True, blank=True, default=None,
                              verbose_name="Search Terms")
@@ -381,6 +412,12 @@ class Post(models.Model):
     previewable = models.BooleanField(default=False, verbose_name='Preview')
     published = models.BooleanField(default=False, verbose_name='Publish')
 
+    # Icon thumbnails used by post_display.html and the home page
+    ICON_THUMBNAILS = (
+        ('100x100', {'crop': 'center'}),
+        ('300x300', {'crop': 'center'}),
+    )
+
     # - Meta class and dunder methods
 
     class Meta:
@@ -395,12 +432,69 @@ class Post(models.Model):
     # - Class methods
 
     @classmethod
-    def get_displayable(cls, previews=False):
-        """Gets displayable posts"""
+    def get_displayable(cls, previews=False, listing=False):
+        """Gets displayable posts
+
+        For listings the author and category are joined and the tags are
+        prefetched, so a page of posts takes the same number of queries
+        however many posts are on it.
+        """
         qry = models.Q(published=True)
         if previews:
             qry |= models.Q(previewable=True)
-        return cls.objects.filter(qry).exclude(author__is_active=False)
+        ret = cls.objects.filter(qry).exclude(author__is_active=False)
+        if listing:
+            ret = ret.select_related('author', 'category')\
+                .prefetch_related('tags')
+        return ret
+
+    # - Methods
+
+    def get_rendered_body(self):
+        """Gets the rendered HTML body, re-rendering it if out of date"""
+        if self.body_html_version != RENDERER_VERSION:
+            self.render_body()
+            if self.pk is not None:
+                Post.objects.filter(pk=self.pk).update(
+                    body_html=self.body_html,
+                    body_html_version=self.body_html_version,
+                    body_is_fallback=self.body_is_fallback,
+                    body_text=self.body_text,
+                    body_text_offsets=self.body_text_offsets
+                )
+        return self.body_html
+
+    def render_body(self):
+        """Renders the markdown body to HTML and stores the result
+
+        Along with its plain text (for search snippets) and the offsets of
+        the terms in it.  If it can't be rendered within the render budget
+        it's stored as plain text, which is kept (rather than re-rendered
+        when shown) until the post is saved again or rendered with the
+        render_markdown command.
+        """
+        try:
+            self.body_html = render_markdown(self.body, fallback=False)
+            self.body_is_fallback = False
+        except RenderLimitExceeded:
+            self.body_html = render_plain_text(self.body)
+            self.body_is_fallback = True
+        self.body_html_version = RENDERER_VERSION
+        self.body_text = html_to_plain_text(self.body_html)
+        self.body_text_offsets = get_term_offsets(self.body_text)
+
+    def get_snippet(self, terms):
+        """Gets a snippet of the body with the search terms highlighted"""
+        return get_snippet(self.body_text, self.body_text_offsets, terms)
+
+    def get_thumbnail_requests(self):
+        """Gets all the thumbnails needed to display this post"""
+        ret = get_markdown_thumbnail_requests(self.body)
+        if self.icon_image:
+            for geometry, options in self.ICON_THUMBNAILS:
+                ret.append(ThumbnailRequest.create(self, 'icon_image',
+                                                   geometry, **options))
+        return ret
 
     # - Helper methods
 
@@ -432,4 +526,6 @@ class Post(models.Model):
             if self.published:
                 self.posted = datetime.now()
 
+        self.render_body()
+
         super().save(*args, **kwargs)
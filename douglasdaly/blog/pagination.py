@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Pagination for post listings, including cursor (keyset) pagination on
+(display_date, id).
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from math import ceil
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .counts import get_listing_count
+
+
+#
+#   Variables
+#
+
+PAGE_PARAM = 'page'
+AFTER_PARAM = 'after'
+BEFORE_PARAM = 'before'
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+#
+#   Classes
+#
+
+class ListingPaginator(Paginator):
+    """
+    Paginator for a listing of posts which gets its total from the
+    listing's maintained count (see blog.counts) rather than counting
+    """
+
+    def __init__(self, object_list, per_page, listing=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.listing = listing
+
+    @cached_property
+    def count(self):
+        """int: Total number of posts (possibly slightly out of date)"""
+        return get_listing_count(self.listing, self.object_list)
+
+
+class CursorPaginator(object):
+    """
+    Paginator for posts ordered by (display_date, id), newest first, which
+    pages through them by cursor rather than offset
+
+    The total (for the numbered page strip) comes from the listing's
+    maintained count (see blog.counts), so it may be slightly out of date.
+    """
+
+    def __init__(self, object_list, per_page, listing=None):
+        self.object_list = object_list.order_by('-display_date', '-id')
+        self.per_page = int(per_page)
+        self.listing = listing
+        self._num_pages = None
+
+    @cached_property
+    def count(self):
+        """int: Total number of posts (possibly slightly out of date)"""
+        return get_listing_count(self.listing, self.object_list)
+
+    @property
+    def num_pages(self):
+        """int: Total number of pages"""
+        if self._num_pages is None:
+            self._num_pages = max(int(ceil(self.count / self.per_page)), 1)
+        return self._num_pages
+
+    def get_page(self, number=None, after=None, before=None):
+        """Gets the page after (or before) the given cursor
+
+        Without a cursor the page is found by its number (and offset)
+        instead, as from the numbered page strip.
+        """
+        number = _to_page_number(number)
+        after = decode_cursor(after)
+        before = decode_cursor(before)
+
+        n_fetch = self.per_page + 1
+        if after is not None:
+            posts = list(self.object_list.filter(
+                _cursor_query('lt', *after)
+            )[:n_fetch])
+            has_previous = True
+            has_next = len(posts) > self.per_page
+            posts = posts[:self.per_page]
+            number = max(number, 2)
+        elif before is not None:
+            posts = list(self.object_list.filter(
+                _cursor_query('gt', *before)
+            ).reverse()[:n_fetch])
+            has_previous = len(posts) > self.per_page
+            has_next = True
+            posts = posts[:self.per_page][::-1]
+            number = max(number, 2) if has_previous else 1
+        else:
+            number = min(number, self.num_pages)
+            offset = (number - 1) * self.per_page
+            posts = list(self.object_list[offset:offset + n_fetch])
+            has_previous = number > 1
+            has_next = len(posts) > self.per_page
+            posts = posts[:self.per_page]
+
+        # - Keep the (cached) total consistent with what was found
+        if not has_next:
+            self._num_pages = number
+        elif self.num_pages <= number:
+            self._num_pages = number + 1
+
+        return CursorPage(posts, number, self, has_previous, has_next)
+
+
+class CursorPage(Sequence):
+    """
+    Page of posts from a CursorPaginator, usable as a Django Page
+    """
+
+    def __init__(self, object_list, number, paginator, has_previous,
+                 has_next):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return '<Page %s of %s>' % (self.number, self.paginator.num_pages)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def get_next_params(self):
+        """Gets the query parameters for the next page"""
+        return {
+            PAGE_PARAM: self.next_page_number(),
+            AFTER_PARAM: encode_cursor(self.object_list[-1]),
+        }
+
+    def get_previous_params(self):
+        """Gets the query parameters for the previous page"""
+        if self.number <= 2:
+            return {PAGE_PARAM: 1}
+        return {
+            PAGE_PARAM: self.previous_page_number(),
+            BEFORE_PARAM: encode_cursor(self.object_list[0]),
+        }
+
+
+#
+#   Functions
+#
+
+def get_post_page(post_list, request, per_page, cursor=False, listing=None):
+    """Gets the requested page of posts
+
+    With cursor pagination the previous/next pages are found from the
+    (display_date, id) of the posts at either end of the current page.  The
+    listing names the maintained count of the posts, if there is one.
+    """
+    params = request.GET
+    if cursor:
+        return CursorPaginator(post_list, per_page, listing=listing)\
+            .get_page(params.get(PAGE_PARAM), params.get(AFTER_PARAM),
+                      params.get(BEFORE_PARAM))
+    return ListingPaginator(post_list, per_page, listing=listing)\
+        .get_page(params.get(PAGE_PARAM))
+
+
+def get_ranked_page(post_list, post_ids, request, per_page):
+    """Gets the requested page of posts from a ranked list of their ids
+
+    Only the posts on the page are fetched (from post_list), in rank order.
+    """
+    ret = Paginator(post_ids, per_page).get_page(request.GET.get(PAGE_PARAM))
+    posts = post_list.in_bulk(ret.object_list)
+    ret.object_list = [posts[x] for x in ret.object_list if x in posts]
+    return ret
+
+
+def get_page_params(page):
+    """Gets the query parameters for the previous and next pages"""
+    previous_params = next_params = None
+    if page.has_previous():
+        if hasattr(page, 'get_previous_params'):
+            previous_params = page.get_previous_params()
+        else:
+            previous_params = {PAGE_PARAM: page.previous_page_number()}
+    if page.has_next():
+        if hasattr(page, 'get_next_params'):
+            next_params = page.get_next_params()
+        else:
+            next_params = {PAGE_PARAM: page.next_page_number()}
+    return previous_params, next_params
+
+
+def encode_cursor(post):
+    """Encodes the cursor for a post"""
+    delta = post.display_date - _EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 10 ** 6 + \
+        delta.microseconds
+    return '%d.%d' % (micros, post.id)
+
+
+def decode_cursor(cursor):
+    """Decodes a cursor to its (display_date, id), or None if invalid"""
+    try:
+        micros, post_id = (int(x) for x in cursor.split('.'))
+        return _EPOCH + timedelta(microseconds=micros), post_id
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+#
+#   Helper Functions
+#
+
+def _to_page_number(number):
+    """Helper function to get a valid page number"""
+    try:
+        return max(int(number), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def _cursor_query(lookup, display_date, post_id):
+    """Helper function to get the posts either side of a cursor"""
+    return Q(**{'display_date__%s' % lookup: display_date}) | \
+        Q(display_date=display_date, **{'id__%s' % lookup: post_id})
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+Full-text search index for posts, using a weighted tsvector (with a GIN
+index) on PostgreSQL and an FTS5 table on SQLite, or the in-process BM25
+index (see blog.bm25) with the 'bm25' BLOG_SEARCH_BACKEND.
+
+Each worker also keeps the ranked results of recent searches in an LRU
+cache, invalidated whenever the index is updated.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import time
+import uuid
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+from .bm25 import BM25Index, tokenize
+from .models import Post
+
+
+#
+#   Variables
+#
+
+# - Indexed fields, from most to least important: the title, keywords
+#   (search terms, tags and category), description and body
+SEARCH_FIELDS = ('title', 'keywords', 'description', 'body')
+
+_TABLE = 'blog_post_search'
+_PG_CONFIG = 'english'
+_PG_WEIGHTS = ('A', 'B', 'C', 'D')
+_SQLITE_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+_available = dict()
+_bm25_indexes = dict()
+
+_CACHE_NAME = 'blog'
+_RESULTS_VERSION_KEY = 'search:version'
+_DEFAULT_RESULTS_SIZE = 256
+
+# - Cached results are also dropped after this long, for posts becoming
+#   displayable (i.e. reaching their publish date) without being saved
+_RESULTS_TIMEOUT = 60 * 5
+
+_results = OrderedDict()
+_results_lock = threading.Lock()
+
+
+#
+#   Functions
+#
+
+def get_search_backend():
+    """Gets the search backend to use ('database' or 'bm25')"""
+    return getattr(settings, 'BLOG_SEARCH_BACKEND', 'database')
+
+
+def get_bm25_index():
+    """Gets this worker's instance of the in-process BM25 index"""
+    path = settings.BLOG_SEARCH_INDEX
+    if path not in _bm25_indexes:
+        _bm25_indexes[path] = BM25Index(path)
+    return _bm25_indexes[path]
+
+
+def is_search_index_available(using=connection):
+    """Whether or not the database has a full-text search index"""
+    if using.alias not in _available:
+        _available[using.alias] = \
+            using.vendor in ('postgresql', 'sqlite') and \
+            _TABLE in using.introspection.table_names()
+    return _available[using.alias]
+
+
+def index_documents(documents, using=connection):
+    """Adds (or replaces) documents in the search index
+
+    Each document is a tuple of a post's id and the text of each of the
+    SEARCH_FIELDS.
+    """
+    documents = list(documents)
+    if not documents:
+        return
+
+    with using.cursor() as cursor:
+        if using.vendor == 'postgresql':
+            vector = ' || '.join(
+                "setweight(to_tsvector('%s', %%s), '%s')" % (_PG_CONFIG, x)
+                for x in _PG_WEIGHTS
+            )
+            cursor.executemany(
+                'INSERT INTO %s (post_id, document) VALUES (%%s, %s) '
+                'ON CONFLICT (post_id) DO UPDATE SET document = '
+                'EXCLUDED.document' % (_TABLE, vector), documents
+            )
+        else:
+            __delete(cursor, [x[0] for x in documents])
+            cursor.executemany(
+                'INSERT INTO %s (rowid, %s) VALUES (%s)' % (
+                    _TABLE, ', '.join(SEARCH_FIELDS),
+                    ', '.join(['%s'] * (len(SEARCH_FIELDS) + 1))
+                ), documents
+            )
+
+
+def get_search_documents(posts):
+    """Gets the search index documents for the given posts
+
+    Bodies are indexed by their plain text (without markdown, code or
+    math), or the markdown if they haven't been rendered yet.
+    """
+    for post in posts:
+        keywords = list(post.search_terms or ())
+        keywords.extend(x.name for x in post.tags.all())
+        keywords.append(post.category.name)
+        body = post.body if post.body_text is None else post.body_text
+        yield (post.pk, post.title or '', ' '.join(keywords),
+               post.description or '', body or '')
+
+
+def update_search_index(post_ids):
+    """Updates the search index for the given posts"""
+    clear_search_results()
+    use_bm25 = get_search_backend() == 'bm25'
+    if not is_search_index_available() and not use_bm25:
+        return
+    post_ids = set(post_ids)
+    posts = Post.objects.filter(pk__in=post_ids)\
+        .select_related('category').prefetch_related('tags')
+    documents = list(get_search_documents(posts))
+    if is_search_index_available():
+        index_documents(documents)
+    if use_bm25:
+        get_bm25_index().update(documents)
+
+    removed = post_ids - set(x.pk for x in posts)
+    if removed:
+        remove_from_search_index(removed)
+
+
+def remove_from_search_index(post_ids):
+    """Removes the given posts from the search index"""
+    clear_search_results()
+    if get_search_backend() == 'bm25':
+        get_bm25_index().remove(post_ids)
+    if not is_search_index_available():
+        return
+    with connection.cursor() as cursor:
+        __delete(cursor, list(post_ids))
+
+
+def rebuild_search_index():
+    """Rebuilds the search index for all posts"""
+    clear_search_results()
+    use_bm25 = get_search_backend() == 'bm25'
+    if not is_search_index_available() and not use_bm25:
+        return
+    posts = Post.objects.select_related('category').prefetch_related('tags')
+    documents = list(get_search_documents(posts))
+    if use_bm25:
+        get_bm25_index().build(documents)
+    if not is_search_index_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM %s' % _TABLE)
+    index_documents(documents)
+
+
+def search_post_ids(terms):
+    """Gets the ids of displayable posts matching all the terms, best first
+
+    Returns None if there's no search index to use.
+    """
+    if get_search_backend() == 'bm25':
+        return __search_bm25(terms)
+    if not is_search_index_available():
+        return None
+    terms = [x for x in terms if x]
+    if not terms:
+        return list()
+
+    displayable, params = Post.get_displayable().values('pk').query\
+        .sql_with_params()
+    if connection.vendor == 'postgresql':
+        sql = (
+            "SELECT s.post_id FROM %s s, plainto_tsquery('%s', %%s) q "
+            "WHERE s.document @@ q AND s.post_id IN (%s) "
+            "ORDER BY ts_rank(s.document, q) DESC, s.post_id DESC"
+        ) % (_TABLE, _PG_CONFIG, displayable)
+        params = (' '.join(terms),) + params
+    else:
+        sql = (
+            "SELECT rowid FROM %s WHERE %s MATCH %%s AND rowid IN (%s) "
+            "ORDER BY bm25(%s, %s), rowid DESC"
+        ) % (_TABLE, _TABLE, displayable, _TABLE,
+             ', '.join(str(x) for x in _SQLITE_WEIGHTS))
+        params = (' '.join('"%s"' % x.replace('"', '""')
+                           for x in terms),) + params
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [x[0] for x in cursor.fetchall()]
+
+
+def get_search_key(terms):
+    """Gets the canonical form of search terms (lowercase, sorted)"""
+    return tuple(sorted(set(x.lower() for x in terms if x)))
+
+
+def get_cached_search(terms, search):
+    """Gets the ranked post ids for search terms, using cached results
+
+    On a miss search(terms) is called with the canonical terms, and the ids
+    it returns are cached for every page of the results.
+    """
+    key = get_search_key(terms)
+    version = __get_results_version()
+    now = time.monotonic()
+    with _results_lock:
+        found = _results.get(key)
+        if found is not None and found[0] == version and \
+                now - found[1] < _RESULTS_TIMEOUT:
+            _results.move_to_end(key)
+            return found[2]
+
+    ret = tuple(search(list(key)))
+    size = getattr(settings, 'BLOG_SEARCH_CACHE_SIZE', _DEFAULT_RESULTS_SIZE)
+    with _results_lock:
+        _results[key] = (version, now, ret)
+        _results.move_to_end(key)
+        while len(_results) > size:
+            _results.popitem(last=False)
+    return ret
+
+
+def clear_search_results():
+    """Invalidates every worker's cached search results"""
+    caches[_CACHE_NAME].set(_RESULTS_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+#
+#   Helper Functions
+#
+
+def __get_results_version():
+    """Helper function to get the current version of search results"""
+    cache = caches[_CACHE_NAME]
+    ret = cache.get(_RESULTS_VERSION_KEY)
+    if ret is None:
+        cache.add(_RESULTS_VERSION_KEY, uuid.uuid4().hex, None)
+        ret = cache.get(_RESULTS_VERSION_KEY)
+    return ret
+
+
+def __search_bm25(terms):
+    """Helper function to search the in-process BM25 index
+
+    Returns None if it hasn't been built (with the rebuild_search_index
+    command), so the database is searched instead.
+    """
+    index = get_bm25_index()
+    if not index.exists():
+        return None
+
+    post_ids = index.search(tokenize(' '.join(terms)))
+    if not post_ids:
+        return post_ids
+    displayable = set(Post.get_displayable().filter(pk__in=post_ids)
+                      .values_list('pk', flat=True))
+    return [x for x in post_ids if x in displayable]
+
+
+def __delete(cursor, post_ids):
+    """Helper function to delete posts from the search index"""
+    if cursor.db.vendor == 'postgresql':
+        column = 'post_id'
+    else:
+        column = 'rowid'
+    cursor.executemany('DELETE FROM %s WHERE %s = %%s' % (_TABLE, column),
+                       [(x,) for x in post_ids])
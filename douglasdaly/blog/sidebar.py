@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Precomputed sidebar navigation for the blog.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import uuid
+from collections import namedtuple
+from itertools import groupby
+from operator import itemgetter
+
+from django.db.models import Q
+from django.utils.timezone import localtime
+from django.core.cache import caches
+
+from .models import Post, Tag
+from .utils import get_slug_url_builder
+
+
+#
+#   Variables
+#
+
+SIDEBAR_MODES = ('date', 'categories', 'tags', 'authors')
+
+SidebarHeading = namedtuple('SidebarHeading', ('name', 'slug'))
+
+_CACHE_NAME = 'blog'
+_CACHE_KEY = 'sidebar:v2:%s'
+_VERSION_KEY = 'sidebar:version'
+
+# - Indexes are stored under the version current when their build started,
+#   so one built from data read before an invalidation is never used after
+#   it, and outdated indexes expire after this long
+_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+#
+#   Functions
+#
+
+def get_sidebar_cache():
+    """Gets the cache used for storing the sidebar index"""
+    return caches[_CACHE_NAME]
+
+
+def get_sidebar_index():
+    """Gets the sidebar structures for every mode, building them if needed
+
+    The index maps each mode to a list of (heading, [(title, url), ...])
+    entries and is only rebuilt after a post, tag, category or author
+    changes (see blog.signals).
+    """
+    cache = get_sidebar_cache()
+    key = _CACHE_KEY % __get_version(cache)
+    ret = cache.get(key)
+    if ret is None:
+        ret = build_sidebar_index()
+        cache.add(key, ret, _CACHE_TIMEOUT)
+    return ret
+
+
+def build_sidebar_index():
+    """Builds the sidebar structures for every mode from the database
+
+    Each mode takes a single ordered query for just the columns it shows,
+    which is grouped here, so the cost is one query per mode however many
+    posts there are.
+    """
+    return {
+        'date': __build_date(),
+        'categories': __build_categories(),
+        'tags': __build_tags(),
+        'authors': __build_authors(),
+    }
+
+
+def invalidate_sidebar_index():
+    """Outdates the cached sidebar index so it's rebuilt on next use"""
+    get_sidebar_cache().set(_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+#
+#   Helper Functions
+#
+
+def __get_version(cache):
+    """Helper function to get the current version of the index"""
+    ret = cache.get(_VERSION_KEY)
+    if ret is None:
+        cache.add(_VERSION_KEY, uuid.uuid4().hex, None)
+        ret = cache.get(_VERSION_KEY)
+    return ret
+
+
+def __group(rows, key, get_heading, get_link):
+    """Helper function to group ordered rows into (heading, links) lists"""
+    ret = list()
+    for _, group in groupby(rows, key=key):
+        group = list(group)
+        ret.append((get_heading(group[0]), [get_link(x) for x in group]))
+    return ret
+
+
+def __build_date():
+    """Helper function to get all posts by year"""
+    post_url = get_slug_url_builder('view_blog_post')
+    rows = Post.get_displayable().order_by('-display_date')\
+        .values_list('display_date', 'title', 'slug')
+    rows = [(localtime(d).year, title, slug) for d, title, slug in rows]
+
+    return __group(
+        rows, itemgetter(0),
+        lambda x: SidebarHeading(str(x[0]), 'Y%s' % x[0]),
+        lambda x: (x[1], post_url(x[2]))
+    )
+
+
+def __build_categories():
+    """Helper function to get all posts by category"""
+    post_url = get_slug_url_builder('view_blog_post')
+    rows = Post.get_displayable()\
+        .order_by('category__name', 'category_id', 'title')\
+        .values_list('category_id', 'category__name', 'category__slug',
+                     'title', 'slug')
+
+    return __group(
+        rows, itemgetter(0),
+        lambda x: SidebarHeading(x[1], x[2]),
+        lambda x: (x[3], post_url(x[4]))
+    )
+
+
+def __build_tags():
+    """Helper function to get all tags (with posts) by first letter"""
+    tag_url = get_slug_url_builder('view_blog_tag')
+    rows = Tag.objects.filter(post_count__gt=0)\
+        .order_by('_category', 'name', 'id')\
+        .values_list('_category', 'name', 'slug', 'id')
+
+    return __group(
+        rows, itemgetter(0),
+        itemgetter(0),
+        lambda x: (x[1], tag_url(x[2]))
+    )
+
+
+def __build_authors():
+    """Helper function to get all posts by author"""
+    post_url = get_slug_url_builder('view_blog_post')
+
+    # - Same posts as Author.get_all_posts for each displayable author
+    rows = Post.objects\
+        .filter(author__is_active=True)\
+        .filter(Q(published=True) | Q(author__show_posts=False))\
+        .order_by('author__display_name', 'author__last_name',
+                  'author__first_name', 'author_id', '-display_date')\
+        .values_list('author_id', 'author__display_name',
+                     'author__first_name', 'author__last_name', 'title',
+                     'slug')
+
+    return __group(
+        rows, itemgetter(0),
+        lambda x: x[1] or ' '.join(y for y in x[2:4] if y),
+        lambda x: (x[4], post_url(x[5]))
+    )
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Signal handlers for the blog application.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+from django.db import transaction
+from django.db.models.signals import (
+    pre_save, post_save, pre_delete, post_delete, m2m_changed
+)
+from django.dispatch import receiver
+
+from assets.thumbnails import pregenerate_thumbnails
+from douglasdaly.page_cache import (
+    purge_cache_tags, remember_fields, get_remembered_fields
+)
+
+from .autocomplete import invalidate_autocomplete_index
+from .counts import (
+    get_post_listings, update_listing_counts, recount_post_counts,
+    clear_listing_counts
+)
+from .models import Post, Category, Tag, Author, CustomJS, CustomCSS
+from .search import (
+    update_search_index, remove_from_search_index, rebuild_search_index
+)
+from .sidebar import invalidate_sidebar_index
+
+
+#
+#   Variables
+#
+
+# - Fields shown in the sidebar (and post listings) for each model
+_SIDEBAR_FIELDS = {
+    Post: ('title', 'slug', 'published', 'display_date', 'category_id',
+           'author_id'),
+    Category: ('name', 'slug'),
+    Tag: ('name', 'slug'),
+    Author: ('slug', 'display_name', 'first_name', 'last_name', 'is_active',
+             'show_posts'),
+}
+
+# - Prefixes of the page cache tags for each model
+_CACHE_TAG_PREFIXES = {
+    Post: 'post',
+    Category: 'category',
+    Tag: 'tag',
+    Author: 'author',
+}
+
+
+#
+#   Signal handlers
+#
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    """Generates the thumbnails a saved post needs in the background"""
+    transaction.on_commit(
+        lambda: pregenerate_thumbnails(instance.get_thumbnail_requests())
+    )
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Tag)
+@receiver(pre_save, sender=Author)
+def blog_object_saving(sender, instance, **kwargs):
+    """Remembers the saved values of the fields the sidebar shows"""
+    remember_fields(instance, _SIDEBAR_FIELDS[sender])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def blog_object_changed(sender, instance, signal, **kwargs):
+    """Invalidates the sidebar and cached pages showing a changed object
+
+    The sidebar (and so every blog page) is only invalidated when a value
+    it shows changed, otherwise just the pages showing the object are.
+    """
+    prefix = _CACHE_TAG_PREFIXES[sender]
+    tags = {'%s:%s' % (prefix, instance.slug)}
+
+    fields = _SIDEBAR_FIELDS[sender]
+    saved = get_remembered_fields(instance)
+    if saved is not None:
+        tags.add('%s:%s' % (prefix, saved['slug']))
+    if signal is post_delete or saved is None or \
+            any(saved[x] != getattr(instance, x) for x in fields):
+        __invalidate_sidebar()
+        tags.add('blog')
+
+    purge_cache_tags(*tags)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed(sender, action, **kwargs):
+    """Invalidates the sidebar and cached blog pages when tags change"""
+    if action.startswith('post_'):
+        __invalidate_sidebar()
+        purge_cache_tags('blog')
+
+
+@receiver(m2m_changed, sender=Post.css_includes.through)
+@receiver(m2m_changed, sender=Post.javascript_includes.through)
+def post_includes_changed(sender, instance, action, **kwargs):
+    """Purges cached pages for posts whose included files changed"""
+    if action.startswith('post_'):
+        if isinstance(instance, Post):
+            purge_cache_tags('post:%s' % instance.slug)
+        else:
+            purge_cache_tags('blog')
+
+
+@receiver(post_save, sender=CustomJS)
+@receiver(post_delete, sender=CustomJS)
+@receiver(post_save, sender=CustomCSS)
+@receiver(post_delete, sender=CustomCSS)
+def custom_file_changed(sender, **kwargs):
+    """Purges cached blog pages when a custom include file changes"""
+    purge_cache_tags('blog')
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def post_counts_changing(sender, instance, **kwargs):
+    """Remembers the listings a post was counted in before it changes"""
+    if instance.pk is None:
+        instance._listings_before = set()
+    else:
+        instance._listings_before = get_post_listings(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_counts_changed(sender, instance, signal, **kwargs):
+    """Updates the counts of the listings a post moved in or out of"""
+    before = getattr(instance, '_listings_before', set())
+    if signal is post_delete:
+        after = set()
+    else:
+        after = get_post_listings(instance.pk)
+    update_listing_counts(before, after)
+    instance._listings_before = after
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tag_counts_changed(sender, instance, action, reverse, **kwargs):
+    """Updates the counts of the tag listings a post moved in or out of"""
+    if reverse:
+        # - Posts added to (or removed from) a tag, so just recount
+        if action.startswith('post_'):
+            clear_listing_counts()
+            recount_post_counts(Tag, instance.pk)
+    elif action.startswith('pre_'):
+        instance._listings_before = get_post_listings(instance.pk)
+    else:
+        post_counts_changed(Post, instance, post_save)
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def author_counts_changed(sender, **kwargs):
+    """Recounts listings when an author (who may hide posts) changes"""
+    clear_listing_counts()
+    recount_post_counts()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+def counted_object_saved(sender, instance, created, **kwargs):
+    """Recounts the posts of a saved category or tag
+
+    The saved post_count may have been out of date, if the instance was
+    loaded before its posts last changed.
+    """
+    if not created:
+        recount_post_counts(sender, instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_search_changed(sender, instance, signal, **kwargs):
+    """Updates a saved (or deleted) post in the search index"""
+    if signal is post_delete:
+        remove_from_search_index([instance.pk])
+    else:
+        update_search_index([instance.pk])
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_search_changed(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    """Updates the search index for posts whose tags changed"""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        update_search_index([instance.pk])
+    elif pk_set:
+        update_search_index(pk_set)
+    else:
+        # - A tag was cleared from all its posts, which are now unknown
+        rebuild_search_index()
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_search_deleting(sender, instance, **kwargs):
+    """Remembers the posts a tag being deleted was on"""
+    instance._search_post_ids = list(
+        instance.post_set.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def keywords_search_changed(sender, instance, **kwargs):
+    """Updates the search index for posts in a changed category or tag"""
+    post_ids = getattr(instance, '_search_post_ids', None)
+    if post_ids is None:
+        post_ids = instance.post_set.values_list('pk', flat=True)
+    update_search_index(post_ids)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(m2m_changed, sender=Post.tags.through)
+def autocomplete_changed(sender, **kwargs):
+    """Outdates the autocomplete index when its suggestions may change"""
+    if kwargs.get('action', 'post_').startswith('post_'):
+        __invalidate_autocomplete()
+
+
+#
+#   Helper Functions
+#
+
+def __invalidate_sidebar():
+    """Helper function to invalidate the sidebar index
+
+    It's invalidated again once the transaction commits, in case a request
+    rebuilt it from the old data in the meantime.
+    """
+    invalidate_sidebar_index()
+    transaction.on_commit(invalidate_sidebar_index)
+
+
+def __invalidate_autocomplete():
+    """Helper function to outdate the autocomplete index
+
+    As with the sidebar, it's outdated again once the transaction commits.
+    """
+    invalidate_autocomplete_index()
+    transaction.on_commit(invalidate_autocomplete_index)
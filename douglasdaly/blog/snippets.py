@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Search result snippets, with the search terms highlighted, from a post's
+plain text and the offsets of its terms (both stored when it's saved).
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import re
+import json
+
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .bm25 import tokenize
+
+
+#
+#   Variables
+#
+
+SNIPPET_LENGTH = 200
+
+# - Offsets kept for each term, only the first few are needed to find a
+#   good snippet
+_MAX_OFFSETS = 5
+
+# - Characters of text shown before the first highlighted term
+_LEAD = 30
+
+_WORD_RE = re.compile(r'\w+')
+
+
+#
+#   Functions
+#
+
+def get_term_offsets(text):
+    """Gets the offsets of the first few occurrences of each term in text
+
+    Terms are the tokens of blog.bm25 (so search terms are normalized the
+    same way) and the offsets are returned as JSON.
+    """
+    ret = dict()
+    for match in _WORD_RE.finditer(text or ''):
+        for token in tokenize(match.group()):
+            offsets = ret.setdefault(token, list())
+            if len(offsets) < _MAX_OFFSETS:
+                offsets.append(match.start())
+    return json.dumps(ret, separators=(',', ':'))
+
+
+def get_snippet(text, term_offsets, terms, length=SNIPPET_LENGTH):
+    """Gets a snippet of text with the search terms highlighted
+
+    The snippet is the part of the text with the most distinct terms
+    (the earliest if several do), found from the stored term offsets.
+    Returns None if none of the terms are in the text.
+    """
+    if not text or not term_offsets:
+        return None
+    offsets = json.loads(term_offsets)
+    tokens = set(tokenize(' '.join(terms)))
+    found = sorted((x, token) for token in tokens
+                   for x in offsets.get(token, ()))
+    if not found:
+        return None
+
+    # - Pick the window starting at a term with the most distinct terms
+    best = None
+    for i, (start, _) in enumerate(found):
+        n_terms = len(set(token for x, token in found[i:]
+                          if x < start + length - _LEAD))
+        if best is None or n_terms > best[1]:
+            best = (start, n_terms)
+
+    start = max(best[0] - _LEAD, 0)
+    if start > 0:
+        start = text.find(' ', start) + 1 or start
+    end = min(start + length, len(text))
+    if end < len(text):
+        end = text.rfind(' ', start, end) if ' ' in text[start:end] else end
+
+    parts = list()
+    pos = start
+    for match in _WORD_RE.finditer(text, start, end):
+        if not (set(tokenize(match.group())) & tokens):
+            continue
+        parts.append(escape(text[pos:match.start()]))
+        parts.append('<mark>%s</mark>' % escape(match.group()))
+        pos = match.end()
+    parts.append(escape(text[pos:end]))
+
+    return mark_safe('%s%s%s' % ('&hellip; ' if start > 0 else '',
+                                 ''.join(parts).strip(),
+                                 ' &hellip;' if end < len(text) else ''))
@@ -31,3 +31,28 @@ document.getElementById("search-input")
             blog_search_enter();
         }
     });
+
+var search_suggest_timer = null;
+
+function blog_search_suggest() {
+    var search_text = document.getElementById('search-input').value.trim();
+    var suggestions = document.getElementById('search-suggestions');
+    if (search_text.length < 2) {
+        suggestions.innerHTML = '';
+        return;
+    }
+    $.getJSON(suggestions.dataset.url, {q: search_text}, function(data) {
+        suggestions.innerHTML = '';
+        data.results.forEach(function(result) {
+            var option = document.createElement('option');
+            option.value = result.label;
+            suggestions.appendChild(option);
+        });
+    });
+}
+
+document.getElementById("search-input")
+    .addEventListener("input", function(event) {
+        clearTimeout(search_suggest_timer);
+        search_suggest_timer = setTimeout(blog_search_suggest, 150);
+    });
@@ -9,9 +9,10 @@ Code for Post related inclusion tags for blog.
 #   Imports
 #
 from django import template
-from django.core.paginator import Paginator
 
-from ..models import Post
+from ..pagination import (
+    PAGE_PARAM, AFTER_PARAM, BEFORE_PARAM, get_page_params
+)
 
 
 #
@@ -30,9 +31,13 @@ def post_display(post, show_authors):
     }
 
 
-@register.inclusion_tag("blog/tags/post_paginator.html")
-def post_pagination(post_paginator):
-    """Tag to display page links for posts"""
+@register.inclusion_tag("blog/tags/post_paginator.html", takes_context=True)
+def post_pagination(context, post_paginator):
+    """Tag to display page links for posts
+
+    Previous and next links use the page's cursors (with cursor pagination)
+    and links keep the request's other query parameters (e.g. searches).
+    """
     start_page = max(post_paginator.number-2, 1)
     end_page = min(post_paginator.paginator.num_pages,
                    post_paginator.number + 2) + 1
@@ -44,5 +49,27 @@ def post_pagination(post_paginator):
 
     page_nos = range(start_page, end_page)
 
+    params = context['request'].GET.copy()
+    for name in (PAGE_PARAM, AFTER_PARAM, BEFORE_PARAM):
+        params.pop(name, None)
+    previous_params, next_params = get_page_params(post_paginator)
+
     return {'paginator': post_paginator,
-            'page_numbers': page_nos}
+            'page_numbers': [(x, __get_query(params, {PAGE_PARAM: x}))
+                             for x in page_nos],
+            'previous_query': __get_query(params, previous_params),
+            'next_query': __get_query(params, next_params)}
+
+
+#
+#   Helper Functions
+#
+
+def __get_query(params, page_params):
+    """Helper function to get the query string for a page's link"""
+    if page_params is None:
+        return None
+    ret = params.copy()
+    for name, value in page_params.items():
+        ret[name] = value
+    return ret.urlencode()
@@ -1,3 +1,957 @@
-from django.test import TestCase
+import json
+import math
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.template import Context, Template
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import Resolver404, resolve, reverse
+
+from douglasdaly import page_cache, singletons
+from douglasdaly.page_cache import clear_page_cache
+from douglasdaly.singletons import clear_singletons, invalidate_singleton
+from douglasdaly.testing import CacheTestCase, clear_test_caches
+
+from .autocomplete import PrefixIndex, Suggestion
+from .bm25 import BM25Index
+from .counts import clear_listing_counts, get_listing_count
+from .models import Author, BlogSettings, Category, ColorTheme, Post, Tag
+from .pagination import ListingPaginator
+from .search import (
+    clear_search_results, is_search_index_available, search_post_ids,
+    get_bm25_index, rebuild_search_index
+)
+from .snippets import get_snippet, get_term_offsets
+from .sidebar import (
+    build_sidebar_index, get_sidebar_index, invalidate_sidebar_index
+)
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class ListingQueryTests(CacheTestCase):
+    """
+    Checks each listing page takes a fixed number of queries
+    """
+    # - Including the (conditional GET) validators query
+    max_queries = 9
+
+    @classmethod
+    def setUpTestData(cls):
+        BlogSettings.objects.create(pk=1, title='Blog', show_authors=True)
+        cls.author = Author.objects.create(slug='author', first_name='Jane',
+                                           last_name='Doe')
+        cls.category = Category.objects.create(name='Category',
+                                               slug='category')
+        cls.tags = [Tag.objects.create(name='Tag %d' % i, slug='tag-%d' % i)
+                    for i in range(3)]
+
+        for i in range(12):
+            post = Post.objects.create(
+                title='Post %d' % i, slug='post-%d' % i,
+                description='Description %d' % i, body='Body *%d*' % i,
+                author=cls.author, category=cls.category, published=True
+            )
+            post.tags.set(cls.tags)
+
+    def setUp(self):
+        super().setUp()
+        clear_singletons()
+        invalidate_sidebar_index()
+        get_sidebar_index()
+
+    def count_queries(self, url, posts_per_page):
+        """Gets the number of queries used to render the url (warm)"""
+        blog_settings = BlogSettings.objects.get(pk=1)
+        blog_settings.posts_per_page = posts_per_page
+        blog_settings.save()
+
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['posts']), posts_per_page)
+        return len(queries)
+
+    def assertFixedQueries(self, url):
+        """Asserts the url takes the same queries for any page size"""
+        n_small = self.count_queries(url, 2)
+        n_large = self.count_queries(url, 10)
+
+        self.assertEqual(n_small, n_large)
+        self.assertLessEqual(n_large, self.max_queries)
+
+    def test_index(self):
+        self.assertFixedQueries(reverse('blog_home'))
+
+    def test_view_category(self):
+        self.assertFixedQueries(reverse('view_blog_category',
+                                        kwargs={'slug': self.category.slug}))
+
+    def test_view_tag(self):
+        self.assertFixedQueries(reverse('view_blog_tag',
+                                        kwargs={'slug': self.tags[0].slug}))
+
+    def test_view_author(self):
+        self.assertFixedQueries(reverse('view_blog_author',
+                                        kwargs={'slug': self.author.slug}))
+
+    def test_search(self):
+        self.assertFixedQueries('%s?q=Post' % reverse('search'))
+
+    def test_memo(self):
+        url = reverse('blog_home')
+        self.client.get(url)
+        with self.assertLogs('douglasdaly.memo', 'DEBUG') as logs:
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url)
+
+        page_queries = [x for x in queries
+                        if 'douglasdaly_page' in x['sql']]
+        self.assertEqual(len(page_queries), 1)
+        self.assertIn('page_tags.page_links (1 hits, 1 misses)',
+                      logs.output[0])
+        self.assertIn('singleton:blog.blogsettings', logs.output[0])
+
+    def test_view_post(self):
+        url = reverse('view_blog_post', kwargs={'slug': 'post-0'})
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(queries), self.max_queries)
+
+
+class SidebarTests(CacheTestCase):
+    """
+    Checks the sidebar is served from the cached index and kept current
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(slug='author', first_name='Jane')
+        cls.category = Category.objects.create(name='Category',
+                                               slug='category')
+        cls.tag = Tag.objects.create(name='Tag', slug='tag')
+        cls.post = Post.objects.create(
+            title='Post', slug='post', body='Body', author=cls.author,
+            category=cls.category, published=True
+        )
+        cls.post.tags.add(cls.tag)
+
+    def setUp(self):
+        super().setUp()
+        invalidate_sidebar_index()
+
+    def get_titles(self, mode):
+        """Gets the (heading, titles) shown in the sidebar for a mode"""
+        return [(getattr(heading, 'name', heading), [x[0] for x in links])
+                for heading, links in get_sidebar_index()[mode]]
+
+    def test_no_queries_when_cached(self):
+        get_sidebar_index()
+        template = Template(
+            '{% load sidebar_tags %}{% sidebar_menu "date" %}'
+            '{% sidebar_menu "categories" %}{% sidebar_menu "tags" %}'
+            '{% sidebar_menu "authors" %}'
+        )
+        with self.assertNumQueries(0):
+            html = template.render(Context())
+        self.assertIn(self.post.get_absolute_url(), html)
+        self.assertIn(self.tag.get_absolute_url(), html)
+
+    def test_one_query_per_mode(self):
+        reverse('view_blog_post', kwargs={'slug': self.post.slug})
+        with self.assertNumQueries(4):
+            build_sidebar_index()
+
+    def test_post_changes(self):
+        self.assertEqual(self.get_titles('categories'),
+                         [('Category', ['Post'])])
+
+        post = Post.objects.create(title='Another', slug='another',
+                                   body='Body', author=self.author,
+                                   category=self.category, published=True)
+        self.assertEqual(self.get_titles('categories'),
+                         [('Category', ['Another', 'Post'])])
+
+        post.published = False
+        post.save()
+        self.assertEqual(self.get_titles('authors'), [('Jane', ['Post'])])
+
+        Post.objects.get(pk=self.post.pk).delete()
+        self.assertEqual(self.get_titles('date'), [])
+
+    def test_tag_changes(self):
+        self.assertEqual(self.get_titles('tags'), [('T', ['Tag'])])
+
+        self.post.tags.remove(self.tag)
+        self.assertEqual(self.get_titles('tags'), [])
+
+        other = Tag.objects.create(name='Other', slug='other')
+        self.post.tags.add(other)
+        self.assertEqual(self.get_titles('tags'), [('O', ['Other'])])
+
+        other.name = 'Renamed'
+        other.save()
+        self.assertEqual(self.get_titles('tags'), [('R', ['Renamed'])])
+
+    def test_category_and_author_changes(self):
+        self.category.name = 'Renamed'
+        self.category.save()
+        self.assertEqual(self.get_titles('categories'),
+                         [('Renamed', ['Post'])])
+
+        Author.objects.get(pk=self.author.pk).delete()
+        self.assertEqual(self.get_titles('authors'), [])
+
+    def test_invalidated_while_building(self):
+        # - Changes committed (and the index invalidated) part way through
+        #   a build, which then finishes with the data it read before them
+        def build():
+            ret = build_sidebar_index()
+            Post.objects.filter(pk=self.post.pk).update(title='Renamed')
+            invalidate_sidebar_index()
+            return ret
+
+        with mock.patch('blog.sidebar.build_sidebar_index', build):
+            self.assertEqual(self.get_titles('categories'),
+                             [('Category', ['Post'])])
+        self.assertEqual(self.get_titles('categories'),
+                         [('Category', ['Renamed'])])
+
+
+class SingletonSettingsTests(CacheTestCase):
+    """
+    Checks singleton settings are loaded once and reloaded on changes
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.theme = ColorTheme.objects.create(name='Theme', slug='theme',
+                                              colors=['#000000'])
+        BlogSettings.objects.create(pk=1, title='Blog',
+                                    color_theme=cls.theme)
+
+    def setUp(self):
+        super().setUp()
+        clear_singletons()
+
+    def test_loaded_once(self):
+        self.assertEqual(BlogSettings.load().title, 'Blog')
+        with self.assertNumQueries(0):
+            self.assertEqual(BlogSettings.load().title, 'Blog')
+        with self.assertNumQueries(1):
+            self.assertEqual(BlogSettings.load().color_theme.colors,
+                             ['#000000'])
+
+    def test_saved(self):
+        blog_settings = BlogSettings.objects.get(pk=1)
+        blog_settings.title = 'Renamed'
+        blog_settings.save()
+        self.assertEqual(BlogSettings.load().title, 'Renamed')
+
+        blog_settings.delete()
+        self.assertIsNone(BlogSettings.load())
+
+    def test_related_saved(self):
+        BlogSettings.load().color_theme
+        self.theme.colors = ['#FFFFFF']
+        self.theme.save()
+        self.assertEqual(BlogSettings.load().color_theme.colors,
+                         ['#FFFFFF'])
+
+    def test_other_worker(self):
+        self.assertEqual(BlogSettings.load().title, 'Blog')
+
+        # - Another worker saves the settings (invalidating them everywhere
+        #   but leaving this worker's loaded instance in place)
+        BlogSettings.objects.filter(pk=1).update(title='Renamed')
+        with mock.patch.dict(singletons._loaded):
+            invalidate_singleton(BlogSettings)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(BlogSettings.load().title, 'Blog')
+        with override_settings(SINGLETON_SETTINGS_MAX_AGE=0):
+            self.assertEqual(BlogSettings.load().title, 'Renamed')
+            with self.assertNumQueries(0):
+                self.assertEqual(BlogSettings.load().title, 'Renamed')
+
+
+class PageCacheTests(CacheTestCase):
+    """
+    Checks anonymous pages are cached and purged when what they show changes
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        BlogSettings.objects.create(pk=1, title='Blog')
+        cls.author = Author.objects.create(slug='author', first_name='Jane',
+                                           last_name='Doe')
+        cls.categories = [
+            Category.objects.create(name='Category %d' % i,
+                                    slug='category-%d' % i)
+            for i in range(2)
+        ]
+        for i, category in enumerate(cls.categories):
+            Post.objects.create(
+                title='Post %d' % i, slug='post-%d' % i,
+                description='Description %d' % i, body='Body %d' % i,
+                author=cls.author, category=category, published=True
+            )
+
+    def setUp(self):
+        super().setUp()
+        clear_singletons()
+        clear_page_cache()
+
+    def get(self, url, **params):
+        """Gets the url, returning the response and its cache status"""
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, response.get('X-Page-Cache')
+
+    def test_hit(self):
+        url = reverse('view_blog_post', kwargs={'slug': 'post-0'})
+        response, status = self.get(url)
+        self.assertEqual(status, 'miss')
+
+        with self.assertNumQueries(0):
+            cached, status = self.get(url)
+        self.assertEqual(status, 'hit')
+        self.assertEqual(cached.content, response.content)
+
+    def test_targeted_purge(self):
+        post_url = reverse('view_blog_post', kwargs={'slug': 'post-0'})
+        other_url = reverse('view_blog_category',
+                            kwargs={'slug': 'category-1'})
+        self.get(post_url)
+        self.get(other_url)
+
+        post = Post.objects.get(slug='post-0')
+        post.body = 'Changed body'
+        post.save()
+
+        response, status = self.get(post_url)
+        self.assertEqual(status, 'miss')
+        self.assertContains(response, 'Changed body')
+        self.assertEqual(self.get(other_url)[1], 'hit')
+
+        post.title = 'Renamed post'
+        post.save()
+        response, status = self.get(other_url)
+        self.assertEqual(status, 'miss')
+        self.assertContains(response, 'Renamed post')
+
+    def test_not_cached(self):
+        url = reverse('blog_home')
+        self.get(url)
+        self.assertEqual(self.get(url)[1], 'hit')
+        self.assertIsNone(self.get(url, q='Post')[1])
+
+        user = User.objects.create_user('user', password='password')
+        self.client.force_login(user)
+        self.assertIsNone(self.get(url)[1])
+
+    def test_purged_while_rendering(self):
+        url = reverse('view_blog_post', kwargs={'slug': 'post-0'})
+
+        # - Purged after the view read its data (so the page is outdated)
+        def add_then_purge(request, *tags):
+            page_cache.add_cache_tags(request, *tags)
+            page_cache.purge_cache_tags('post:post-0')
+
+        with mock.patch('blog.views.add_cache_tags', add_then_purge):
+            self.assertEqual(self.get(url)[1], 'miss')
+        self.assertEqual(self.get(url)[1], 'miss')
+        self.assertEqual(self.get(url)[1], 'hit')
+
+    def test_purged_before_tagged(self):
+        url = reverse('view_blog_post', kwargs={'slug': 'post-0'})
+
+        # - Purged after the view read its data, but before it tagged it
+        def purge_then_add(request, *tags):
+            page_cache.purge_cache_tags('post:post-0')
+            page_cache.add_cache_tags(request, *tags)
+
+        with mock.patch('blog.views.add_cache_tags', purge_then_add):
+            self.assertIsNone(self.get(url)[1])
+        self.assertEqual(self.get(url)[1], 'miss')
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class ConditionalGetTests(CacheTestCase):
+    """
+    Checks unchanged pages are answered with 304s from a single query
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        BlogSettings.objects.create(pk=1, title='Blog', show_authors=True)
+        cls.author = Author.objects.create(slug='author', first_name='Jane',
+                                           last_name='Doe')
+        cls.category = Category.objects.create(name='Category',
+                                               slug='category')
+        cls.tag = Tag.objects.create(name='Tag', slug='tag')
+        for i in range(3):
+            post = Post.objects.create(
+                title='Post %d' % i, slug='post-%d' % i,
+                description='Description %d' % i, body='Body %d' % i,
+                author=cls.author, category=cls.category, published=True
+            )
+            post.tags.add(cls.tag)
+
+    def setUp(self):
+        super().setUp()
+        clear_singletons()
+        clear_page_cache()
+        self.urls = [
+            reverse('blog_home'),
+            reverse('view_blog_post', kwargs={'slug': 'post-0'}),
+            reverse('view_blog_category', kwargs={'slug': 'category'}),
+            reverse('view_blog_author', kwargs={'slug': 'author'}),
+            reverse('view_blog_tag', kwargs={'slug': 'tag'}),
+        ]
+
+    def assertNotModified(self, url, response, **headers):
+        """Asserts re-requesting the url with the response's validators
+        gets a 304 in a single query"""
+        with self.assertNumQueries(1):
+            conditional = self.client.get(url, **headers)
+        self.assertEqual(conditional.status_code, 304, url)
+
+    def test_etag(self):
+        for url in self.urls:
+            BlogSettings.load()
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotModified(url, response,
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_last_modified(self):
+        for url in self.urls:
+            BlogSettings.load()
+            response = self.client.get(url)
+            self.assertNotModified(
+                url, response,
+                HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+
+    def test_changes(self):
+        url = reverse('view_blog_category', kwargs={'slug': 'category'})
+        etag = self.client.get(url)['ETag']
+
+        post = Post.objects.get(slug='post-1')
+        post.description = 'Changed'
+        post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        etag = response['ETag']
+
+        blog_settings = BlogSettings.objects.get(pk=1)
+        blog_settings.title = 'Renamed'
+        blog_settings.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_cached_page(self):
+        url = reverse('view_blog_post', kwargs={'slug': 'post-0'})
+        with self.settings(PAGE_CACHE_ENABLED=True):
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class CursorPaginationTests(CacheTestCase):
+    """
+    Checks cursor pagination pages through posts in order, ties included
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        BlogSettings.objects.create(pk=1, title='Blog', posts_per_page=3,
+                                    cursor_pagination=True)
+        category = Category.objects.create(name='Category', slug='category')
+        for i in range(8):
+            post = Post.objects.create(
+                title='Post %d' % i, slug='post-%d' % i, body='Body',
+                category=category, published=True
+            )
+            # - Pairs of posts share the same date
+            Post.objects.filter(pk=post.pk).update(
+                display_date=post.display_date.replace(year=2000 + i // 2)
+            )
+        cls.expected = list(Post.objects.order_by('-display_date', '-id')
+                            .values_list('title', flat=True))
+
+    def setUp(self):
+        super().setUp()
+        clear_singletons()
+
+    def get_page(self, query=''):
+        """Gets the titles on a page and its previous/next queries"""
+        response = self.client.get('%s?%s' % (reverse('blog_home'), query))
+        self.assertEqual(response.status_code, 200)
+        titles = [x.title for x in response.context['posts']]
+        return (titles, response.context['previous_query'],
+                response.context['next_query'])
+
+    def test_next_and_previous(self):
+        pages = [self.get_page()]
+        while pages[-1][2]:
+            pages.append(self.get_page(pages[-1][2]))
+        self.assertEqual([x for page in pages for x in page[0]],
+                         self.expected)
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0][1])
+
+        self.assertEqual(self.get_page(pages[-1][1])[0], pages[1][0])
+        self.assertEqual(self.get_page(pages[1][1])[0], pages[0][0])
+
+    def test_numbered_pages(self):
+        self.assertEqual(self.get_page('page=3')[0], self.expected[6:])
+        self.assertEqual(self.get_page('page=2&after=invalid')[0],
+                         self.expected[3:6])
+
+    def test_search_keeps_query(self):
+        response = self.client.get(reverse('search'), {'q': 'Post'})
+        self.assertIn('q=Post', response.context['next_query'])
+
+
+class ListingCountTests(CacheTestCase):
+    """
+    Checks listing counts are kept up to date as posts change
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(slug='author', first_name='Jane',
+                                           last_name='Doe')
+        cls.categories = [
+            Category.objects.create(name='Category %d' % i,
+                                    slug='category-%d' % i)
+            for i in range(2)
+        ]
+        cls.tags = [Tag.objects.create(name='Tag %d' % i, slug='tag-%d' % i)
+                    for i in range(2)]
+        for i in range(4):
+            post = Post.objects.create(
+                title='Post %d' % i, slug='post-%d' % i, body='Body',
+                author=cls.author, category=cls.categories[0],
+                published=True
+            )
+            post.tags.add(cls.tags[0])
+
+    def setUp(self):
+        super().setUp()
+        clear_listing_counts()
+        self.listings = {
+            'all': Post.get_displayable(),
+            'author:%d' % self.author.pk:
+                Post.get_displayable().filter(author=self.author),
+        }
+        for x in self.categories:
+            self.listings['category:%d' % x.pk] = \
+                Post.get_displayable().filter(category=x)
+        for x in self.tags:
+            self.listings['tag:%d' % x.pk] = \
+                Post.get_displayable().filter(tags=x)
+        for listing, posts in self.listings.items():
+            get_listing_count(listing, posts)
+
+    def assertCounts(self, recounted=False):
+        """Asserts every listing's count (and post_count) is correct"""
+        with self.assertNumQueries(len(self.listings) if recounted else 0):
+            counts = dict((x, get_listing_count(x, y))
+                          for x, y in self.listings.items())
+        self.assertEqual(counts, dict((x, y.count())
+                                      for x, y in self.listings.items()))
+
+        for model, lookup in ((Category, 'category'), (Tag, 'tags'),
+                              (Author, 'author')):
+            for obj in model.objects.all():
+                self.assertEqual(
+                    obj.post_count,
+                    Post.get_displayable().filter(**{lookup: obj}).count(),
+                    obj
+                )
+
+    def test_published(self):
+        post = Post.objects.get(slug='post-0')
+        post.published = False
+        post.save()
+        self.assertCounts()
+
+        post.published = True
+        post.save()
+        self.assertCounts()
+
+    def test_moved_and_retagged(self):
+        post = Post.objects.get(slug='post-1')
+        post.category = self.categories[1]
+        post.save()
+        self.assertCounts()
+
+        post.tags.add(self.tags[1])
+        self.assertCounts()
+        post.tags.remove(self.tags[0])
+        self.assertCounts()
+        post.tags.clear()
+        self.assertCounts()
+
+    def test_created_and_deleted(self):
+        post = Post.objects.create(
+            title='New', slug='new', body='Body', author=self.author,
+            category=self.categories[1], published=True
+        )
+        post.tags.set(self.tags)
+        self.assertCounts()
+
+        Post.objects.get(slug='post-2').delete()
+        Category.objects.get(pk=self.categories[0].pk).delete()
+        self.assertCounts()
+
+    def test_author_deactivated(self):
+        author = Author.objects.get(pk=self.author.pk)
+        author.is_active = False
+        author.save()
+        self.assertCounts(recounted=True)
+        self.assertEqual(Author.objects.get(pk=author.pk).post_count, 0)
+
+    def test_stale_instance_saved(self):
+        category = Category.objects.get(pk=self.categories[0].pk)
+        Post.objects.get(slug='post-3').delete()
+        category.name = 'Renamed'
+        category.save()
+        self.assertCounts()
+
+    def test_paginator(self):
+        with self.assertNumQueries(0):
+            paginator = ListingPaginator(self.listings['all'], 3,
+                                         listing='all')
+            self.assertEqual(paginator.num_pages, 2)
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class SearchIndexTests(CacheTestCase):
+    """
+    Checks the full-text search index is ranked and kept up to date
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        BlogSettings.objects.create(pk=1, title='Blog')
+        cls.category = Category.objects.create(name='Category',
+                                               slug='category')
+        cls.tag = Tag.objects.create(name='Tag', slug='tag')
+        posts = (
+            ('body', 'Other', 'Mentions rockets once.', None),
+            ('title', 'Rockets', 'Nothing here.', None),
+            ('terms', 'Another', 'Nothing here either.', ['propulsion']),
+        )
+        for slug, title, body, terms in posts:
+            post = Post.objects.create(
+                title=title, slug=slug, body=body, search_terms=terms,
+                category=cls.category, published=True
+            )
+            post.tags.add(cls.tag)
+
+    def setUp(self):
+        super().setUp()
+        if not is_search_index_available():
+            self.skipTest("No full-text search index")
+        clear_singletons()
+        clear_search_results()
+
+    def search(self, query):
+        """Gets the slugs of the posts found for the query, in order"""
+        response = self.client.get(reverse('search'), {'q': query})
+        return [x.slug for x in response.context['posts']]
+
+    def test_ranked(self):
+        self.assertEqual(self.search('rockets'), ['title', 'body'])
+        self.assertEqual(self.search('rocket'), ['title', 'body'])
+        self.assertEqual(self.search('propulsion'), ['terms'])
+        self.assertEqual(self.search('rockets missing'), [])
+
+    def test_updated(self):
+        post = Post.objects.get(slug='terms')
+        post.title = 'Rockets again'
+        post.save()
+        self.assertEqual(self.search('again'), ['terms'])
+
+        post.published = False
+        post.save()
+        self.assertEqual(self.search('again'), [])
+
+        Post.objects.get(slug='title').delete()
+        self.assertEqual(self.search('rockets'), ['body'])
+
+    def test_tags_and_categories(self):
+        tag = Tag.objects.create(name='Space', slug='space')
+        Post.objects.get(slug='body').tags.add(tag)
+        self.assertEqual(self.search('space'), ['body'])
+
+        tag.name = 'Orbit'
+        tag.save()
+        self.assertEqual(self.search('space'), [])
+        self.assertEqual(self.search('orbit'), ['body'])
+
+        category = Category.objects.get(pk=self.category.pk)
+        category.name = 'Astronomy'
+        category.save()
+        self.assertEqual(len(self.search('astronomy')), 3)
+
+        Tag.objects.get(pk=tag.pk).delete()
+        self.assertEqual(self.search('orbit'), [])
+
+
+class BM25SearchTests(SearchIndexTests):
+    """
+    Checks the in-process BM25 search index is ranked and kept up to date
+    """
+
+    def setUp(self):
+        clear_test_caches()
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        settings = override_settings(BLOG_SEARCH_BACKEND='bm25',
+                                     BLOG_SEARCH_INDEX=path + '/posts')
+        settings.enable()
+        self.addCleanup(settings.disable)
+        clear_singletons()
+        rebuild_search_index()
+
+    def test_not_built(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        with override_settings(BLOG_SEARCH_INDEX=path + '/posts'):
+            self.assertIsNone(search_post_ids(['rockets']))
+            # - Falls back to searching the database, without building it
+            self.assertEqual(self.search('rockets'), ['title'])
+            self.assertFalse(get_bm25_index().exists())
+
+    def test_ranking(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        bodies = {
+            1: 'rocket fuel fuel fuel',
+            2: 'rocket rocket rocket fuel',
+            3: 'rocket launch', 4: 'rocket pad', 5: 'rocket stage',
+            6: 'rocket nose',
+        }
+        index = BM25Index(path + '/posts')
+        index.build([(k, '', '', '', v) for k, v in bodies.items()])
+
+        # - By hand: 'fuel' is in 2 of the 6 documents and 'rocket' in all
+        #   of them, the documents averaging 2.67 terms
+        def score(tf, df, length):
+            idf = math.log(1. + (6 - df + .5) / (df + .5))
+            norm = 1.2 * (1. - .75 + .75 * length / (16. / 6.))
+            return idf * tf * 2.2 / (tf + norm)
+
+        scores = {
+            1: score(3, 2, 4) + score(1, 6, 4),
+            2: score(1, 2, 4) + score(3, 6, 4),
+        }
+        self.assertGreater(scores[1], scores[2])
+        for tokens in (['fuel', 'rocket'], ['rocket', 'fuel']):
+            self.assertEqual(index.search(tokens), [1, 2])
+            found = index._score(tokens)
+            self.assertEqual(sorted(found), [1, 2])
+            for doc_id in found:
+                self.assertAlmostEqual(found[doc_id], scores[doc_id],
+                                       places=5)
+
+    def test_merged(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        index = BM25Index(path + '/posts')
+        index.build([(1, 'Rockets', '', '', ''), (2, 'Other', '', '', '')])
+        index.update([(2, 'Rockets too', '', '', '')])
+        self.assertEqual(index.search(['rocket']), [1, 2])
+
+        # - Another worker's updates (merged into a new index file)
+        with mock.patch('blog.bm25._MAX_LOG_SIZE', 0):
+            BM25Index(path + '/posts').remove([1])
+        self.assertEqual(index.search(['rocket']), [2])
+        self.assertEqual(BM25Index(path + '/posts').search(['too']), [2])
+
+
+class SearchResultCacheTests(CacheTestCase):
+    """
+    Checks search results are cached by their canonical terms
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        BlogSettings.objects.create(pk=1, title='Blog', posts_per_page=1)
+        category = Category.objects.create(name='Category', slug='category')
+        for i in range(3):
+            Post.objects.create(title='Rockets %d' % i, slug='post-%d' % i,
+                                category=category, published=True)
+
+    def setUp(self):
+        super().setUp()
+        clear_singletons()
+        clear_search_results()
+        patcher = mock.patch('blog.views.search_post_ids',
+                             wraps=search_post_ids)
+        self.search_post_ids = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def search(self, query, page=1):
+        """Gets the slugs of the posts found on a page of the results"""
+        response = self.client.get(reverse('search'),
+                                   {'q': query, 'page': page})
+        return [x.slug for x in response.context['posts']]
+
+    def test_cached(self):
+        first = self.search('rockets')
+        self.assertEqual(len(first), 1)
+        self.assertEqual(self.search('ROCKETS'), first)
+        self.assertEqual(len(set(self.search('Rockets', page=x)[0]
+                                 for x in (1, 2, 3))), 3)
+        self.assertEqual(self.search('Rockets  "rockets"', page=3),
+                         self.search('rockets', page=3))
+        self.assertEqual(self.search_post_ids.call_count, 1)
+        self.search_post_ids.assert_called_with(['rockets'])
+
+    def test_invalidated(self):
+        self.assertEqual(len(set(self.search('rockets', page=x)[0]
+                                 for x in (1, 2, 3))), 3)
+        post = Post.objects.get(slug='post-0')
+        post.title = 'Other'
+        post.save()
+        self.assertNotIn('post-0', [self.search('rockets', page=x)[0]
+                                    for x in (1, 2)])
+        self.assertEqual(self.search_post_ids.call_count, 2)
+
+
+class AutocompleteTests(CacheTestCase):
+    """
+    Checks autocomplete suggestions are found by prefix and kept current
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        BlogSettings.objects.create(pk=1, title='Blog')
+        cls.category = Category.objects.create(name='Space', slug='space')
+        cls.tag = Tag.objects.create(name='Rocketry', slug='rocketry')
+        post = Post.objects.create(
+            title='Big Rockets', slug='big-rockets', category=cls.category,
+            search_terms=['propulsion'], published=True
+        )
+        post.tags.add(cls.tag)
+        Post.objects.create(title='Rockets Hidden', slug='hidden',
+                            category=cls.category)
+
+    def setUp(self):
+        super().setUp()
+        clear_singletons()
+
+    def suggest(self, prefix):
+        """Gets the (label, kind) of each suggestion for a prefix"""
+        response = self.client.get(reverse('autocomplete'), {'q': prefix})
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age', response['Cache-Control'])
+        return [(x['label'], x['kind']) for x in response.json()['results']]
+
+    def test_prefix_index(self):
+        index = PrefixIndex([
+            Suggestion('Rockets', 'post', '/a'),
+            Suggestion('Big Rockets', 'post', '/b'),
+            Suggestion('Rocketry', 'tag', '/c'),
+        ])
+        self.assertEqual([x.url for x in index.find('  ROCK ')],
+                         ['/a', '/c', '/b'])
+        self.assertEqual([x.url for x in index.find('big r')], ['/b'])
+        self.assertEqual(index.find('rockets', limit=1)[0].url, '/a')
+        self.assertEqual(index.find('missing'), [])
+        self.assertEqual(index.find(''), [])
+
+    def test_suggestions(self):
+        self.assertEqual(self.suggest('rock'), [
+            ('Rocketry', 'tag'), ('Big Rockets', 'post'),
+        ])
+        self.assertEqual(self.suggest('spa'), [('Space', 'category')])
+        self.assertEqual(self.suggest('prop'), [('propulsion', 'term')])
+        self.assertEqual(self.suggest(''), [])
+
+    def test_updated(self):
+        self.assertEqual(self.suggest('hidden'), [])
+        post = Post.objects.get(slug='hidden')
+        post.published = True
+        post.save()
+        self.assertEqual(self.suggest('hidden'), [('Rockets Hidden', 'post')])
+
+        Post.objects.get(slug='big-rockets').tags.clear()
+        self.assertEqual(self.suggest('rocketry'), [])
+
+    def test_author_deleted(self):
+        author = Author.objects.create(slug='gone', first_name='Gone',
+                                       is_active=False)
+        Post.objects.create(title='Orbits', slug='orbits', author=author,
+                            category=self.category, published=True)
+        self.assertEqual(self.suggest('orbit'), [])
+        author.delete()
+        self.assertEqual(self.suggest('orbit'), [('Orbits', 'post')])
+
+    def test_url(self):
+        url = reverse('autocomplete')
+        self.assertTrue(url.endswith('/autocomplete.json'))
+        for other in (url + 'x', url[:-5] + '-json'):
+            with self.assertRaises(Resolver404):
+                resolve(other)
+
+        # - The search box gets the URL from the page, not hard-coded
+        self.assertContains(self.client.get(reverse('blog_home')),
+                            'data-url="%s"' % url)
+
+
+class SnippetTests(CacheTestCase):
+    """
+    Checks search results show highlighted snippets of the post's text
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        BlogSettings.objects.create(pk=1, title='Blog')
+        category = Category.objects.create(name='Category', slug='category')
+        cls.post = Post.objects.create(
+            title='Post', slug='post', category=category, published=True,
+            body='Intro *about* rockets.\n\n```python\nrockets = 1\n```'
+                 '\n\nMaths $$x^2$$ and <b>bold</b> fuel & rockets.'
+        )
+
+    def setUp(self):
+        super().setUp()
+        clear_singletons()
+        clear_search_results()
+
+    def test_body_text(self):
+        self.assertEqual(self.post.body_text,
+                         'Intro about rockets. Maths and bold fuel & rockets.')
+        self.assertEqual(json.loads(self.post.body_text_offsets)['rocket'],
+                         [12, 43])
+
+    def test_snippet(self):
+        text = 'Some words ' * 20 + 'then rockets and fuel <now>.'
+        snippet = get_snippet(text, get_term_offsets(text), ['Fuel rocket'])
+        self.assertTrue(snippet.startswith('&hellip; '))
+        self.assertIn('then <mark>rockets</mark> and <mark>fuel</mark> '
+                      '&lt;now&gt;.', snippet)
+        self.assertIsNone(get_snippet(text, get_term_offsets(text),
+                                      ['missing']))
+
+    def test_search_results(self):
+        response = self.client.get(reverse('search'), {'q': 'fuel'})
+        self.assertContains(response, 'bold <mark>fuel</mark> &amp; rockets')
@@ -67,6 +67,11 @@ urlpatterns = [
         views.search,
         name="search"
     ),
+    url(
+        r'^autocomplete\.json$',
+        views.autocomplete,
+        name="autocomplete"
+    ),
 
     # - Feeds
     path('rss/latest.xml', PostsLatestFeed()),
@@ -5,6 +5,18 @@ Helper utilities for the blog application.
 :author: Douglas Daly
 :date: 2/18/2019
 """
+#
+#   Imports
+#
+from django.db.models import Max
+from django.urls import reverse
+
+
+#
+#   Variables
+#
+
+_SLUG_MARKER = 'slug-marker'
 
 
 #
@@ -25,3 +37,35 @@ def font_color_helper(background_color, light_color=None, dark_color=None):
                                      (tmp_b * 0.114)) > 186 else light_color
 
     return font_color_code
+
+
+def get_post_cache_tags(posts):
+    """Gets the page cache tags for a page showing the given posts"""
+    ret = ['blog']
+    for post in posts:
+        ret.append('post:%s' % post.slug)
+        ret.append('category:%s' % post.category.slug)
+        if post.author is not None:
+            ret.append('author:%s' % post.author.slug)
+        ret.extend('tag:%s' % x.slug for x in post.tags.all())
+    return ret
+
+
+def get_listing_validators(posts, *tags):
+    """Gets the conditional GET validators for a listing of posts
+
+    Any change to a post in the listing updates its last modified time,
+    changes which reorder or remove posts from it purge the 'blog' tag.
+    """
+    last_modified = posts.aggregate(x=Max('last_updated'))['x']
+    return ('blog',) + tags, last_modified
+
+
+def get_slug_url_builder(view_name):
+    """Gets a function for a view's URL from a slug, with a single reverse
+
+    For building the URLs of many items at once (e.g. in the sidebar).
+    """
+    prefix, suffix = reverse(view_name, kwargs={'slug': _SLUG_MARKER})\
+        .split(_SLUG_MARKER)
+    return lambda slug: prefix + slug + suffix
@@ -11,28 +11,84 @@ Views for the blog application
 import re
 
 from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponse, HttpResponseNotAllowed, Http404
-from django.core.paginator import Paginator
+from django.conf import settings
+from django.http import (
+    HttpResponse, HttpResponseNotAllowed, Http404, JsonResponse
+)
+from django.utils.cache import patch_cache_control
 from django.db.models import Q
 
+from douglasdaly.conditional import conditional_page
+from douglasdaly.page_cache import add_cache_tags
+
+from .autocomplete import get_autocomplete_index
 from .models import Post, Category, Tag, BlogSettings, Author
+from .pagination import get_post_page, get_ranked_page
+from .search import search_post_ids, get_cached_search
+from .utils import get_post_cache_tags, get_listing_validators
+
+
+#
+#   Validator Functions
+#
+
+def __get_index_validators(request):
+    """Helper function to get the validators for the blog home page"""
+    return get_listing_validators(Post.get_displayable())
+
+
+def __get_post_validators(request, slug):
+    """Helper function to get the validators for a post's page"""
+    last_updated = Post.objects.filter(slug=slug, published=True)\
+        .values_list('last_updated', flat=True).first()
+    if last_updated is None:
+        return None
+    return ('blog', 'assets', 'post:%s' % slug), last_updated
+
+
+def __get_category_validators(request, slug):
+    """Helper function to get the validators for a category's page"""
+    return get_listing_validators(
+        Post.get_displayable().filter(category__slug=slug),
+        'category:%s' % slug
+    )
+
+
+def __get_author_validators(request, slug):
+    """Helper function to get the validators for an author's page"""
+    if not BlogSettings.load().show_authors:
+        return None
+    return get_listing_validators(
+        Post.get_displayable().filter(author__slug=slug),
+        'author:%s' % slug
+    )
+
+
+def __get_tag_validators(request, slug):
+    """Helper function to get the validators for a tag's page"""
+    return get_listing_validators(
+        Post.get_displayable().filter(tags__slug=slug),
+        'tag:%s' % slug
+    )
 
 
 #
 #   Views
 #
 
+@conditional_page(__get_index_validators)
 def index(request):
     """Blog home page view"""
     blog_settings = BlogSettings.load()
 
-    post_list = Post.get_displayable().all()
-    page = request.GET.get("page")
+    post_list = Post.get_displayable(listing=True)
+    posts = __get_post_page(post_list, request, blog_settings=blog_settings,
+                            listing='all')
+    add_cache_tags(request, *get_post_cache_tags(posts))
 
     ret_dict = {
         'blog_settings': blog_settings,
-        'posts': __get_post_page(post_list, page=page,
-                                 blog_settings=blog_settings),
+        'posts': posts,
         'view_rss': 'rss/latest.xml',
         'current_nav': 'home',
     }
@@ -44,23 +100,19 @@ def index(request):
 def search(request):
     """Search page view"""
     blog_settings = BlogSettings.load()
-    page = request.GET.get("page")
 
     query_string = ''
-    found_entries = None
+    posts = None
 
     if ('q' in request.GET) and request.GET['q'].strip():
         query_string = request.GET['q']
-        entry_query = __get_query(query_string, ['title', 'description',
-                                                 'category__name',
-                                                 'tags__name', ])
-        found_entries = Post.get_displayable().filter(entry_query).distinct()
-
-    if found_entries is not None:
-        posts = __get_post_page(found_entries, page=page,
-                                blog_settings=blog_settings)
-    else:
-        posts = None
+        terms = __normalize_query(query_string)
+        post_ids = get_cached_search(terms, __search_post_ids)
+        posts = get_ranked_page(Post.get_displayable(listing=True),
+                                post_ids, request,
+                                blog_settings.posts_per_page)
+        for post in posts:
+            post.snippet = post.get_snippet(terms)
 
     ret_dict = {
         'query_string': query_string,
@@ -73,12 +125,33 @@ def search(request):
     return render(request, 'blog/search.html', ret_dict)
 
 
+def autocomplete(request):
+    """Search suggestions (as JSON) for the prefix typed so far"""
+    prefix = request.GET.get('q', '')[:100]
+    suggestions = get_autocomplete_index().find(prefix)
+
+    response = JsonResponse({
+        'query': prefix,
+        'results': [dict(x._asdict()) for x in suggestions],
+    })
+    patch_cache_control(response, public=True, max_age=getattr(
+        settings, 'BLOG_AUTOCOMPLETE_MAX_AGE', 60
+    ))
+    return response
+
+
+@conditional_page(__get_post_validators)
 def view_post(request, slug):
     """View post view"""
-    post = get_object_or_404(Post, slug=slug)
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'category')
+        .prefetch_related('tags', 'css_includes', 'javascript_includes'),
+        slug=slug
+    )
 
     if not post.published:
         raise Http404
+    add_cache_tags(request, 'assets', *get_post_cache_tags([post]))
 
     ret_dict = {
         'post': post,
@@ -90,7 +163,9 @@ def view_post(request, slug):
 
 def view_categories(request):
     """View category posts view"""
-    categories = Category.objects.all()
+    categories = Category.objects.filter(post_count__gt=0)
+    add_cache_tags(request, 'blog', *('category:%s' % x.slug
+                                      for x in categories))
 
     ret_dict = {
         'categories': categories,
@@ -102,18 +177,22 @@ def view_categories(request):
     return render(request, 'blog/categories.html', ret_dict)
 
 
+@conditional_page(__get_category_validators)
 def view_category(request, slug):
     """View all categories view"""
     category = get_object_or_404(Category, slug=slug)
 
     blog_settings = BlogSettings.load()
-    page = request.GET.get("page")
+    posts = __get_post_page(Post.get_displayable(listing=True)
+                            .filter(category=category),
+                            request, blog_settings=blog_settings,
+                            listing='category:%d' % category.pk)
+    add_cache_tags(request, *get_post_cache_tags(posts))
+    add_cache_tags(request, 'category:%s' % category.slug)
 
     ret_dict = {
         'category': category,
-        'posts': __get_post_page(Post.get_displayable()
-                                     .filter(category=category),
-                                 page=page, blog_settings=blog_settings),
+        'posts': posts,
         'blog_settings': blog_settings,
         'view_rss': 'rss/categories/{}.xml'.format(category.slug),
     }
@@ -128,7 +207,9 @@ def view_authors(request):
     if not blog_settings.show_authors:
         raise Http404
 
-    authors = Author.get_displayable()
+    authors = Author.get_displayable().filter(post_count__gt=0)
+    add_cache_tags(request, 'blog', *('author:%s' % x.slug
+                                      for x in authors))
 
     ret_dict = {
         'authors': authors,
@@ -140,6 +221,7 @@ def view_authors(request):
     return render(request, 'blog/authors.html', ret_dict)
 
 
+@conditional_page(__get_author_validators)
 def view_author(request, slug):
     """View individual author's posts"""
     blog_settings = BlogSettings.load()
@@ -150,12 +232,16 @@ def view_author(request, slug):
     if not author.is_active:
         raise Http404
 
-    page = request.GET.get("page")
+    posts = __get_post_page(Post.get_displayable(listing=True)
+                            .filter(author=author),
+                            request, blog_settings=blog_settings,
+                            listing='author:%d' % author.pk)
+    add_cache_tags(request, *get_post_cache_tags(posts))
+    add_cache_tags(request, 'author:%s' % author.slug)
 
     ret_dict = {
         'author': author,
-        'posts': __get_post_page(Post.get_displayable().filter(author=author),
-                                 page=page, blog_settings=blog_settings),
+        'posts': posts,
         'blog_settings': blog_settings,
         'view_rss': 'rss/author/{}.xml'.format(author.slug),
     }
@@ -166,7 +252,8 @@ def view_author(request, slug):
 
 def view_tags(request):
     """View all tags view"""
-    tags = Tag.objects.all()
+    tags = Tag.objects.filter(post_count__gt=0)
+    add_cache_tags(request, 'blog', *('tag:%s' % x.slug for x in tags))
 
     ret_dict = {
         'tags': tags,
@@ -178,17 +265,22 @@ def view_tags(request):
     return render(request, 'blog/tags.html', ret_dict)
 
 
+@conditional_page(__get_tag_validators)
 def view_tag(request, slug):
     """View all posts for the specified tag"""
     tag = get_object_or_404(Tag, slug=slug)
 
     blog_settings = BlogSettings.load()
-    page = request.GET.get("page")
+    posts = __get_post_page(Post.get_displayable(listing=True)
+                            .filter(tags=tag),
+                            request, blog_settings=blog_settings,
+                            listing='tag:%d' % tag.pk)
+    add_cache_tags(request, *get_post_cache_tags(posts))
+    add_cache_tags(request, 'tag:%s' % tag.slug)
 
     ret_dict = {
         'tag': tag,
-        'posts': __get_post_page(Post.get_displayable().filter(tags=tag),
-                                 page=page, blog_settings=blog_settings),
+        'posts': posts,
         'blog_settings': blog_settings,
         'view_rss': 'rss/tag/{}.xml'.format(tag.slug),
     }
@@ -214,19 +306,17 @@ def update_side_menu_sort(request, sort_tab):
 #   Helper Functions
 #
 
-def __get_post_page(post_list, page=1, blog_settings=None):
-    """Helper function to get posts for specified page based on settings"""
+def __get_post_page(post_list, request, blog_settings=None, listing=None):
+    """Helper function to get posts for requested page based on settings"""
     if blog_settings is None:
         per_page = 10
+        cursor = False
     else:
         per_page = blog_settings.posts_per_page
+        cursor = blog_settings.cursor_pagination
 
-    if page is None:
-        page = 1
-
-    post_paginator = Paginator(post_list, per_page)
-
-    return post_paginator.get_page(page)
+    return get_post_page(post_list, request, per_page, cursor=cursor,
+                         listing=listing)
 
 
 def __append_common_vars(request, curr_dict, include_settings=True):
@@ -235,11 +325,11 @@ def __append_common_vars(request, curr_dict, include_settings=True):
 
     blog_settings = BlogSettings.load()
 
-    rss_categories = Category.objects.all()
-    rss_tags = Tag.objects.all()
+    rss_categories = Category.objects.filter(post_count__gt=0)
+    rss_tags = Tag.objects.filter(post_count__gt=0)
 
     if blog_settings.show_authors:
-        rss_authors = Author.get_displayable()
+        rss_authors = Author.get_displayable().filter(post_count__gt=0)
     else:
         rss_authors = None
 
@@ -264,11 +354,22 @@ def __normalize_query(query_string,
             in findterms(query_string)]
 
 
-def __get_query(query_string, search_fields):
+def __search_post_ids(terms):
+    """Gets the ids of the posts matching search terms, best first"""
+    ret = search_post_ids(terms)
+    if ret is None:
+        # - No full-text search index, so fall back to matching text
+        entry_query = __get_query(terms, ['title', 'description',
+                                          'category__name', 'tags__name', ])
+        ret = Post.get_displayable(listing=True).filter(entry_query)\
+            .distinct().values_list('pk', flat=True)
+    return ret
+
+
+def __get_query(terms, search_fields):
     """Gets a Query for searching models with"""
     query = None
 
-    terms = __normalize_query(query_string)
     for term in terms:
         or_query = None
         for field_name in search_fields:
@@ -54,6 +54,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'douglasdaly.middleware.RequestMemoMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -61,6 +62,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     # Other Middleware Classes
+    'douglasdaly.middleware.PageCacheMiddleware',
     'htmlmin.middleware.HtmlMinifyMiddleware',
     'htmlmin.middleware.MarkRequestMiddleware',
 ]
@@ -124,3 +126,65 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 MEDIA_URL = '/media/'
+
+
+# Caches
+# https://docs.djangoproject.com/en/2.0/topics/cache/
+
+CACHE_ROOT = os.environ.get("CACHE_ROOT", os.path.join(BASE_DIR, "cache"))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'markdown': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_ROOT, 'markdown'),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'CULL_FREQUENCY': 4,
+        },
+    },
+    'blog': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_ROOT, 'blog'),
+        'TIMEOUT': None,
+    },
+    'settings': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_ROOT, 'settings'),
+        'TIMEOUT': None,
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_ROOT, 'pages'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+}
+
+# Page cache (anonymous requests, see douglasdaly.page_cache)
+
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Singleton settings (seconds a worker may serve outdated settings)
+
+SINGLETON_SETTINGS_MAX_AGE = 5.0
+
+# Blog search ('database' full-text index, or the in-process 'bm25' index
+# kept in files under BLOG_SEARCH_INDEX, see blog.bm25, which is built with
+# the rebuild_search_index command)
+
+BLOG_SEARCH_BACKEND = os.environ.get("BLOG_SEARCH_BACKEND", "database")
+BLOG_SEARCH_INDEX = os.path.join(CACHE_ROOT, 'search', 'posts')
+
+# Markdown
+
+MARKDOWN_RENDER_BUDGET = 5.0
+
+# Thumbnails
+
+THUMBNAIL_PREGENERATE_WORKERS = 2
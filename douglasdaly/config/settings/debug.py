@@ -42,3 +42,25 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 INSTALLED_APPS += ['debug_toolbar']
 
 MIDDLEWARE += ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
+# Logging (shows what each request's memo saved)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'douglasdaly.memo': {
+            'handlers': ['console'],
+            'level': 'DEBUG',
+        },
+    },
+}
+
+# Page Cache (templates change too often while developing)
+
+PAGE_CACHE_ENABLED = False
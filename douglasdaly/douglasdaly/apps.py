@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MainAppConfig(AppConfig):
     name = 'douglasdaly'
     verbose_name = "Main Site"
+
+    def ready(self):
+        from . import signals  # noqa: F401
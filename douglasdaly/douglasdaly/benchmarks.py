@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers for benchmarking markdown rendering with a generated corpus.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import json
+import random
+import hashlib
+import timeit
+import tracemalloc
+
+
+#
+#   Variables
+#
+
+FEATURES = ('prose', 'tables', 'math', 'code', 'assets')
+
+_WORDS = (
+    'data', 'model', 'post', 'value', 'market', 'price', 'signal', 'time',
+    'series', 'return', 'function', 'vector', 'matrix', 'python', 'django',
+    'render', 'table', 'result', 'analysis', 'the', 'a', 'of', 'and', 'to',
+    'in', 'is', 'with', 'for', 'on', 'we', 'this', 'that', 'it', 'as',
+)
+
+_CODE_SNIPPETS = (
+    ('python', 'def f_%(i)d(x):\n    """Doc %(i)d"""\n'
+               '    return [y ** 2 for y in range(x) if y %% 2]\n'),
+    ('javascript', 'const f%(i)d = (a, b) => {\n  return a.map(x => x * b);'
+                   '\n};\n'),
+    ('sql', 'SELECT id, title FROM blog_post -- %(i)d\n'
+            'WHERE published = 1 ORDER BY display_date DESC;\n'),
+    ('bash', 'for f in *.csv; do  # %(i)d\n  wc -l "$f"\ndone\n'),
+    ('c', 'int f%(i)d(int x) {\n    return x * %(i)d;\n}\n'),
+    ('rust', 'fn f%(i)d(x: u32) -> u32 {\n    x.pow(2) + %(i)d\n}\n'),
+    ('html', '<div class="c%(i)d"><p>Hello</p></div>\n'),
+    ('yaml', 'key_%(i)d:\n  - one\n  - two\n'),
+    ('unknownlang', 'some code %(i)d\n'),
+)
+
+_MATH_SNIPPETS = (
+    'the value \\(x_%(i)d^2 + y^2\\) is',
+    'with $a_%(i)d = b^2$ inline',
+    '$$\\sum_{k=0}^{%(i)d} k^2$$',
+    '\\begin{align}\nx_%(i)d &= \\frac{a}{b} \\\\\ny &= c\n\\end{align}',
+)
+
+# - Pathological inputs: (head, repeated, closing, tail), where a document
+#   of size n is head + repeated * n + closing * n + tail
+PATHOLOGICAL = {
+    'nested_brackets': ('', '[a', ']', ''),
+    'unclosed_links': ('', '[a](', '', ''),
+    'link_titles': ('', '[a](x " \' ', '', ''),
+    'closed_link_titles': ('', '[a](x " \' ', '', 'z)'),
+    'link_attributes': ('[a](x) {: ', 'b ', '', ''),
+    'reference_links': ('', '[a] [', ']', ''),
+    'unclosed_emphasis': ('a *b', ' **c', '', ''),
+    'unclosed_double_emphasis': ('a **b', ' *c', '', ''),
+    'star_runs': ('a ', '*', '', ' b'),
+    'images': ('', '![', '', ''),
+    'code_spans': ('', '`a', '', ''),
+    'inline_math': ('', '\\(a', '', ''),
+    'strikethrough': ('', '~~a ', '', ''),
+    'html': ('', '<a ', '', ''),
+    'cell_properties': ('| a |\n|--|\n| b', ' ', '', '{: c\n'),
+}
+
+_FUZZ_TOKENS = (
+    '*', '**', '***', '[', ']', '](', '(', ')', '![', '"', "'", '<', '>',
+    '`', '```', '$', '$$', '\\(', '\\)', '~~', '_', '{:', '}', '|', '#',
+    '-', '> ', '    ', ' ', ' ', '\n', '\n\n', 'a', 'word', 'http://x.co',
+    'asset:a', '\\',
+)
+
+
+#
+#   Corpus generation
+#
+
+def generate_corpus(feature, n_docs, seed=0, asset_slugs=None):
+    """Generates a deterministic list of markdown documents for a feature"""
+    rng = random.Random('%s:%s' % (feature, seed))
+    generator = _GENERATORS[feature]
+    return [generator(rng, asset_slugs=asset_slugs) for _ in range(n_docs)]
+
+
+def generate_prose(rng, n_paragraphs=30, **kwargs):
+    """Generates a prose document (headings, emphasis, links and lists)"""
+    ret = list()
+    for i in range(n_paragraphs):
+        if i % 8 == 0:
+            ret.append('## %s' % _words(rng, 4).title())
+        if i % 5 == 4:
+            ret.append('\n'.join('- %s' % _words(rng, 6) for _ in range(4)))
+            continue
+        words = _words(rng, 60).split(' ')
+        words[3] = '*%s*' % words[3]
+        words[10] = '**%s**' % words[10]
+        words[20] = '[%s](https://www.example.com/%d)' % (words[20], i)
+        words[30] = '`%s`' % words[30]
+        ret.append(' '.join(words))
+    return '\n\n'.join(ret) + '\n'
+
+
+def generate_tables(rng, n_tables=2, n_rows=200, n_cols=6, **kwargs):
+    """Generates large tables with cell properties and row headers"""
+    ret = list()
+    for _ in range(n_tables):
+        ret.append(_words(rng, 12))
+        lines = [
+            '| %s |' % ' | '.join(_words(rng, 1) for _ in range(n_cols)),
+            '|#--|%s' % '|'.join(rng.choice(('--', ':--', '--:', ':-:'))
+                                 for _ in range(n_cols - 1)) + '|',
+        ]
+        for r in range(n_rows):
+            cells = list()
+            for c in range(n_cols):
+                cell = '%.3f' % rng.random() if c else 'row %d' % r
+                if rng.random() < 0.2:
+                    cell = '%s {: %s }' % (cell, rng.choice(('red', 'green')))
+                elif rng.random() < 0.1:
+                    cell = '*%s*' % cell
+                cells.append(cell)
+            lines.append('| %s |' % ' | '.join(cells))
+        ret.append('\n'.join(lines))
+    return '\n\n'.join(ret) + '\n'
+
+
+def generate_math(rng, n_paragraphs=30, **kwargs):
+    """Generates a document dense with inline and block math"""
+    ret = list()
+    for i in range(n_paragraphs):
+        snippet = _MATH_SNIPPETS[i % len(_MATH_SNIPPETS)] % {'i': i}
+        ret.append('%s %s %s' % (_words(rng, 10), snippet, _words(rng, 10)))
+    return '\n\n'.join(ret) + '\n'
+
+
+def generate_code(rng, n_blocks=30, **kwargs):
+    """Generates a document with many fenced code blocks in many languages"""
+    ret = list()
+    for i in range(n_blocks):
+        lang, code = rng.choice(_CODE_SNIPPETS)
+        ret.append(_words(rng, 15))
+        ret.append('```%s\n%s```' % (lang, code % {'i': rng.randint(0, 20)}))
+    return '\n\n'.join(ret) + '\n'
+
+
+def generate_assets(rng, n_refs=50, asset_slugs=None, **kwargs):
+    """Generates a document dense with asset references"""
+    if not asset_slugs:
+        asset_slugs = ['benchmark-asset-%d' % i for i in range(10)]
+
+    ret = list()
+    for i in range(n_refs):
+        slug = rng.choice(asset_slugs)
+        kind = i % 4
+        if kind == 0:
+            ret.append('![%s](asset:%s)' % (_words(rng, 2), slug))
+        elif kind == 1:
+            ret.append('![](asset:%s:size=%dx%d) {: image-fluid }'
+                       % (slug, 100 * rng.randint(1, 4), 100))
+        elif kind == 2:
+            ret.append('%s [%s](asset:%s) %s' % (
+                _words(rng, 8), _words(rng, 2), slug, _words(rng, 8)
+            ))
+        else:
+            ret.append('%s [%s](https://www.example.com/%d)'
+                       % (_words(rng, 8), _words(rng, 2), i))
+    return '\n\n'.join(ret) + '\n'
+
+
+def generate_table_document(n_rows, n_cols=6, seed=0):
+    """Generates a document holding a single table of the given size"""
+    rng = random.Random('table:%s:%s:%s' % (n_rows, n_cols, seed))
+    return generate_tables(rng, n_tables=1, n_rows=n_rows, n_cols=n_cols)
+
+
+def generate_pathological(name, n):
+    """Generates a pathological document of (roughly) size n"""
+    head, repeated, closing, tail = PATHOLOGICAL[name]
+    return head + repeated * n + closing * n + tail
+
+
+def generate_fuzz(rng, n_tokens=500):
+    """Generates a random document dense with markdown syntax"""
+    return ''.join(rng.choice(_FUZZ_TOKENS) for _ in range(n_tokens))
+
+
+_GENERATORS = {
+    'prose': generate_prose,
+    'tables': generate_tables,
+    'math': generate_math,
+    'code': generate_code,
+    'assets': generate_assets,
+}
+
+
+#
+#   Measurement
+#
+
+def time_documents(render, documents, repeat=3, setup=None):
+    """Gets the best time (in seconds) to render all the documents"""
+    def run():
+        if setup is not None:
+            setup()
+        for doc in documents:
+            render(doc)
+
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def peak_memory(render, documents, setup=None):
+    """Gets the peak memory (in bytes) allocated rendering the documents"""
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        for doc in documents:
+            render(doc)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def output_digest(html):
+    """Gets a digest of rendered output for checking it is unchanged"""
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+
+def load_baseline(path):
+    """Loads saved benchmark results"""
+    with open(path, 'r') as fin:
+        return json.load(fin)
+
+
+def save_baseline(path, results):
+    """Saves benchmark results for later comparison"""
+    with open(path, 'w') as fout:
+        json.dump(results, fout, indent=2, sort_keys=True)
+
+
+def find_regressions(results, baseline, threshold=0.1):
+    """Gets (feature, metric, old, new) for metrics worse than baseline"""
+    ret = list()
+    for feature, new in sorted(results.items()):
+        old = baseline.get(feature, None)
+        if old is None:
+            continue
+        if new['docs_per_sec'] < old['docs_per_sec'] * (1. - threshold):
+            ret.append((feature, 'docs_per_sec', old['docs_per_sec'],
+                        new['docs_per_sec']))
+        if new['peak_kb'] > old['peak_kb'] * (1. + threshold):
+            ret.append((feature, 'peak_kb', old['peak_kb'], new['peak_kb']))
+    return ret
+
+
+#
+#   Helper functions
+#
+
+def _words(rng, n):
+    """Helper function to get n random words"""
+    return ' '.join(rng.choice(_WORDS) for _ in range(n))
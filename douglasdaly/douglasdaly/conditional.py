@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Conditional GET support (ETag / Last-Modified) for views whose content
+can be validated without rendering it.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import hashlib
+from datetime import datetime
+
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .memo import memoize
+from .page_cache import SITE_TAGS, get_tag_versions
+
+
+#
+#   Functions
+#
+
+def conditional_page(get_validators):
+    """Decorator to answer conditional GETs for a view with 304s
+
+    get_validators(request, *args, **kwargs) is given the view's arguments
+    and should cheaply get the page cache tags the page depends on (besides
+    SITE_TAGS) along with the time its content was last modified (or None).
+    It should return None if the request can't be validated, e.g. when the
+    view would raise a 404.
+    """
+    name = 'conditional:%s.%s' % (get_validators.__module__,
+                                  get_validators.__qualname__)
+
+    def get_etag(request, *args, **kwargs):
+        found = memoize(name, __get_validators, get_validators, request,
+                        *args, **kwargs)
+        return found and found[0]
+
+    def get_last_modified(request, *args, **kwargs):
+        found = memoize(name, __get_validators, get_validators, request,
+                        *args, **kwargs)
+        return found and found[1]
+
+    return condition(etag_func=get_etag, last_modified_func=get_last_modified)
+
+
+#
+#   Helper Functions
+#
+
+def __get_validators(get_validators, request, *args, **kwargs):
+    """Helper function to get the ETag and Last-Modified time for a page"""
+    found = get_validators(request, *args, **kwargs)
+    if found is None:
+        return None
+    tags, last_modified = found
+
+    versions = get_tag_versions(set(SITE_TAGS) | set(tags))
+    variant = (request.get_full_path(),
+               request.session.get('sort_tab', 'date'))
+    etag = hashlib.sha256(repr((
+        sorted(versions.items()), last_modified, variant
+    )).encode('utf-8')).hexdigest()
+
+    # - Purging any of the tags counts as modifying the page
+    purged = datetime.fromtimestamp(max(x[0] for x in versions.values()),
+                                    timezone.utc)
+    if last_modified is None or purged > last_modified:
+        last_modified = purged
+
+    return etag, last_modified
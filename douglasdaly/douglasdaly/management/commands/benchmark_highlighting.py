@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Management command for benchmarking code block highlighting.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pygments import highlight
+from pygments.lexers import get_lexer_by_name
+from pygments.formatters.html import HtmlFormatter
+
+from ...markdown import highlight_code, get_lexer, get_formatter
+
+
+#
+#   Variables
+#
+
+_SNIPPETS = (
+    ('python', 'def fib(n):\n    """Fibonacci number %d"""\n    a, b = 0, 1\n'
+               '    for _ in range(n):\n        a, b = b, a + b\n'
+               '    return a\n'),
+    ('javascript', 'function add%d(a, b) {\n  const c = a + b;\n'
+                   '  console.log(`sum: ${c}`);\n  return c;\n}\n'),
+    ('sql', 'SELECT p.id, p.title -- query %d\nFROM blog_post p\n'
+            'WHERE p.published = 1\nORDER BY p.display_date DESC;\n'),
+    ('bash', 'for f in *.txt; do  # loop %d\n  echo "$f"\n  wc -l "$f"\n'
+             'done\n'),
+    ('c', '#include <stdio.h>\n\nint main(void) {\n'
+          '    printf("%%d\\n", %d);\n    return 0;\n}\n'),
+)
+
+
+#
+#   Command
+#
+
+class Command(BaseCommand):
+    """
+    Compares uncached and memoized pygments highlighting
+    """
+    help = "Benchmarks code block highlighting on a code-heavy post"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blocks', type=int, default=200,
+                            help="Number of code blocks in the post")
+        parser.add_argument('--unique', type=int, default=40,
+                            help="Number of distinct code snippets")
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Number of renders of the post to time")
+
+    def handle(self, *args, **options):
+        n_unique = max(options['unique'], 1)
+        blocks = list()
+        for i in range(options['blocks']):
+            lang, code = _SNIPPETS[i % len(_SNIPPETS)]
+            blocks.append((lang, code % (i % n_unique)))
+
+        def uncached():
+            return [highlight(code, get_lexer_by_name(lang, stripall=True),
+                              HtmlFormatter(linenos="inline"))
+                    for lang, code in blocks]
+
+        def cached():
+            return [highlight_code(code, lang) for lang, code in blocks]
+
+        def cold():
+            highlight_code.cache_clear()
+            get_lexer.cache_clear()
+            get_formatter.cache_clear()
+            return cached()
+
+        if uncached() != cold():
+            raise CommandError("Memoized highlighting output differs")
+
+        repeat = options['repeat']
+        t_uncached = timeit.timeit(uncached, number=repeat) / repeat
+        t_cold = timeit.timeit(cold, number=repeat) / repeat
+        cached()
+        t_warm = timeit.timeit(cached, number=repeat) / repeat
+
+        self.stdout.write("Blocks: %d (%d unique)" % (len(blocks),
+                                                      len(set(blocks))))
+        self.stdout.write("Uncached:        %8.2f ms/post"
+                          % (1e3 * t_uncached))
+        self.stdout.write("Memoized (cold): %8.2f ms/post (%.1fx)"
+                          % (1e3 * t_cold, t_uncached / t_cold))
+        self.stdout.write("Memoized (warm): %8.2f ms/post (%.1fx)"
+                          % (1e3 * t_warm, t_uncached / t_warm))
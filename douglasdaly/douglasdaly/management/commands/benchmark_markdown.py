@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Management command for benchmarking markdown rendering.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+from django.core.management.base import BaseCommand, CommandError
+
+from assets.models import ImageAsset
+
+from ...benchmarks import (
+    FEATURES, generate_corpus, time_documents, peak_memory, load_baseline,
+    save_baseline, find_regressions
+)
+from ...markdown import create_markdown, highlight_code
+
+
+#
+#   Command
+#
+
+class Command(BaseCommand):
+    """
+    Renders a generated corpus and reports throughput and memory use
+    """
+    help = "Benchmarks markdown rendering over a generated post corpus"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--features', nargs='+', choices=FEATURES,
+                            default=FEATURES,
+                            help="Document features to benchmark")
+        parser.add_argument('--docs', type=int, default=20,
+                            help="Number of documents per feature")
+        parser.add_argument('--repeat', type=int, default=3,
+                            help="Number of timed runs (best is reported)")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Seed for the generated corpus")
+        parser.add_argument('--save-baseline', metavar='PATH',
+                            help="Save the results to the given file")
+        parser.add_argument('--compare', metavar='PATH',
+                            help="Compare the results to a saved baseline")
+        parser.add_argument('--threshold', type=float, default=0.1,
+                            help="Relative change flagged as a regression")
+
+    def handle(self, *args, **options):
+        md = create_markdown()
+        asset_slugs = list(ImageAsset.objects.values_list('slug', flat=True)
+                           .order_by('slug')[:25])
+
+        results = dict()
+        self.stdout.write("%-8s %10s %12s %10s %12s" % (
+            'Feature', 'Docs', 'ms/doc', 'Docs/s', 'Peak (KB)'
+        ))
+        for feature in options['features']:
+            corpus = generate_corpus(feature, options['docs'],
+                                     seed=options['seed'],
+                                     asset_slugs=asset_slugs)
+            t_total = time_documents(md, corpus, repeat=options['repeat'],
+                                     setup=highlight_code.cache_clear)
+            peak = peak_memory(md, corpus, setup=highlight_code.cache_clear)
+
+            results[feature] = {
+                'docs': len(corpus),
+                'ms_per_doc': 1e3 * t_total / len(corpus),
+                'docs_per_sec': len(corpus) / t_total,
+                'peak_kb': peak / 1024.,
+            }
+            self.stdout.write("%-8s %10d %12.2f %10.1f %12.1f" % (
+                feature, len(corpus), results[feature]['ms_per_doc'],
+                results[feature]['docs_per_sec'], results[feature]['peak_kb']
+            ))
+
+        if options['save_baseline']:
+            save_baseline(options['save_baseline'], results)
+            self.stdout.write("Saved baseline to %s"
+                              % options['save_baseline'])
+
+        if options['compare']:
+            baseline = load_baseline(options['compare'])
+            regressions = find_regressions(results, baseline,
+                                           threshold=options['threshold'])
+            for feature, metric, old, new in regressions:
+                self.stdout.write(self.style.ERROR(
+                    "Regression: %s %s %.1f -> %.1f" % (feature, metric, old,
+                                                        new)
+                ))
+            if regressions:
+                raise CommandError("%d regression(s) against %s"
+                                   % (len(regressions), options['compare']))
+            self.stdout.write(self.style.SUCCESS(
+                "No regressions against %s" % options['compare']
+            ))
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Management command for benchmarking building the blog sidebar.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import random
+import timeit
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.counts import recount_post_counts, clear_listing_counts
+from blog.models import Post, Category, Tag, Author
+from blog.sidebar import build_sidebar_index
+
+
+#
+#   Command
+#
+
+class Command(BaseCommand):
+    """
+    Builds the (cold cache) sidebar index over a growing set of generated
+    posts and reports the time and number of queries taken.  Everything
+    generated is rolled back afterwards.
+    """
+    help = "Benchmarks building the blog sidebar with a cold cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, nargs='+',
+                            default=[100, 1000, 10000, 100000],
+                            help="Numbers of posts to benchmark")
+        parser.add_argument('--categories', type=int, default=10,
+                            help="Number of categories to generate")
+        parser.add_argument('--tags', type=int, default=100,
+                            help="Number of tags to generate")
+        parser.add_argument('--authors', type=int, default=5,
+                            help="Number of authors to generate")
+        parser.add_argument('--repeat', type=int, default=3,
+                            help="Number of timed runs (best is reported)")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Seed for the generated posts")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        results = list()
+        with transaction.atomic():
+            related = self._create_related(options)
+
+            # - The first build also loads the URL configuration
+            build_sidebar_index()
+
+            self.stdout.write("%8s %8s %10s %12s" % (
+                'Posts', 'Queries', 'ms', 'us/post'
+            ))
+            n_posts = 0
+            for target in sorted(options['posts']):
+                self._create_posts(rng, n_posts, target, *related)
+                n_posts = target
+
+                with CaptureQueriesContext(connection) as queries:
+                    build_sidebar_index()
+                t_build = min(timeit.repeat(build_sidebar_index, number=1,
+                                            repeat=options['repeat']))
+
+                results.append((n_posts, len(queries)))
+                self.stdout.write("%8d %8d %10.1f %12.2f" % (
+                    n_posts, len(queries), 1e3 * t_build,
+                    1e6 * t_build / n_posts
+                ))
+
+            transaction.set_rollback(True)
+
+        if len(set(x[1] for x in results)) > 1:
+            raise CommandError("Number of queries grew with the number of "
+                               "posts: %s" % ', '.join(
+                                   '%d (%d posts)' % (q, n)
+                                   for n, q in results
+                               ))
+        self.stdout.write(self.style.SUCCESS(
+            "Sidebar built with %d queries at every size" % results[0][1]
+        ))
+
+    @staticmethod
+    def _create_related(options):
+        """Creates the categories, tags and authors to use for posts"""
+        categories = Category.objects.bulk_create(
+            Category(name='Benchmark %d' % i, slug='benchmark-%d' % i)
+            for i in range(options['categories'])
+        )
+        tags = list()
+        for i in range(options['tags']):
+            tag = Tag(name='%s benchmark %d' % ('abcxyz'[i % 6], i),
+                      slug='benchmark-%d' % i)
+            tag._category = tag.get_category_from_name()
+            tags.append(tag)
+        tags = Tag.objects.bulk_create(tags)
+        authors = Author.objects.bulk_create(
+            Author(slug='benchmark-%d' % i, first_name='Author %d' % i)
+            for i in range(options['authors'])
+        )
+
+        # - bulk_create only sets primary keys on some databases
+        categories = list(Category.objects.filter(slug__in=[
+            x.slug for x in categories
+        ]))
+        tags = list(Tag.objects.filter(slug__in=[x.slug for x in tags]))
+        authors = list(Author.objects.filter(slug__in=[
+            x.slug for x in authors
+        ]))
+        return categories, tags, authors
+
+    @staticmethod
+    def _create_posts(rng, start, stop, categories, tags, authors,
+                      batch_size=500):
+        """Creates (published) posts start to stop with a few tags each
+
+        As bulk_create skips the signals which maintain the counts of posts
+        per category, tag and author, they're recounted afterwards.
+        """
+        now = timezone.now()
+        for batch in range(start, stop, batch_size):
+            posts = list()
+            for i in range(batch, min(batch + batch_size, stop)):
+                date = now - timedelta(hours=i)
+                posts.append(Post(
+                    title='Benchmark post %d' % i,
+                    slug='benchmark-post-%d' % i, body='Post %d' % i,
+                    category=rng.choice(categories),
+                    author=rng.choice(authors), posted=date,
+                    publish_date=date, display_date=date, published=True
+                ))
+            Post.objects.bulk_create(posts)
+
+            posts = Post.objects.filter(slug__in=[x.slug for x in posts])\
+                .values_list('id', flat=True)
+            Post.tags.through.objects.bulk_create(
+                Post.tags.through(post_id=post_id, tag_id=tag.id)
+                for post_id in posts for tag in rng.sample(tags, 3)
+            )
+
+        recount_post_counts()
+        clear_listing_counts()
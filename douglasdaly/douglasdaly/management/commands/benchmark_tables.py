@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Management command for benchmarking rendering of very large tables.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmarks import (
+    generate_table_document, time_documents, output_digest, load_baseline,
+    save_baseline
+)
+from ...markdown import create_markdown
+
+
+#
+#   Command
+#
+
+class Command(BaseCommand):
+    """
+    Renders generated tables of increasing size and reports the cost per
+    cell, optionally checking the output against saved digests
+    """
+    help = "Benchmarks markdown rendering of very large tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+',
+                            default=[1000, 2500, 5000, 10000],
+                            help="Table sizes (in rows) to benchmark")
+        parser.add_argument('--cols', type=int, default=6,
+                            help="Number of columns in each table")
+        parser.add_argument('--repeat', type=int, default=3,
+                            help="Number of timed runs (best is reported)")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Seed for the generated tables")
+        parser.add_argument('--save-output', metavar='PATH',
+                            help="Save digests of the rendered output")
+        parser.add_argument('--check-output', metavar='PATH',
+                            help="Check the rendered output against saved "
+                                 "digests")
+
+    def handle(self, *args, **options):
+        md = create_markdown()
+
+        digests = dict()
+        self.stdout.write("%8s %8s %12s %12s" % (
+            'Rows', 'Cells', 'ms/table', 'us/cell'
+        ))
+        for n_rows in options['rows']:
+            doc = generate_table_document(n_rows, n_cols=options['cols'],
+                                          seed=options['seed'])
+            n_cells = (n_rows + 1) * options['cols']
+
+            t_total = time_documents(md, [doc], repeat=options['repeat'])
+            digests[str(n_rows)] = output_digest(md(doc))
+
+            self.stdout.write("%8d %8d %12.1f %12.2f" % (
+                n_rows, n_cells, 1e3 * t_total, 1e6 * t_total / n_cells
+            ))
+
+        if options['save_output']:
+            save_baseline(options['save_output'], digests)
+            self.stdout.write("Saved output digests to %s"
+                              % options['save_output'])
+
+        if options['check_output']:
+            expected = load_baseline(options['check_output'])
+            changed = [k for k, v in sorted(digests.items(), key=lambda x:
+                                            int(x[0]))
+                       if k in expected and expected[k] != v]
+            for n_rows in changed:
+                self.stdout.write(self.style.ERROR(
+                    "Output changed for the %s row table" % n_rows
+                ))
+            if changed:
+                raise CommandError("%d table(s) rendered differently"
+                                   % len(changed))
+            self.stdout.write(self.style.SUCCESS(
+                "Output matches %s" % options['check_output']
+            ))
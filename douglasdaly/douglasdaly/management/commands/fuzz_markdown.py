@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Management command for checking markdown render times on hostile input.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import random
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmarks import PATHOLOGICAL, generate_pathological, generate_fuzz
+from ...markdown import (
+    create_markdown, render_plain_text, RenderLimitExceeded
+)
+
+
+#
+#   Command
+#
+
+class Command(BaseCommand):
+    """
+    Renders pathological and randomly generated documents under a time
+    budget and fails if any of them takes (much) longer than the budget
+    """
+    help = "Checks markdown render time is bounded on pathological input"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cases', nargs='+', choices=sorted(PATHOLOGICAL),
+                            default=sorted(PATHOLOGICAL),
+                            help="Pathological cases to render")
+        parser.add_argument('--sizes', type=int, nargs='+',
+                            default=[1000, 4000, 16000],
+                            help="Sizes of the pathological documents")
+        parser.add_argument('--fuzz', type=int, default=200,
+                            help="Number of random documents to render")
+        parser.add_argument('--tokens', type=int, default=2000,
+                            help="Number of tokens in each random document")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Seed for the random documents")
+        parser.add_argument('--budget', type=float, default=1.0,
+                            help="Time budget (in seconds) per document")
+        parser.add_argument('--grace', type=float, default=0.5,
+                            help="Time (in seconds) allowed over the budget")
+
+    def handle(self, *args, **options):
+        md = create_markdown()
+        limit = options['budget'] + options['grace']
+
+        failures = list()
+        self.stdout.write("%-26s %8s %10s %10s  %s" % (
+            'Case', 'Size', 'Chars', 'ms', 'Result'
+        ))
+        for case in options['cases']:
+            for size in options['sizes']:
+                doc = generate_pathological(case, size)
+                elapsed, result = self._render(md, doc, options['budget'])
+                self.stdout.write("%-26s %8d %10d %10.1f  %s" % (
+                    case, size, len(doc), 1e3 * elapsed, result
+                ))
+                if elapsed > limit:
+                    failures.append(('%s (%d)' % (case, size), elapsed))
+
+        rng = random.Random(options['seed'])
+        worst = 0.
+        results = dict()
+        for i in range(options['fuzz']):
+            doc = generate_fuzz(rng, n_tokens=options['tokens'])
+            elapsed, result = self._render(md, doc, options['budget'])
+            results[result] = results.get(result, 0) + 1
+            worst = max(worst, elapsed)
+            if elapsed > limit:
+                failures.append(('fuzz #%d' % i, elapsed))
+
+        if options['fuzz'] > 0:
+            self.stdout.write("Rendered %d random documents (%s), worst "
+                              "%.1fms" % (options['fuzz'], ', '.join(
+                                  '%s: %d' % x for x in sorted(results.items())
+                              ), 1e3 * worst))
+
+        for name, elapsed in failures:
+            self.stdout.write(self.style.ERROR(
+                "Too slow: %s took %.1fms" % (name, 1e3 * elapsed)
+            ))
+        if failures:
+            raise CommandError("%d document(s) took over %.2fs to render"
+                               % (len(failures), limit))
+        self.stdout.write(self.style.SUCCESS(
+            "All documents rendered within %.2fs" % limit
+        ))
+
+    @staticmethod
+    def _render(md, doc, budget):
+        """Renders a document under the budget, returns (seconds, result)"""
+        start = timeit.default_timer()
+        md.set_budget(budget)
+        try:
+            md(doc)
+            result = 'ok'
+        except RenderLimitExceeded:
+            render_plain_text(doc)
+            result = 'plain text'
+        except Exception as e:
+            result = type(e).__name__
+        finally:
+            md.set_budget(None)
+        return timeit.default_timer() - start, result
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Management command for inspecting the rendered markdown cache.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+from ...markdown import (
+    render_markdown, get_render_cache_stats, reset_render_cache_stats,
+    clear_render_cache
+)
+from ...models import Page
+
+
+#
+#   Command
+#
+
+class Command(BaseCommand):
+    """
+    Displays (and optionally resets) rendered markdown cache statistics
+
+    The statistics are kept by each worker, so these are the ones for this
+    command's own process (e.g. after --warm).
+    """
+    help = "Shows hit/miss statistics for the rendered markdown cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--warm', action='store_true',
+                            help="Render every post and page through the "
+                                 "cache first")
+        parser.add_argument('--reset', action='store_true',
+                            help="Reset the hit/miss counters")
+        parser.add_argument('--clear', action='store_true',
+                            help="Remove all cached rendered markdown")
+
+    def handle(self, *args, **options):
+        if options['warm']:
+            for value in Post.objects.values_list('body', flat=True):
+                render_markdown(value)
+            for value in Page.objects.values_list('content', flat=True):
+                render_markdown(value)
+
+        stats = get_render_cache_stats()
+        self.stdout.write("Hits:      %d" % stats['hits'])
+        self.stdout.write("Misses:    %d" % stats['misses'])
+        self.stdout.write("Hit ratio: %.1f%%" % (100. * stats['hit_ratio']))
+
+        if options['clear']:
+            clear_render_cache()
+            self.stdout.write(self.style.SUCCESS("Cleared rendered markdown"))
+        elif options['reset']:
+            reset_render_cache_stats()
+            self.stdout.write(self.style.SUCCESS("Reset cache statistics"))
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Management command for pre-generating all needed thumbnails.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+from django.core.management.base import BaseCommand
+
+from assets.thumbnails import pregenerate_thumbnails
+from blog.models import Post
+
+from ...models import Page
+
+
+#
+#   Command
+#
+
+class Command(BaseCommand):
+    """
+    Generates every thumbnail used by the blog posts and site pages
+    """
+    help = "Pre-generates the thumbnails for all blog posts and site pages"
+
+    def handle(self, *args, **options):
+        requests = list()
+        for post in Post.objects.only('pk', 'body', 'icon_image').iterator():
+            requests.extend(post.get_thumbnail_requests())
+        for page in Page.objects.only('pk', 'content').iterator():
+            requests.extend(page.get_thumbnail_requests())
+
+        n_requested = len(set(requests))
+        n_done = pregenerate_thumbnails(requests, block=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            "Generated %d of %d thumbnail(s)" % (n_done, n_requested)
+        ))
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Management command for rebuilding the post search index.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+from django.core.management.base import BaseCommand
+
+from blog.search import get_search_backend, rebuild_search_index
+
+
+#
+#   Command
+#
+
+class Command(BaseCommand):
+    """
+    Rebuilds the post search index for the configured backend
+    """
+    help = "Rebuilds the post search index (e.g. after switching backends, "\
+        "the database is searched until the bm25 index is built)"
+
+    def handle(self, *args, **options):
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            "Rebuilt the %s search index" % get_search_backend()
+        ))
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Management command for pre-rendering stored markdown content.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from blog.models import Post
+
+from ...markdown import RENDERER_VERSION
+from ...models import Page
+
+
+#
+#   Command
+#
+
+class Command(BaseCommand):
+    """
+    Renders and stores the HTML for all posts and pages
+    """
+    help = "Pre-renders the stored HTML for all blog posts and site pages"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale', action='store_true',
+                            help="Only render items rendered by an older "
+                                 "renderer version (or stored as plain text)")
+
+    def handle(self, *args, **options):
+        posts = Post.objects.all()
+        pages = Page.objects.all()
+        if options['stale']:
+            posts = posts.filter(~Q(body_html_version=RENDERER_VERSION) |
+                                 Q(body_is_fallback=True))
+            pages = pages.filter(~Q(content_html_version=RENDERER_VERSION) |
+                                 Q(content_is_fallback=True))
+
+        n_posts = n_plain = 0
+        for post in posts.only('pk', 'body').iterator():
+            post.render_body()
+            Post.objects.filter(pk=post.pk).update(
+                body_html=post.body_html,
+                body_html_version=post.body_html_version,
+                body_is_fallback=post.body_is_fallback,
+                body_text=post.body_text,
+                body_text_offsets=post.body_text_offsets
+            )
+            n_posts += 1
+            n_plain += post.body_is_fallback
+
+        n_pages = 0
+        for page in pages.only('pk', 'content').iterator():
+            page.render_content()
+            Page.objects.filter(pk=page.pk).update(
+                content_html=page.content_html,
+                content_html_version=page.content_html_version,
+                content_is_fallback=page.content_is_fallback
+            )
+            n_pages += 1
+            n_plain += page.content_is_fallback
+
+        self.stdout.write(self.style.SUCCESS(
+            "Rendered %d post(s) and %d page(s)" % (n_posts, n_pages)
+        ))
+        if n_plain:
+            self.stdout.write(self.style.WARNING(
+                "%d item(s) couldn't be rendered within the render budget "
+                "and were stored as plain text" % n_plain
+            ))
@@ -0,0 +1,881 @@
+# -*- coding: utf-8 -*-
+"""
+Code for markdown/pygments rendering
+
+    Code-styling based on code from www.IgnoredByDinosaurs.com
+
+"""
+#
+#   Imports
+#
+import re
+import time
+import hashlib
+import logging
+import threading
+from collections import Counter
+from functools import lru_cache
+from html.parser import HTMLParser
+
+from django.conf import settings
+from django.core.cache import caches
+
+import mistune
+from mistune_contrib import math
+from pygments import highlight
+from pygments.util import ClassNotFound
+from pygments.lexers import get_lexer_by_name
+from pygments.formatters.html import HtmlFormatter
+
+from assets.utils import AssetRenderer
+
+
+#
+#   Variables
+#
+
+# - Increment whenever a change alters the rendered output, so stored and
+#   cached HTML from older renderers is rendered again
+RENDERER_VERSION = 3
+
+logger = logging.getLogger(__name__)
+
+_CACHE_NAME = 'markdown'
+_CACHE_KEY_PREFIX = 'md'
+_BLOCK_CACHE_KEY_PREFIX = 'mdb'
+_FALLBACK_CACHE_KEY_PREFIX = 'mdf'
+_FALLBACK_CACHE_TIMEOUT = 60 * 60
+
+# - Anything that could be a (possibly nested) link or footnote definition
+_DEF_LIKE_RE = re.compile(r'\[[^\]]*\]:')
+
+# - What an inline rule's match starts with and any text it can't match
+#   without (somewhere after that), so it's only tried where it could start
+#   and while there's some of that text left, rather than scanning the rest
+#   of the text for it from every position
+_INLINE_BOUNDS = dict(
+    math=('\\', (re.compile(r'\\\)'),)),
+    escape=('\\', ()),
+    inline_html=('<', (re.compile(r'>'),)),
+    autolink=('<', (re.compile(r'>'),)),
+    url=('h', ()),
+    footnote=('[', ()),
+    link=('![', (re.compile(r'\]\('), re.compile(r'\)'))),
+    reflink=('![', ()),
+    nolink=('![', ()),
+    double_emphasis=('*', (re.compile(r'[^\*]\*\*'),)),
+    emphasis=('*', (re.compile(r'[^\*]\*'),)),
+    code=('`', (re.compile(r'[^`]`'),)),
+    linebreak=(' ', ()),
+    strikethrough=('~', (re.compile(r'(?=\S~~)'),)),
+)
+# - Inline rules which only match references to link definitions
+_LINK_REF_RULES = ('reflink', 'nolink')
+# - What ends a link's title (see CustomInlineGrammar.untitled_link)
+_LINK_TITLE_ENDS = (re.compile(r'''['"]\s*\)'''),)
+
+_HIGHLIGHT_CACHE_SIZE = 512
+
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+
+# - Math left in rendered text (see CustomRenderer and MathRendererMixin)
+_MATH_RE = re.compile(r'\$\$.+?\$\$|\\\(.+?\\\)|\\\[.+?\\\]|'
+                      r'\\begin\{([^}]+)\}.+?\\end\{\1\}', re.S)
+
+# - Table parsing, where "(?:(?<! )|(?=\|))" only lets a match start at the
+#   beginning of a run of spaces (the leftmost match anyway) or at a pipe,
+#   so long runs of spaces aren't rescanned from every position within them
+_TABLE_CELLS_END_RE = re.compile(r'(?:(?:(?<! )|(?=\|)) *\| *)?\n$')
+_NPTABLE_CELLS_END_RE = re.compile(r'\n$')
+_TABLE_ROW_EDGES_RE = re.compile(r'^ *\| *|(?:(?<! )|(?=\|)) *\| *$')
+_TABLE_CELL_SPLIT_RE = re.compile(r'(?:(?<! )|(?=\|)) *(?<!\\)\| *')
+_TABLE_HEADER_EDGES_RE = re.compile(r'^ *|(?:(?<! )|(?=\|)) *\| *$')
+_TABLE_SPLIT_RE = re.compile(r'(?:(?<! )|(?=\|)) *\| *')
+_TABLE_ALIGN_STRIP_RE = re.compile(r' *|\| *$')
+_TABLE_ALIGNS = (
+    (re.compile(r'^ *-+: *$'), 'right'),
+    (re.compile(r'^ *:-+: *$'), 'center'),
+    (re.compile(r'^ *:-+ *$'), 'left'),
+)
+# - Cell text no inline rule (or math) could match, beyond plain text
+_PLAIN_CELL_RE = re.compile(r'^[^\\<>!\[\]_*`~$:\n]*$')
+_ESCAPED_PIPE_RE = re.compile(r'\\\\\|')
+_CELL_PROPS_LENGTH = 256
+_CELL_PROPS = (
+    ('class', (re.compile(r'^(.*)(?:\s+\{:\s*([^\}.]+)\s+\})\s*$'), 2, 1)),
+)
+
+_local = threading.local()
+
+# - Hit/miss counts for the rendered markdown cache, kept by each worker
+#   (so a cache hit never writes to the cache)
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+#
+#   Classes
+#
+
+class RenderLimitExceeded(Exception):
+    """
+    Raised when a document takes too long (or nests too deeply) to render
+    """
+    pass
+
+
+class CustomRenderer(math.MathRendererMixin, AssetRenderer):
+    """
+    Custom Renderer class for Markdown content
+    """
+
+    def math(self, text):
+        """Render math for MathJax"""
+        return '\\(%s\\)' % text
+
+    def block_code(self, code, lang=None):
+        """Render code blocks using pygments"""
+        if not lang:
+            return '\n<div class="highlight"><pre><code>' + \
+                   '%s</code></pre></div>\n' % mistune.escape(code)
+
+        ret = highlight_code(code, lang.lower())
+        if ret is None:
+            return self.block_code(code)
+        return ret
+
+    def table(self, header, body):
+        """Render table utilizing bootstrap tables"""
+        ret = (
+            '<div class="table-container">\n'
+            '<table class="table table-sm table-hover table-bordered '
+            'table-striped">\n'
+            '<thead class="thead-dark bg-primary">%s</thead>\n'
+            '<tbody>\n%s</tbody>\n</table>\n</div>\n'
+        ) % (header, body)
+        return '<div class="table-responsive">%s</div>' % ret
+
+    def table_row(self, content, **flags):
+        """Render table rows with some customization"""
+        klass = flags.get('class', None)
+
+        if klass:
+            return '<tr class="%s">%s</tr>\n' % (klass, content)
+        return '<tr>%s</tr>\n' % content
+
+    def table_cell(self, content, **flags):
+        """Render table cells with some customization"""
+        if flags['header'] or flags.get('row_header', False):
+            tag = 'th'
+            scope = 'col'
+        else:
+            tag = 'td'
+            scope = None
+
+        if flags.get('row_header', False):
+            scope = 'row'
+            klass = None
+        else:
+            klass = flags.get('class', None)
+
+        align = flags['align']
+
+        ret = [tag]
+        if klass:
+            ret.append('class="%s"' % klass)
+        if scope:
+            ret.append('scope="%s"' % scope)
+        if align:
+            ret.append('style="text-align: %s"' % align)
+
+        return '<%s>%s</%s>' % (' '.join(ret), content, tag)
+
+
+class CustomBlockGrammar(mistune.BlockGrammar):
+    """
+    Block grammar for customized tables
+    """
+    table = re.compile(
+        r'^ *\|(.+)\n *\|( *[#-:]+[-| :]*)\n((?: *\|.*(?:\n|$))*)\n*'
+    )
+
+
+class CustomBlockLexer(math.MathBlockMixin, mistune.BlockLexer):
+    """
+    Block Lexer for MathJax support
+    """
+    grammar_class = CustomBlockGrammar
+
+    def __init__(self, *args, **kwargs):
+        super(CustomBlockLexer, self).__init__(*args, **kwargs)
+        self.default_rules = list(self.default_rules)
+        self.enable_math()
+
+    def parse_table(self, m):
+        """Override parse table function for added functionality"""
+        item = self._process_table(m)
+
+        cells = _TABLE_CELLS_END_RE.sub('', m.group(3))
+        cells = [_TABLE_CELL_SPLIT_RE.split(_TABLE_ROW_EDGES_RE.sub('', v))
+                 for v in cells.split('\n')]
+
+        item['cells'], item['cell_properties'] = self._process_cells(cells)
+        self.tokens.append(item)
+
+    def parse_nptable(self, m):
+        """Override parse table function for added functionality"""
+        item = self._process_table(m)
+
+        cells = _NPTABLE_CELLS_END_RE.sub('', m.group(3))
+        cells = [_TABLE_CELL_SPLIT_RE.split(v) for v in cells.split('\n')]
+
+        item['cells'], item['cell_properties'] = self._process_cells(cells)
+        self.tokens.append(item)
+
+    def _process_table(self, m):
+        """Override process table to collect additional information"""
+        header = _TABLE_HEADER_EDGES_RE.sub('', m.group(1))
+        header = _TABLE_SPLIT_RE.split(header)
+        align = _TABLE_ALIGN_STRIP_RE.sub('', m.group(2))
+        align = _TABLE_SPLIT_RE.split(align)
+        row_headers = list()
+
+        for i, v in enumerate(align):
+            row_headers.append('#' in v)
+            v = v.replace('#', '')
+
+            align[i] = None
+            for p, value in _TABLE_ALIGNS:
+                if p.search(v):
+                    align[i] = value
+                    break
+
+        item = {
+            'type': 'table',
+            'header': header,
+            'align': align,
+            'row_headers': row_headers,
+        }
+        return item
+
+    def _process_cells(self, cells):
+        """Override process cells to collect additional information"""
+        cell_flags = list()
+        for line in cells:
+            line_flags = list()
+            for c, cell in enumerate(line):
+                # Get any cell properties
+                cell, t_cflags = self.__preprocess_cell_props(cell)
+                line_flags.append(t_cflags)
+
+                # de-escape any pipe inside the cell here
+                if '\\' in cell:
+                    cell = _ESCAPED_PIPE_RE.sub('|', cell)
+                line[c] = cell
+            cell_flags.append(line_flags)
+
+        return cells, cell_flags
+
+    @staticmethod
+    def __preprocess_cell_props(cell):
+        """Helper function to pre-process cell information for properties"""
+        if '{:' not in cell or not cell.rstrip().endswith('}'):
+            return cell, None
+
+        # - Properties come last, only match the end of (very long) cells
+        head = cell[:-_CELL_PROPS_LENGTH]
+        tail = cell[-_CELL_PROPS_LENGTH:]
+
+        ret = cell
+        ret_props = None
+        for (k, (p, get_idx, repl_idx)) in _CELL_PROPS:
+            t_match = p.match(tail)
+            if t_match:
+                if ret_props is None:
+                    ret_props = dict()
+                ret_props[k] = t_match.group(get_idx)
+                ret = head + t_match.group(repl_idx)
+
+        return ret, ret_props
+
+
+class CustomInlineGrammar(mistune.InlineGrammar):
+    """
+    Inline grammar
+    """
+    # - Emphasis needs more than stars inside it, with any stars it starts
+    #   with matched at once (as an atomic group would), so runs of stars
+    #   are neither nested nor backtracked through.
+    emphasis = re.compile(
+        r'^\*((?=((?:\*\*)*))\2[^\*](?:\*\*|[^\*])*?)\*(?!\*)'  # *word*
+    )
+
+    double_emphasis = re.compile(
+        r'^\*{2}((?=(\**))\2[^\*][\s\S]*?)\*{2}(?!\*)'  # **word**
+    )
+
+    # - Links only look ahead for a ']' up to the next bracket and fail early
+    #   when there's no ')' to close them, so that malformed links can't
+    #   backtrack through the rest of the text.
+    link = re.compile(
+        r'^!?\[('
+        r'(?:\[[^^\]]*\]|[^\[\]]|\](?=[^\[\]]*\]))*'
+        r')\]\((?=[^)]*\))'
+        r'''\s*(<)?([\s\S]*?)(?(2)>)(?:\s+['"]([\s\S]*?)['"])?\s*'''
+        r'\)'
+        r'(?:\s*(?:\{:\s*)(.*)(?:\s*\}))?'
+    )
+
+    # - The same, for when nothing after the link could close a title (so
+    #   its title group never matches), rather than looking for one from
+    #   every quote in the link
+    untitled_link = re.compile(
+        r'^!?\[('
+        r'(?:\[[^^\]]*\]|[^\[\]]|\](?=[^\[\]]*\]))*'
+        r')\]\((?=[^)]*\))'
+        r'\s*(<)?([\s\S]*?)(?(2)>)(?:(?!)())?\s*'
+        r'\)'
+        r'(?:\s*(?:\{:\s*)(.*)(?:\s*\}))?'
+    )
+
+    # - Only backtracks through an autolink once it's known to be closed
+    autolink = re.compile(r'^<(?=[^ >]+>)([^ >]+(@|:)[^ >]+)>')
+
+    reflink = re.compile(
+        r'^!?\[('
+        r'(?:\[[^^\]]*\]|[^\[\]]|\](?=[^\[\]]*\]))*'
+        r')\]\s*\[([^^\]]*)\]'
+    )
+
+    # - Only look for a line break at the start of a run of spaces (or right
+    #   after a token's leading space), rather than at every space in it
+    text = re.compile(
+        r'^[\s\S]+?'
+        r'(?=[\\<!\[_*`~]|https?://|(?:(?<! )|(?<=^ )) {2,}\n|$)'
+    )
+
+
+class CustomInlineLexer(math.MathInlineMixin, mistune.InlineLexer):
+    """
+    Inline Lexer for MathJax support and disabled underscores
+    """
+    grammar_class = CustomInlineGrammar
+
+    def __init__(self, *args, **kwargs):
+        super(CustomInlineLexer, self).__init__(*args, **kwargs)
+        self.deadline = None
+        self._rules_cache = dict()
+
+        self.default_rules = list(self.default_rules)
+        self.enable_math()
+        self.rules.math = re.compile(r'^\\\((.+?)\\\)')
+
+    def check_deadline(self):
+        """Raises RenderLimitExceeded if the render deadline has passed"""
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise RenderLimitExceeded("Markdown took too long to render")
+
+    def output(self, text, rules=None):
+        """Override output to check the render deadline between tokens"""
+        text = text.rstrip('\n')
+        if not rules:
+            rules = list(self.default_rules)
+
+        if self._in_footnote and 'footnote' in rules:
+            rules.remove('footnote')
+
+        rules = self._get_rules(rules)
+
+        output = list()
+        source = text
+        found = dict()
+        pos = 0
+        while text:
+            self.check_deadline()
+            for key, rule, bounds in rules:
+                if bounds is not None:
+                    if text[0] not in bounds[0] or \
+                            not _follows(bounds[1], source, pos, found):
+                        continue
+                    if key == 'link' and not _follows(
+                            _LINK_TITLE_ENDS, source, pos, found):
+                        rule = self.rules.untitled_link
+                m = rule.match(text)
+                if not m:
+                    continue
+                self.line_match = m
+                out = getattr(self, 'output_%s' % key)(m)
+                if out is not None:
+                    break
+            else:
+                raise RuntimeError('Infinite loop at: %s' % text)
+
+            output.append(out)
+            pos += len(m.group(0))
+            text = text[len(m.group(0)):]
+
+        return ''.join(output)
+
+    def _get_rules(self, rules):
+        """Gets the key, pattern and bounds (if any) of each rule to try
+
+        Rules for references to link definitions are left out when there
+        aren't any definitions.
+        """
+        key = (tuple(rules), bool(self.links))
+        ret = self._rules_cache.get(key)
+        if ret is None:
+            ret = self._rules_cache[key] = [
+                (x, getattr(self.rules, x), _INLINE_BOUNDS.get(x))
+                for x in rules if self.links or x not in _LINK_REF_RULES
+            ]
+        return ret
+
+    def output_emphasis(self, m):
+        """Override emphasis rules for MathJax integration"""
+        text = m.group(1)
+        text = self.output(text)
+        return self.renderer.emphasis(text)
+
+    def output_double_emphasis(self, m):
+        """Override double-emphasis rules for MathJax integration"""
+        text = m.group(1)
+        text = self.output(text)
+        return self.renderer.double_emphasis(text)
+
+    def _process_link(self, m, link, title=None):
+        """Override for attributes"""
+        line = m.group(0)
+        text = m.group(1)
+        # - Only inline links (not reference links) have attributes
+        attrib = m.group(5) if m.re.groups >= 5 else None
+        attrib = attrib or None
+
+        if line[0] == '!':
+            return self.renderer.image(link, title, text, attribute=attrib)
+
+        self._in_link = True
+        text = self.output(text)
+        self._in_link = False
+        return self.renderer.link(link, title, text)
+
+
+class CustomMarkdown(mistune.Markdown):
+    """
+    Custom Markdown class
+    """
+
+    def parse(self, text):
+        """Override parse to load all referenced assets up-front"""
+        self.reset()
+        self.renderer.load_assets(text)
+        try:
+            return super().parse(text)
+        except RecursionError:
+            raise RenderLimitExceeded("Markdown is nested too deeply")
+        finally:
+            self.renderer.clear_assets()
+
+    def set_budget(self, budget):
+        """Sets the time (in seconds) renders have, None for no limit"""
+        if budget is None:
+            self.inline.deadline = None
+        else:
+            self.inline.deadline = time.monotonic() + budget
+
+    def pop(self):
+        """Override pop to check the render deadline between blocks"""
+        self.inline.check_deadline()
+        return super().pop()
+
+    def reset(self):
+        """Discards any state left behind by a failed render"""
+        self.tokens = self.block.tokens = list()
+        self.footnotes = list()
+        self.block.def_links = dict()
+        self.block.def_footnotes = dict()
+        self.inline.links = dict()
+        self.inline.footnotes = dict()
+
+    def split_blocks(self, text):
+        """Splits markdown text into its top-level (rule, source) blocks
+
+        Returns the blocks along with the document's link definitions, or
+        None if the document can't be rendered block by block (footnotes,
+        or link definitions nested inside other blocks).
+        """
+        text = mistune.preprocessing(text).rstrip('\n')
+        if '[^' in text:
+            return None
+
+        lexer = self.block
+        blocks = list()
+        try:
+            while text:
+                self.inline.check_deadline()
+                for rule in lexer.default_rules:
+                    m = getattr(lexer.rules, rule).match(text)
+                    if m:
+                        break
+                else:
+                    raise RuntimeError('Infinite loop at: %s' % text)
+
+                text = text[len(m.group(0)):]
+                if rule == 'def_links':
+                    lexer.parse_def_links(m)
+                elif rule != 'newline':
+                    blocks.append((rule, m.group(0)))
+
+            def_links = lexer.def_links
+        finally:
+            lexer.def_links = dict()
+
+        if any(_DEF_LIKE_RE.search(source) for _, source in blocks):
+            return None
+        return blocks, def_links
+
+    def render_blocks(self, blocks, def_links):
+        """Renders (rule, source) blocks from split_blocks individually"""
+        self.reset()
+        self.renderer.load_assets(''.join(x for _, x in blocks))
+        try:
+            return [self.render_block(rule, source, def_links)
+                    for rule, source in blocks]
+        except RecursionError:
+            raise RenderLimitExceeded("Markdown is nested too deeply")
+        finally:
+            self.renderer.clear_assets()
+            self.inline.links = dict()
+
+    def render_block(self, rule, source, def_links):
+        """Renders a single top-level block of a document"""
+        lexer = self.block
+        lexer.tokens = list()
+        getattr(lexer, 'parse_%s' % rule)(getattr(lexer.rules, rule)
+                                          .match(source))
+
+        self.tokens = lexer.tokens
+        self.tokens.reverse()
+        self.inline.setup(def_links, dict())
+
+        ret = self.renderer.placeholder()
+        while self.pop():
+            ret += self.tok()
+        return ret
+
+    def inline_cell(self, text):
+        """Renders a table cell's text, skipping the lexer for plain text"""
+        if _PLAIN_CELL_RE.match(text):
+            return self.renderer.text(text)
+        return self.inline(text)
+
+    def output_table(self):
+        """Override output table for added functionality"""
+        aligns = self.token['align']
+        aligns_length = len(aligns)
+        row_headers = self.token['row_headers']
+        cell_properties = self.token['cell_properties']
+        table_cell = self.renderer.table_cell
+        inline = self.inline_cell
+
+        # header part
+        cells = list()
+        for i, value in enumerate(self.token['header']):
+            align = aligns[i] if i < aligns_length else None
+            flags = {'header': True, 'align': align}
+            cells.append(table_cell(inline(value), **flags))
+
+        header = self.renderer.table_row(''.join(cells))
+
+        # body part
+        rows = list()
+        for i, row in enumerate(self.token['cells']):
+            cells = list()
+            row_props = None
+            for j, value in enumerate(row):
+                align = aligns[j] if j < aligns_length else None
+                row_header = row_headers[j] if j < aligns_length else None
+                flags = {
+                    'header': False, 'align': align, 'row_header': row_header
+                }
+                t_cprops = cell_properties[i][j]
+                if t_cprops:
+                    if not row_header:
+                        flags = {**flags, **t_cprops}
+                    else:
+                        row_props = t_cprops
+
+                cells.append(table_cell(inline(value), **flags))
+
+            rows.append(self.renderer.table_row(
+                ''.join(cells), **(row_props if row_props else {})
+            ))
+
+        return self.renderer.table(header, ''.join(rows))
+
+
+class PlainTextParser(HTMLParser):
+    """
+    Collects the text of rendered markdown, without code, scripts or
+    styles
+    """
+    SKIPPED_TAGS = ('pre', 'code', 'script', 'style')
+    BLOCK_TAGS = ('p', 'div', 'br', 'li', 'tr', 'td', 'th', 'blockquote',
+                  'h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+    def __init__(self):
+        super().__init__()
+        self.parts = list()
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self._skipping = max(self._skipping - 1, 0)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+#
+#   Functions
+#
+
+def create_markdown():
+    """Creates a new markdown renderer"""
+    return CustomMarkdown(renderer=CustomRenderer(), inline=CustomInlineLexer,
+                          block=CustomBlockLexer)
+
+
+def get_markdown():
+    """Gets the current thread's markdown renderer, creating it on first use
+
+    Renderers keep state while rendering a document, so each thread gets
+    its own instance.
+    """
+    md = getattr(_local, 'md', None)
+    if md is None:
+        md = _local.md = create_markdown()
+    return md
+
+
+@lru_cache(maxsize=None)
+def get_lexer(lang):
+    """Gets the shared pygments lexer for the given language (or None)"""
+    try:
+        return get_lexer_by_name(lang, stripall=True)
+    except ClassNotFound:
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_formatter():
+    """Gets the shared pygments formatter for code blocks"""
+    return HtmlFormatter(linenos="inline")
+
+
+@lru_cache(maxsize=_HIGHLIGHT_CACHE_SIZE)
+def highlight_code(code, lang):
+    """Highlights the given code, returns None if the language is unknown"""
+    lexer = get_lexer(lang)
+    if lexer is None:
+        return None
+    return highlight(code, lexer, get_formatter())
+
+
+def get_render_cache():
+    """Gets the cache used for storing rendered markdown"""
+    return caches[_CACHE_NAME]
+
+
+def get_render_cache_key(value, prefix=_CACHE_KEY_PREFIX):
+    """Gets the content-addressed cache key for the given markdown text"""
+    digest = hashlib.sha256(value.encode('utf-8')).hexdigest()
+    return '%s:v%s:%s' % (prefix, RENDERER_VERSION, digest)
+
+
+def get_block_cache_key(source, links_key=''):
+    """Gets the cache key for a single top-level block of markdown"""
+    digest = hashlib.sha256(
+        ('%s\0%s' % (links_key, source)).encode('utf-8')
+    ).hexdigest()
+    return '%s:v%s:%s' % (_BLOCK_CACHE_KEY_PREFIX, RENDERER_VERSION, digest)
+
+
+def render_markdown(value, fallback=True):
+    """Renders the given markdown text, using cached output if available
+
+    If it can't be rendered within the render budget it's shown as plain
+    text (cached for a while, apart from the rendered markdown), or
+    RenderLimitExceeded is raised if fallback is False.
+    """
+    if not value:
+        return get_markdown()(value)
+
+    cache = get_render_cache()
+    key = get_render_cache_key(value)
+
+    ret = cache.get(key)
+    if ret is not None:
+        __increment_stat('hits')
+        return ret
+
+    fallback_key = get_render_cache_key(value, _FALLBACK_CACHE_KEY_PREFIX)
+    if fallback:
+        ret = cache.get(fallback_key)
+        if ret is not None:
+            __increment_stat('hits')
+            return ret
+
+    __increment_stat('misses')
+    budget = get_render_budget()
+    try:
+        ret = render_markdown_blocks(value, budget=budget)
+    except RenderLimitExceeded:
+        logger.warning("Unable to render markdown within limits (%ss)",
+                       budget)
+        if not fallback:
+            raise
+        ret = render_plain_text(value)
+        cache.set(fallback_key, ret, _FALLBACK_CACHE_TIMEOUT)
+    else:
+        cache.set(key, ret, None)
+
+    return ret
+
+
+def get_render_budget():
+    """Gets the time (in seconds) a document has to render, or None"""
+    return getattr(settings, 'MARKDOWN_RENDER_BUDGET', None)
+
+
+def render_plain_text(value):
+    """Renders markdown text as escaped plain text paragraphs"""
+    paragraphs = _BLANK_LINES_RE.split(value.strip())
+    return ''.join('<p>%s</p>\n' % mistune.escape(x).replace('\n', '<br>\n')
+                   for x in paragraphs if x)
+
+
+def html_to_plain_text(value):
+    """Gets the plain text of rendered markdown, on a single line
+
+    Code, math, scripts, styles and tags are stripped and entities are
+    unescaped.
+    """
+    parser = PlainTextParser()
+    parser.feed(value or '')
+    parser.close()
+    text = _MATH_RE.sub(' ', ''.join(parser.parts))
+    return ' '.join(text.split())
+
+
+def render_markdown_blocks(value, budget=None):
+    """Renders markdown text one top-level block at a time
+
+    Each block's HTML is cached by its source (and the document's link
+    definitions), so re-rendering an edited document only renders the
+    blocks which changed.  The output is identical to a full render.
+    Raises RenderLimitExceeded if rendering takes longer than the budget.
+    """
+    md = get_markdown()
+    md.set_budget(budget)
+    try:
+        return __render_blocks(md, value)
+    finally:
+        md.set_budget(None)
+
+
+def get_render_cache_stats():
+    """Gets this worker's hit/miss counts for the rendered markdown cache"""
+    with _stats_lock:
+        hits = _stats['hits']
+        misses = _stats['misses']
+    total = hits + misses
+
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': float(hits) / total if total > 0 else 0.,
+    }
+
+
+def reset_render_cache_stats():
+    """Resets this worker's hit/miss counts for the rendered markdown cache"""
+    with _stats_lock:
+        _stats.clear()
+
+
+def forget_rendered_markdown(value):
+    """Removes the cached rendering of markdown text (and of its blocks)"""
+    if not value:
+        return
+    keys = [get_render_cache_key(value),
+            get_render_cache_key(value, _FALLBACK_CACHE_KEY_PREFIX)]
+    split = get_markdown().split_blocks(value)
+    if split is not None:
+        blocks, def_links = split
+        links_key = repr(sorted(def_links.items()))
+        keys.extend(get_block_cache_key(source, links_key)
+                    for _, source in blocks)
+    get_render_cache().delete_many(keys)
+
+
+def clear_render_cache():
+    """Removes all rendered markdown from the cache"""
+    get_render_cache().clear()
+
+
+#
+#   Helper Functions
+#
+
+def __render_blocks(md, value):
+    """Helper function to render markdown using the block cache"""
+    split = md.split_blocks(value)
+    if split is None:
+        return md(value)
+
+    blocks, def_links = split
+    links_key = repr(sorted(def_links.items()))
+    keys = [get_block_cache_key(source, links_key) for _, source in blocks]
+
+    cache = get_render_cache()
+    rendered = cache.get_many(keys)
+    missing = [(k, b) for k, b in zip(keys, blocks) if k not in rendered]
+    if missing:
+        new = md.render_blocks([b for _, b in missing], def_links)
+        new = dict(zip((k for k, _ in missing), new))
+        cache.set_many(new)
+        rendered.update(new)
+
+    return ''.join(rendered[k] for k in keys)
+
+
+def _follows(patterns, text, pos, found):
+    """Helper function to check if each pattern matches in text after pos
+
+    Where the next match of each starts (or -1 if there's none) is kept in
+    found, so text is only searched again once pos has passed it.
+    """
+    for pattern in patterns:
+        start = found.get(pattern)
+        if start is None or 0 <= start <= pos:
+            m = pattern.search(text, pos + 1)
+            start = found[pattern] = m.start() if m else -1
+        if start <= pos:
+            return False
+    return True
+
+
+def __increment_stat(name):
+    """Helper function to increment one of this worker's cache statistics"""
+    with _stats_lock:
+        _stats[name] += 1
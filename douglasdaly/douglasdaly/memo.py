@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Request-scoped memoization for views, template tags and context
+processors.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import logging
+import threading
+from collections import Counter
+from functools import wraps
+
+
+#
+#   Variables
+#
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+#
+#   Classes
+#
+
+class RequestMemo(object):
+    """
+    Values fetched while handling a single request, along with how often
+    each was asked for
+    """
+
+    def __init__(self):
+        self._values = dict()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def get(self, name, func, *args, **kwargs):
+        """Gets func(*args, **kwargs), calling it once per set of args"""
+        key = (name, args, tuple(sorted(kwargs.items())))
+        try:
+            ret = self._values[key]
+        except KeyError:
+            ret = self._values[key] = func(*args, **kwargs)
+            self.misses[name] += 1
+        except TypeError:
+            # - Unhashable arguments, so it can't be memoized
+            self.misses[name] += 1
+            return func(*args, **kwargs)
+        else:
+            self.hits[name] += 1
+        return ret
+
+    def forget(self, name):
+        """Forgets any values stored under the given name"""
+        for key in [x for x in self._values if x[0] == name]:
+            del self._values[key]
+
+    def get_summary(self):
+        """Gets a one-line summary of the memo's hits and misses"""
+        return ', '.join(
+            '%s (%d hits, %d misses)' % (x, self.hits[x], self.misses[x])
+            for x in sorted(set(self.hits) | set(self.misses))
+        )
+
+
+#
+#   Functions
+#
+
+def get_request_memo():
+    """Gets the memo for the current request, or None outside of one"""
+    return getattr(_local, 'memo', None)
+
+
+def activate_memo():
+    """Starts a new memo for the current request (thread)"""
+    _local.memo = RequestMemo()
+    return _local.memo
+
+
+def deactivate_memo():
+    """Ends the current request's memo"""
+    _local.memo = None
+
+
+def memoize(name, func, *args, **kwargs):
+    """Gets func(*args, **kwargs), at most once per request"""
+    memo = get_request_memo()
+    if memo is None:
+        return func(*args, **kwargs)
+    return memo.get(name, func, *args, **kwargs)
+
+
+def request_memoized(func):
+    """Decorator to only call a function once per request (and args)"""
+    name = '%s.%s' % (func.__module__, func.__qualname__)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return memoize(name, func, *args, **kwargs)
+
+    return wrapper
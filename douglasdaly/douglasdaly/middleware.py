@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Middleware for the main site.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import logging
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from .memo import logger, activate_memo, deactivate_memo
+from .page_cache import (
+    get_cache_key, get_cached_response, start_page, cache_response
+)
+
+
+#
+#   Middleware
+#
+
+class RequestMemoMiddleware(object):
+    """
+    Gives each request a memo (request.memo) so anything fetched while
+    handling it is only fetched once, logging the memo's use at the debug
+    level afterwards
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.memo = activate_memo()
+        try:
+            response = self.get_response(request)
+        finally:
+            deactivate_memo()
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Request memo for %s: %s", request.path,
+                         request.memo.get_summary() or 'unused')
+        return response
+
+
+class PageCacheMiddleware(object):
+    """
+    Serves anonymous requests for pages their views marked as cacheable
+    (see douglasdaly.page_cache) from the cache, answering conditional
+    requests for them with 304s.  It should come after the session and
+    authentication middleware but before any which change the content
+    (e.g. minifying it)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        key = get_cache_key(request)
+        if key is None:
+            return self.get_response(request)
+
+        response = get_cached_response(key)
+        if response is not None:
+            response['X-Page-Cache'] = 'hit'
+            last_modified = parse_http_date_safe(response.get('Last-Modified'))
+            return get_conditional_response(
+                request, etag=response.get('ETag'),
+                last_modified=last_modified, response=response
+            )
+
+        start_page(request)
+        response = self.get_response(request)
+        if cache_response(key, request, response):
+            response['X-Page-Cache'] = 'miss'
+        return response
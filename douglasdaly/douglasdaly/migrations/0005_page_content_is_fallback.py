@@ -0,0 +1,18 @@
+# Generated by Django 2.1.7 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('douglasdaly', '0004_page_content_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='content_is_fallback',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -16,6 +16,12 @@ from django.core.validators import MaxValueValidator
 from adminsortable.models import SortableMixin
 
 from assets.models import ImageAsset
+from assets.thumbnails import get_markdown_thumbnail_requests
+
+from .markdown import (
+    RENDERER_VERSION, RenderLimitExceeded, render_markdown, render_plain_text
+)
+from .singletons import load_singleton
 
 
 #
@@ -76,11 +82,7 @@ class SiteSettings(models.Model):
     @classmethod
     def load(cls):
         """Loads the Singleton Instance or returns None"""
-        try:
-            obj = cls.objects.get(pk=1)
-        except cls.DoesNotExist:
-            obj = None
-        return obj
+        return load_singleton(cls)
 
 
 class SiteAdminSettings(models.Model):
@@ -128,11 +130,7 @@ class SiteAdminSettings(models.Model):
     @classmethod
     def load(cls):
         """Loads the Singleton Instance or returns None"""
-        try:
-            obj = cls.objects.get(pk=1)
-        except cls.DoesNotExist:
-            obj = None
-        return obj
+        return load_singleton(cls)
 
 
 # - Content
@@ -154,6 +152,12 @@ class Page(SortableMixin):
     custom_javascript = models.FileField(upload_to="scripts/", default=None,
                                          null=True, blank=True)
     content = models.TextField(default=None, null=True, blank=True)
+    content_html = models.TextField(default=None, null=True, blank=True,
+                                    editable=False)
+    content_html_version = models.PositiveSmallIntegerField(
+        default=None, null=True, blank=True, editable=False
+    )
+    content_is_fallback = models.BooleanField(default=False, editable=False)
 
     published = models.BooleanField(default=True, null=False)
 
@@ -171,6 +175,44 @@ class Page(SortableMixin):
     def __unicode__(self):
         return "%s" % self.title
 
+    # - Methods
+
+    def get_rendered_content(self):
+        """Gets the rendered HTML content, re-rendering it if out of date"""
+        if self.content_html_version != RENDERER_VERSION:
+            self.render_content()
+            if self.pk is not None:
+                Page.objects.filter(pk=self.pk).update(
+                    content_html=self.content_html,
+                    content_html_version=self.content_html_version,
+                    content_is_fallback=self.content_is_fallback
+                )
+        return self.content_html
+
+    def render_content(self):
+        """Renders the markdown content to HTML and stores the result
+
+        If it can't be rendered within the render budget it's stored as
+        plain text, which is kept (rather than re-rendered when shown)
+        until the page is saved again or rendered with the render_markdown
+        command.
+        """
+        self.content_html_version = RENDERER_VERSION
+        self.content_is_fallback = False
+        if not self.content:
+            self.content_html = None
+            return
+
+        try:
+            self.content_html = render_markdown(self.content, fallback=False)
+        except RenderLimitExceeded:
+            self.content_html = render_plain_text(self.content)
+            self.content_is_fallback = True
+
+    def get_thumbnail_requests(self):
+        """Gets all the thumbnails needed to display this page"""
+        return get_markdown_thumbnail_requests(self.content)
+
     # - Utility methods
 
     def get_absolute_url(self):
@@ -178,3 +220,8 @@ class Page(SortableMixin):
             return reverse('view_page', kwargs={'slug': self.slug})
         else:
             return self.passthrough_link
+
+    def save(self, *args, **kwargs):
+        """Override save to pre-render the page's content"""
+        self.render_content()
+        super().save(*args, **kwargs)
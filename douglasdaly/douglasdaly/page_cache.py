@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Full-page cache for anonymous requests with tag-based invalidation.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import time
+import uuid
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+
+#
+#   Variables
+#
+
+# - Tags every cached page depends on (settings and navigation links)
+SITE_TAGS = ('settings', 'nav')
+
+_CACHE_NAME = 'pages'
+_KEY_PREFIX = 'page'
+_TAG_KEY_PREFIX = 'pagetag:v2'
+_DEFAULT_TIMEOUT = 60 * 60 * 24
+
+_PAGE_PARAMS = ('page', 'after', 'before')
+_SKIPPED_HEADERS = ('set-cookie', 'vary')
+
+
+#
+#   Functions
+#
+
+def is_enabled():
+    """Whether or not the page cache is enabled"""
+    return getattr(settings, 'PAGE_CACHE_ENABLED', True)
+
+
+def get_page_cache():
+    """Gets the cache used for storing pages"""
+    return caches[_CACHE_NAME]
+
+
+def start_page(request):
+    """Marks the start of making the page for a request
+
+    Called (by the middleware) before the view, so tags purged while the
+    view reads its data are noticed by add_cache_tags.
+    """
+    request.page_cache_started = time.time()
+
+
+def add_cache_tags(request, *tags):
+    """Marks the response to a request as cacheable, depending on tags
+
+    The cached page is purged when any of the given tags (or SITE_TAGS)
+    are purged, see purge_cache_tags.  The tags' versions are read now and
+    stored with the page, so purges made while it's rendered outdate it,
+    and it isn't cached at all if any were purged since start_page.
+    """
+    if not hasattr(request, 'page_cache_tags'):
+        request.page_cache_tags = dict()
+        tags = SITE_TAGS + tags
+    tags = set(tags) - set(request.page_cache_tags)
+    if not tags:
+        return
+
+    versions = get_tag_versions(tags)
+    request.page_cache_tags.update(versions)
+
+    started = getattr(request, 'page_cache_started', None)
+    if started is not None and any(x[2] and x[0] >= started
+                                   for x in versions.values()):
+        request.page_cache_purged = True
+
+
+def purge_cache_tags(*tags):
+    """Purges all cached pages depending on any of the given tags
+
+    The tags are purged again once the transaction commits, in case a
+    request cached a page made from the old data in the meantime.
+    """
+    if not tags:
+        return
+    __purge(tags)
+    transaction.on_commit(lambda: __purge(tags))
+
+
+def remember_fields(instance, fields):
+    """Remembers the saved values of fields for an instance being saved"""
+    if instance.pk is None:
+        instance._page_cache_saved = None
+    else:
+        instance._page_cache_saved = type(instance).objects\
+            .filter(pk=instance.pk).values(*fields).first()
+
+
+def get_remembered_fields(instance):
+    """Gets (and forgets) the values remembered by remember_fields"""
+    ret = getattr(instance, '_page_cache_saved', None)
+    instance._page_cache_saved = None
+    return ret
+
+
+def get_tag_versions(tags):
+    """Gets the current version of each of the given tags
+
+    Versions are (timestamp, token, purged) tuples, the timestamp being the
+    time the tag was last purged (or first used, when purged is False).
+    """
+    cache = get_page_cache()
+    keys = dict(('%s:%s' % (_TAG_KEY_PREFIX, x), x) for x in tags)
+
+    found = cache.get_many(keys)
+    for key in set(keys) - set(found):
+        cache.add(key, __new_version(False), None)
+        found[key] = cache.get(key)
+
+    return dict((keys[k], v) for k, v in found.items())
+
+
+def clear_page_cache():
+    """Removes every cached page"""
+    get_page_cache().clear()
+
+
+def get_cache_key(request):
+    """Gets the cache key for a request, or None if it can't be cached
+
+    Only anonymous GET/HEAD requests without a query string (other than
+    the page number and cursors) are cached.  Pages are keyed by path, page
+    parameters and the sidebar sort variant stored in the session.
+    """
+    if not is_enabled() or request.method not in ('GET', 'HEAD'):
+        return None
+    if any(x not in _PAGE_PARAMS for x in request.GET):
+        return None
+    if request.user.is_authenticated:
+        return None
+
+    page = [request.GET.get(x, '') for x in _PAGE_PARAMS]
+    sort_tab = request.session.get('sort_tab', 'date')
+    digest = hashlib.sha256(
+        '\0'.join([request.path, sort_tab] + page).encode('utf-8')
+    ).hexdigest()
+    return '%s:%s' % (_KEY_PREFIX, digest)
+
+
+def get_cached_response(key):
+    """Gets the cached response for the key, if it's still current"""
+    cache = get_page_cache()
+    entry = cache.get(key)
+    if entry is None:
+        return None
+
+    if get_tag_versions(entry['tags']) != entry['tags']:
+        cache.delete(key)
+        return None
+
+    ret = HttpResponse(entry['content'], status=entry['status'])
+    for header, value in entry['headers']:
+        ret[header] = value
+    return ret
+
+
+def cache_response(key, request, response):
+    """Caches a response if its view marked it as cacheable"""
+    tags = getattr(request, 'page_cache_tags', None)
+    if tags is None or request.method != 'GET':
+        return False
+    if getattr(request, 'page_cache_purged', False):
+        return False
+    if response.status_code != 200 or response.streaming or \
+            response.cookies:
+        return False
+
+    entry = {
+        'content': response.content,
+        'status': response.status_code,
+        'headers': [(k, v) for k, v in response.items()
+                    if k.lower() not in _SKIPPED_HEADERS],
+        'tags': tags,
+    }
+    timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', _DEFAULT_TIMEOUT)
+    get_page_cache().set(key, entry, timeout)
+    return True
+
+
+#
+#   Helper Functions
+#
+
+def __purge(tags):
+    """Helper function to give each tag a new version"""
+    get_page_cache().set_many(dict(
+        ('%s:%s' % (_TAG_KEY_PREFIX, x), __new_version(True)) for x in tags
+    ), None)
+
+
+def __new_version(purged):
+    """Helper function to create a new tag version"""
+    return time.time(), uuid.uuid4().hex, purged
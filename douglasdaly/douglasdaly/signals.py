@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Signal handlers for the main site.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from assets.models import (
+    Asset, AssetSettings, ImageAsset, FileAsset, VideoAsset
+)
+from assets.thumbnails import pregenerate_thumbnails
+from blog.models import Post, BlogSettings, ColorTheme
+
+from .markdown import clear_render_cache, forget_rendered_markdown
+from .models import Page, SiteSettings, SiteAdminSettings
+from .page_cache import (
+    purge_cache_tags, remember_fields, get_remembered_fields
+)
+from .singletons import invalidate_singleton
+
+
+#
+#   Variables
+#
+
+# - Singleton settings models and the related models their instances use
+_SINGLETONS = (
+    (AssetSettings, ()),
+    (BlogSettings, (ColorTheme,)),
+    (SiteSettings, (Asset,)),
+    (SiteAdminSettings, ()),
+)
+
+# - Page fields shown in the navigation links on every page
+_NAV_FIELDS = ('slug', 'link_name', 'published', 'passthrough_page',
+               'passthrough_link', 'the_order')
+
+
+#
+#   Signal handlers
+#
+
+@receiver(pre_save, sender=ImageAsset)
+@receiver(pre_save, sender=FileAsset)
+@receiver(pre_save, sender=VideoAsset)
+def asset_saving(sender, instance, **kwargs):
+    """Remembers the saved slug of an asset"""
+    remember_fields(instance, ('slug',))
+
+
+@receiver(post_save, sender=ImageAsset)
+@receiver(post_delete, sender=ImageAsset)
+@receiver(post_save, sender=FileAsset)
+@receiver(post_delete, sender=FileAsset)
+@receiver(post_save, sender=VideoAsset)
+@receiver(post_delete, sender=VideoAsset)
+def asset_changed(sender, instance, **kwargs):
+    """Invalidates the rendered markdown referencing a changed asset"""
+    slugs = {instance.slug}
+    saved = get_remembered_fields(instance)
+    if saved is not None:
+        slugs.add(saved['slug'])
+
+    __invalidate_rendered(Post, 'body', 'body_html_version', slugs)
+    __invalidate_rendered(Page, 'content', 'content_html_version', slugs)
+    purge_cache_tags('assets')
+
+
+@receiver(post_save, sender=AssetSettings)
+@receiver(post_delete, sender=AssetSettings)
+def asset_settings_changed(sender, instance, **kwargs):
+    """Invalidates all rendered markdown when the asset settings change"""
+    clear_render_cache()
+    Post.objects.update(body_html_version=None)
+    Page.objects.update(content_html_version=None)
+    purge_cache_tags('assets')
+
+
+@receiver(post_save, sender=AssetSettings)
+@receiver(post_delete, sender=AssetSettings)
+@receiver(post_save, sender=BlogSettings)
+@receiver(post_delete, sender=BlogSettings)
+@receiver(post_save, sender=ColorTheme)
+@receiver(post_delete, sender=ColorTheme)
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+@receiver(post_save, sender=SiteAdminSettings)
+@receiver(post_delete, sender=SiteAdminSettings)
+@receiver(post_save, sender=ImageAsset)
+@receiver(post_delete, sender=ImageAsset)
+@receiver(post_save, sender=FileAsset)
+@receiver(post_delete, sender=FileAsset)
+@receiver(post_save, sender=VideoAsset)
+@receiver(post_delete, sender=VideoAsset)
+def settings_changed(sender, instance, **kwargs):
+    """Invalidates singleton settings (and cached pages) on changes
+
+    They're invalidated again once the transaction commits, in case a
+    worker reloaded them from the old data in the meantime.
+    """
+    changed = False
+    for model, related in _SINGLETONS:
+        if isinstance(instance, (model,) + related):
+            invalidate_singleton(model)
+            transaction.on_commit(lambda m=model: invalidate_singleton(m))
+            changed = True
+
+    if changed:
+        purge_cache_tags('settings')
+
+
+@receiver(post_save, sender=Page)
+def page_saved(sender, instance, **kwargs):
+    """Generates the thumbnails a saved page needs in the background"""
+    transaction.on_commit(
+        lambda: pregenerate_thumbnails(instance.get_thumbnail_requests())
+    )
+
+
+@receiver(pre_save, sender=Page)
+def page_saving(sender, instance, **kwargs):
+    """Remembers the saved values of the fields the navigation shows"""
+    remember_fields(instance, _NAV_FIELDS)
+
+
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+def page_changed(sender, instance, signal, **kwargs):
+    """Purges cached pages showing a changed page (or its link)"""
+    tags = {'page:%s' % instance.slug}
+
+    saved = get_remembered_fields(instance)
+    if saved is not None:
+        tags.add('page:%s' % saved['slug'])
+    if signal is post_delete or saved is None or \
+            any(saved[x] != getattr(instance, x) for x in _NAV_FIELDS):
+        tags.add('nav')
+
+    purge_cache_tags(*tags)
+
+
+#
+#   Helper Functions
+#
+
+def __invalidate_rendered(model, field, version_field, slugs):
+    """Helper function to outdate the markdown referencing given assets
+
+    Their cached renderings are removed and their stored HTML marked out
+    of date, so it's re-rendered when next shown.
+    """
+    query = Q()
+    for slug in slugs:
+        query |= Q(**{'%s__icontains' % field: 'asset:%s' % slug})
+
+    found = list(model.objects.filter(query).values_list('pk', field))
+    for _, value in found:
+        forget_rendered_markdown(value)
+    if found:
+        model.objects.filter(pk__in=[x[0] for x in found])\
+            .update(**{version_field: None})
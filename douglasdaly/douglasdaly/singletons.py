@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Process-wide cache for the singleton settings models.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .memo import get_request_memo, memoize
+
+
+#
+#   Variables
+#
+
+_CACHE_NAME = 'settings'
+_VERSION_KEY = 'singleton:%s:version'
+_DEFAULT_MAX_AGE = 5.
+
+_loaded = dict()
+
+
+#
+#   Functions
+#
+
+def load_singleton(model, pk=1):
+    """Loads a singleton model's instance (or None) from memory if possible
+
+    Each worker keeps the instance it loaded along with the version of it
+    in the shared cache.  The version is only re-checked once the entry is
+    older than SINGLETON_SETTINGS_MAX_AGE seconds, so a change saved in
+    another worker is picked up within that time, while a change saved in
+    this worker is picked up immediately.  Within a request the same
+    instance is always used.
+    """
+    label = model._meta.label_lower
+    return memoize('singleton:%s' % label, __load, model, label, pk)
+
+
+def invalidate_singleton(model):
+    """Invalidates a singleton model's loaded instance in every worker"""
+    label = model._meta.label_lower
+    _loaded.pop(label, None)
+
+    memo = get_request_memo()
+    if memo is not None:
+        memo.forget('singleton:%s' % label)
+    __get_cache().set(_VERSION_KEY % label, uuid.uuid4().hex, None)
+
+
+def clear_singletons():
+    """Forgets every instance loaded in this worker (only)"""
+    _loaded.clear()
+
+
+def get_max_age():
+    """Gets the time (in seconds) a loaded instance is used unchecked"""
+    return getattr(settings, 'SINGLETON_SETTINGS_MAX_AGE', _DEFAULT_MAX_AGE)
+
+
+#
+#   Helper Functions
+#
+
+def __load(model, label, pk):
+    """Helper function to load a singleton, from memory if up to date"""
+    now = time.monotonic()
+
+    entry = _loaded.get(label)
+    if entry is not None:
+        obj, version, checked = entry
+        if now - checked < get_max_age():
+            return obj
+        current = __get_version(label)
+        if current == version:
+            _loaded[label] = (obj, version, now)
+            return obj
+    else:
+        current = __get_version(label)
+
+    # - The version is read before the instance, so a change saved between
+    #   the two just means the (newer) instance is reloaded again later
+    try:
+        obj = model.objects.get(pk=pk)
+    except model.DoesNotExist:
+        obj = None
+    _loaded[label] = (obj, current, now)
+
+    return obj
+
+
+def __get_cache():
+    """Helper function to get the cache shared by all workers"""
+    return caches[_CACHE_NAME]
+
+
+def __get_version(label):
+    """Helper function to get the current version of a singleton"""
+    cache = __get_cache()
+    key = _VERSION_KEY % label
+
+    ret = cache.get(key)
+    if ret is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        ret = cache.get(key)
+    return ret
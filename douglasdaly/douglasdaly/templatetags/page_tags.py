@@ -12,6 +12,7 @@ page_tags.py
 #
 from django import template
 
+from ..memo import request_memoized
 from ..models import Page, SiteSettings
 
 
@@ -23,6 +24,7 @@ register = template.Library()
 
 
 @register.inclusion_tag("tags/page_links.html")
+@request_memoized
 def page_links():
     all_pages = Page.objects.filter(published=True).all()
     ret = list()
@@ -43,6 +45,7 @@ def custom_style(filename):
 
 
 @register.inclusion_tag("tags/social_links.html")
+@request_memoized
 def social_links():
     settings = SiteSettings.load()
     return {'settings': settings}
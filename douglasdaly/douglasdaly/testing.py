@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers for the project's tests.
+
+:author: Douglas Daly
+:date: 10/18/2026
+"""
+#
+#   Imports
+#
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+
+#
+#   Variables
+#
+
+# - In-memory stand-ins for every configured cache, so tests don't read or
+#   write (or leak state through) the cache directories under CACHE_ROOT
+TEST_CACHES = dict(
+    (x, {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests-%s' % x,
+        'TIMEOUT': settings.CACHES[x].get('TIMEOUT', 300),
+    })
+    for x in settings.CACHES
+)
+
+
+#
+#   Classes
+#
+
+@override_settings(CACHES=TEST_CACHES)
+class CacheTestCase(TestCase):
+    """
+    Test case using the in-memory TEST_CACHES, emptied before each test
+    """
+
+    def setUp(self):
+        super().setUp()
+        clear_test_caches()
+
+
+#
+#   Functions
+#
+
+def clear_test_caches():
+    """Empties every (test) cache"""
+    for alias in TEST_CACHES:
+        caches[alias].clear()
@@ -0,0 +1,310 @@
+import io
+import timeit
+import threading
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import override_settings
+
+from assets.models import FileAsset, AssetSettings
+from blog.models import Post, Author, Category
+
+from .benchmarks import PATHOLOGICAL, generate_pathological
+from .markdown import (
+    RENDERER_VERSION, create_markdown, get_markdown, render_markdown,
+    render_markdown_blocks, get_render_cache_stats, reset_render_cache_stats
+)
+from .models import Page
+from .testing import CacheTestCase
+
+
+class RenderCacheTests(CacheTestCase):
+    """
+    Checks rendered markdown is cached without writing on cache hits
+    """
+
+    def setUp(self):
+        super().setUp()
+        reset_render_cache_stats()
+
+    def test_hit(self):
+        value = '# Title\n\nSome *text*.\n'
+        html = render_markdown(value)
+
+        cache = caches['markdown']
+        with mock.patch.object(cache, 'set') as set_, \
+                mock.patch.object(cache, 'add') as add, \
+                mock.patch.object(cache, 'incr') as incr:
+            self.assertEqual(render_markdown(value), html)
+        set_.assert_not_called()
+        add.assert_not_called()
+        incr.assert_not_called()
+
+        stats = get_render_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_ratio'], .5)
+
+
+class BlockRenderTests(CacheTestCase):
+    """
+    Checks rendering block by block gives the same output as a full render,
+    and only re-renders the blocks which changed
+    """
+
+    BLOCKS = [
+        '# Title',
+        'Some *text* with a [reference][ref] and [another] [Ref] link.',
+        '```python\ndef f(x):\n    return x ** 2\n```',
+        '$$\ne^{i \\pi} + 1 = 0\n$$',
+        'Inline math \\(x^2\\) and **bold** text.',
+        '| Name | Value |\n|:-----|------:|\n| *a* | 1 |\n| b | `2` |',
+        '> A quote with [a link](https://example.com "Title").',
+        '- One\n- Two\n    - Nested',
+        '[ref]: https://example.com/ref "Reference"',
+    ]
+
+    def get_text(self, blocks=None):
+        """Gets the document made of the given (or default) blocks"""
+        return '\n\n'.join(blocks or self.BLOCKS) + '\n'
+
+    def assertSameAsFull(self, text):
+        """Asserts rendering by blocks matches a full render"""
+        expected = create_markdown()(text)
+        self.assertEqual(render_markdown_blocks(text), expected)
+        # - Again, from the block cache
+        self.assertEqual(render_markdown_blocks(text), expected)
+
+    def test_same_output(self):
+        text = self.get_text()
+        self.assertIsNotNone(get_markdown().split_blocks(text))
+        self.assertIn('href="https://example.com/ref"',
+                      create_markdown()(text))
+        self.assertSameAsFull(text)
+
+    def test_each_block(self):
+        for block in self.BLOCKS:
+            with self.subTest(block=block):
+                self.assertSameAsFull(self.get_text([block]))
+
+    def test_footnotes(self):
+        text = self.get_text(
+            self.BLOCKS[:2] + ['A note.[^1]', '[^1]: The *note*.'] +
+            self.BLOCKS[2:]
+        )
+        self.assertIsNone(get_markdown().split_blocks(text))
+        self.assertIn('footnote', create_markdown()(text))
+        self.assertSameAsFull(text)
+
+    def test_edit_renders_block(self):
+        render_markdown_blocks(self.get_text())
+
+        blocks = list(self.BLOCKS)
+        blocks[4] = 'Inline math \\(y^2\\) and **bold** text.'
+        text = self.get_text(blocks)
+
+        md = get_markdown()
+        with mock.patch.object(md, 'render_blocks',
+                               wraps=md.render_blocks) as render_blocks:
+            html = render_markdown_blocks(text)
+        render_blocks.assert_called_once()
+        self.assertEqual([x[1].strip() for x in render_blocks.call_args[0][0]],
+                         [blocks[4]])
+        self.assertEqual(html, create_markdown()(text))
+
+
+class PathologicalRenderTests(CacheTestCase):
+    """
+    Checks render time grows linearly with the size of pathological
+    documents, rather than relying on the render budget to stop them
+    """
+
+    SIZES = (500, 2000)
+
+    def time_render(self, md, doc):
+        """Gets the best of a few times (in seconds) to render doc"""
+        return min(timeit.repeat(lambda: md(doc), number=1, repeat=5))
+
+    def test_linear_growth(self):
+        md = create_markdown()
+        for case in sorted(PATHOLOGICAL):
+            with self.subTest(case=case):
+                small, large = [
+                    self.time_render(md, generate_pathological(case, x))
+                    for x in self.SIZES
+                ]
+                # - 4x the size, so ~4x the time (16x if it were quadratic)
+                self.assertLess(large, 8 * max(small, 4e-3))
+
+    def test_long_title(self):
+        html = create_markdown()('[a](x "%s")' % ('t' * 1000))
+        self.assertIn('href="x"', html)
+        self.assertIn('title="%s"' % ('t' * 1000), html)
+
+
+class RendererThreadTests(CacheTestCase):
+    """
+    Checks each thread renders with its own renderer, without sharing any
+    state with other threads
+    """
+
+    N_THREADS = 8
+    N_RENDERS = 20
+
+    def get_text(self, i):
+        """Gets a document with links and footnotes particular to i"""
+        return (
+            '# Document %d\n\n'
+            'See [the site](https://example.com/%d) and a note.[^note]\n\n'
+            '| A | B |\n|---|---|\n| %d | *%d* |\n\n'
+            '[^note]: Note %d.\n' % (i, i, i, i, i)
+        )
+
+    def test_threads(self):
+        AssetSettings.load()
+        expected = [create_markdown()(self.get_text(i))
+                    for i in range(self.N_THREADS)]
+
+        barrier = threading.Barrier(self.N_THREADS)
+        renderers = dict()
+        results = dict()
+
+        def render(i):
+            renderers[i] = get_markdown()
+            barrier.wait()
+            results[i] = [get_markdown()(self.get_text(i))
+                          for _ in range(self.N_RENDERS)]
+
+        threads = [threading.Thread(target=render, args=(i,))
+                   for i in range(self.N_THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(set(id(x) for x in renderers.values())),
+                         self.N_THREADS)
+        self.assertNotIn(get_markdown(), renderers.values())
+        for i in range(self.N_THREADS):
+            self.assertIn('https://example.com/%d' % i, expected[i])
+            self.assertEqual(results[i], [expected[i]] * self.N_RENDERS)
+
+
+class RenderedMarkdownTests(CacheTestCase):
+    """
+    Checks stored HTML is re-rendered when outdated, and outdated only for
+    the markdown referencing a changed asset
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.asset = FileAsset.objects.create(title='Paper', slug='paper',
+                                             asset='assets/file/paper.pdf')
+        author = Author.objects.create(slug='author', first_name='Jane')
+        category = Category.objects.create(name='Category', slug='category')
+        cls.post = Post.objects.create(
+            title='Post', slug='post', body='See [the paper](asset:paper).',
+            author=author, category=category
+        )
+        cls.other = Post.objects.create(
+            title='Other', slug='other', body='No *assets* here.',
+            author=author, category=category
+        )
+        cls.page = Page.objects.create(
+            title='Page', slug='page', link_name='Page',
+            content='Read [the paper](asset:Paper).'
+        )
+
+    def get_versions(self):
+        """Gets the stored renderer versions of the post, other and page"""
+        return (
+            Post.objects.get(pk=self.post.pk).body_html_version,
+            Post.objects.get(pk=self.other.pk).body_html_version,
+            Page.objects.get(pk=self.page.pk).content_html_version,
+        )
+
+    def test_stale_version_rendered(self):
+        Post.objects.filter(pk=self.post.pk).update(
+            body_html='<p>Stale</p>', body_html_version=None,
+            body_text='Stale', body_text_offsets='{}'
+        )
+        post = Post.objects.get(pk=self.post.pk)
+        html = post.get_rendered_body()
+        self.assertNotIn('Stale', html)
+        self.assertIn('the paper', html)
+
+        saved = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(saved.body_html, html)
+        self.assertEqual(saved.body_html_version, RENDERER_VERSION)
+        self.assertEqual(saved.body_text, 'See the paper.')
+        with self.assertNumQueries(0):
+            self.assertEqual(saved.get_rendered_body(), html)
+
+    def test_over_budget(self):
+        with override_settings(MARKDOWN_RENDER_BUDGET=0):
+            self.assertEqual(render_markdown('Some *text*.'),
+                             '<p>Some *text*.</p>\n')
+            post = Post.objects.get(pk=self.post.pk)
+            post.body = 'Some *new* text.'
+            post.save()
+            page = Page.objects.get(pk=self.page.pk)
+            page.content = 'Some *new* content.'
+            page.save()
+
+            # - Outdated by an asset change, re-rendered (once) when shown
+            self.get_asset().save()
+            Page.objects.get(pk=self.page.pk).get_rendered_content()
+
+        post = Post.objects.get(pk=self.post.pk)
+        page = Page.objects.get(pk=self.page.pk)
+        self.assertEqual(post.body_html, '<p>Some *new* text.</p>\n')
+        self.assertTrue(post.body_is_fallback)
+        self.assertTrue(page.content_is_fallback)
+        self.assertEqual(self.get_versions(), (RENDERER_VERSION,) * 3)
+
+        # - Shown as stored, without trying to render it again
+        with mock.patch('douglasdaly.markdown.render_markdown_blocks') as \
+                render:
+            for _ in range(3):
+                self.assertEqual(
+                    Post.objects.get(pk=self.post.pk).get_rendered_body(),
+                    '<p>Some *new* text.</p>\n'
+                )
+                self.assertEqual(
+                    Page.objects.get(pk=self.page.pk).get_rendered_content(),
+                    '<p>Some *new* content.</p>\n'
+                )
+        render.assert_not_called()
+
+        # - Rendered again when saved, or by the render_markdown command
+        post.save()
+        self.assertEqual(Post.objects.get(pk=self.post.pk).body_html,
+                         '<p>Some <em>new</em> text.</p>\n')
+        self.assertEqual(Post.objects.get(pk=self.post.pk).body_text,
+                         'Some new text.')
+        call_command('render_markdown', '--stale', stdout=io.StringIO())
+        page = Page.objects.get(pk=self.page.pk)
+        self.assertEqual(page.content_html,
+                         '<p>Some <em>new</em> content.</p>\n')
+        self.assertFalse(page.content_is_fallback)
+
+    def get_asset(self):
+        """Gets a fresh copy of the asset (tests change or delete it)"""
+        return FileAsset.objects.get(pk=self.asset.pk)
+
+    def test_asset_changed(self):
+        self.assertEqual(self.get_versions(), (RENDERER_VERSION,) * 3)
+        asset = self.get_asset()
+        asset.description = 'Updated'
+        asset.save()
+        self.assertEqual(self.get_versions(), (None, RENDERER_VERSION, None))
+
+    def test_asset_renamed(self):
+        asset = self.get_asset()
+        asset.slug = 'report'
+        asset.save()
+        self.assertEqual(self.get_versions(), (None, RENDERER_VERSION, None))
+
+    def test_asset_deleted(self):
+        self.get_asset().delete()
+        self.assertEqual(self.get_versions(), (None, RENDERER_VERSION, None))
@@ -15,19 +15,41 @@ from django.http import Http404
 
 from sentry_sdk import last_event_id, capture_message
 
+from .conditional import conditional_page
 from .models import Page, SiteSettings, SiteAdminSettings
+from .page_cache import add_cache_tags
 from blog.models import Post, BlogSettings
+from blog.utils import get_post_cache_tags, get_listing_validators
+
+
+#
+#   Validator Functions
+#
+
+def __get_index_validators(request):
+    """Helper function to get the validators for the home page"""
+    return get_listing_validators(Post.get_displayable(), 'assets')
+
+
+def __get_page_validators(request, slug):
+    """Helper function to get the validators for a page"""
+    if not Page.objects.filter(slug=slug, published=True).exists():
+        return None
+    return ('assets', 'page:%s' % slug), None
 
 
 #
 #   View Functions
 #
 
+@conditional_page(__get_index_validators)
 def index(request):
     """Home page view"""
     site_settings = SiteSettings.load()
     blog_settings = BlogSettings.load()
-    recent_posts = Post.get_displayable()[:site_settings.number_recent_posts]
+    n_recent = site_settings.number_recent_posts
+    recent_posts = Post.get_displayable(listing=True)[:n_recent]
+    add_cache_tags(request, 'assets', *get_post_cache_tags(recent_posts))
 
     if site_settings.number_recent_posts > 0 and len(recent_posts) > 0:
         post_col_width = round(10. / float(site_settings.number_recent_posts))
@@ -54,6 +76,7 @@ def index(request):
     })
 
 
+@conditional_page(__get_page_validators)
 def view_page(request, slug):
     """Generic page view"""
     page = get_object_or_404(Page, slug=slug)
@@ -61,6 +84,7 @@ def view_page(request, slug):
         raise Http404
 
     site_settings = SiteSettings.load()
+    add_cache_tags(request, 'assets', 'page:%s' % page.slug)
     return render(request, "view_page.html", {
         'settings': site_settings,
         'page': page,